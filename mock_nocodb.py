@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+测试用的 NocoDB 模拟工具
+把共享的 nocodb_client 的请求转给 httpx.MockTransport 处理函数，并在测试结束后（包括断言失败时）
+恢复原来的连接、表结构缓存和本地镜像状态，避免影响同一进程中的其他测试
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+import httpx
+from server import ResponseCache, nocodb_client, table_metadata, table_mirror
+
+Handler = Callable[[httpx.Request], Awaitable[httpx.Response]]
+
+def install_mock(handler: Handler, **client_options) -> None:
+    """Route every request of the shared NocoDB client to `handler` and clear the cached table schemas"""
+    nocodb_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), **client_options)
+    table_metadata.invalidate()
+
+def run_with_mock(*tests: Callable[[], Awaitable[None]]) -> None:
+    """Run each async test in its own event loop, restoring the shared client, caches and mirror afterwards"""
+    for test in tests:
+        asyncio.run(_run_restoring(test))
+
+async def _run_restoring(test: Callable[[], Awaitable[None]]) -> None:
+    saved_client = nocodb_client._client
+    saved_mirror_tables = list(table_mirror.table_ids)
+    try:
+        await test()
+    finally:
+        if nocodb_client._client is not saved_client and nocodb_client._client is not None:
+            await nocodb_client._client.aclose()
+        nocodb_client._client = saved_client
+        table_metadata.invalidate()
+        if nocodb_client.response_cache is not None:
+            cache = nocodb_client.response_cache
+            nocodb_client.response_cache = ResponseCache(cache.ttl, cache.max_entries)
+        table_mirror.table_ids[:] = saved_mirror_tables
+        table_mirror._state.clear()
@@ -8,9 +8,18 @@ Supports both stdio and SSE transport methods.
 
 import os
 import json
+import base64
 import asyncio
-import copy
-from typing import Any, Dict, List, Optional, Union
+import random
+import time
+import re
+import sqlite3
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time
+from email.utils import parsedate_to_datetime
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 from dotenv import load_dotenv
 import httpx
 from fastmcp import FastMCP
@@ -23,6 +32,74 @@ NOCODB_HOST = os.getenv("NOCODB_HOST", "")
 NOCODB_TOKEN = os.getenv("NOCODB_TOKEN", "")
 MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
 
+# HTTP 连接池配置
+NOCODB_MAX_CONNECTIONS = int(os.getenv("NOCODB_MAX_CONNECTIONS", "100"))
+NOCODB_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("NOCODB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+NOCODB_KEEPALIVE_EXPIRY = float(os.getenv("NOCODB_KEEPALIVE_EXPIRY", "30"))
+NOCODB_HTTP2 = os.getenv("NOCODB_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# 批量读取时并发请求的页数
+NOCODB_FETCH_CONCURRENCY = int(os.getenv("NOCODB_FETCH_CONCURRENCY", "4"))
+
+# 批量写入时每个请求的记录数，以及同时发送的请求数
+NOCODB_BATCH_SIZE = int(os.getenv("NOCODB_BATCH_SIZE", "100"))
+NOCODB_WRITE_CONCURRENCY = int(os.getenv("NOCODB_WRITE_CONCURRENCY", "4"))
+
+# 表结构元数据的缓存时间（秒）
+NOCODB_META_TTL = float(os.getenv("NOCODB_META_TTL", "300"))
+NOCODB_META_CACHE_SIZE = int(os.getenv("NOCODB_META_CACHE_SIZE", "256"))
+
+# 记录查询结果的缓存时间（秒），0 表示关闭缓存
+NOCODB_RECORD_CACHE_TTL = float(os.getenv("NOCODB_RECORD_CACHE_TTL", "0"))
+NOCODB_RECORD_CACHE_SIZE = int(os.getenv("NOCODB_RECORD_CACHE_SIZE", "512"))
+
+# 瞬时错误（429/502/503/504、超时、网络错误）的重试配置
+NOCODB_MAX_RETRIES = int(os.getenv("NOCODB_MAX_RETRIES", "3"))
+NOCODB_RETRY_BACKOFF = float(os.getenv("NOCODB_RETRY_BACKOFF", "0.5"))
+NOCODB_RETRY_MAX_BACKOFF = float(os.getenv("NOCODB_RETRY_MAX_BACKOFF", "10"))
+NOCODB_RETRY_DEADLINE = float(os.getenv("NOCODB_RETRY_DEADLINE", "60"))
+
+# 客户端限流：每秒请求数与突发容量，0 表示不限流
+NOCODB_RATE_LIMIT = float(os.getenv("NOCODB_RATE_LIMIT", "0"))
+NOCODB_RATE_BURST = int(os.getenv("NOCODB_RATE_BURST", "0"))
+
+# 熔断器：连续失败次数阈值（0 表示关闭）、熔断后的冷却时间（秒）、半开状态允许的探测请求数
+NOCODB_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("NOCODB_CIRCUIT_FAILURE_THRESHOLD", "5"))
+NOCODB_CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("NOCODB_CIRCUIT_RECOVERY_TIMEOUT", "30"))
+NOCODB_CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("NOCODB_CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+
+# 请求超时（秒）：建立连接、读取响应、发送请求体、等待连接池中的空闲连接
+NOCODB_CONNECT_TIMEOUT = float(os.getenv("NOCODB_CONNECT_TIMEOUT", "10"))
+NOCODB_READ_TIMEOUT = float(os.getenv("NOCODB_READ_TIMEOUT", "30"))
+NOCODB_WRITE_TIMEOUT = float(os.getenv("NOCODB_WRITE_TIMEOUT", "30"))
+NOCODB_POOL_TIMEOUT = float(os.getenv("NOCODB_POOL_TIMEOUT", "30"))
+
+# 按操作类型覆盖超时：get（读取记录）、meta（表结构）、write（创建/更新）、delete（删除）
+# 取值为一个数字（读取和写入超时）或 "connect,read,write,pool" 四个数字，留空则使用上面的默认值
+NOCODB_OPERATION_TIMEOUTS = {
+    operation: os.getenv(f"NOCODB_TIMEOUT_{operation.upper()}", "")
+    for operation in ("get", "meta", "write", "delete")
+}
+
+# JSON 编解码后端：auto（优先 orjson，其次 msgspec）、orjson、msgspec 或 json（标准库）
+NOCODB_JSON_BACKEND = os.getenv("NOCODB_JSON_BACKEND", "auto").lower()
+
+# 写入前按表结构校验并转换字段类型，不合法的记录在发送前被拒绝（单次调用可通过 validate 参数覆盖）
+NOCODB_VALIDATE_RECORDS = os.getenv("NOCODB_VALIDATE_RECORDS", "false").lower() in ("1", "true", "yes")
+
+# get_table_records 单次响应的大小预算：字节数与近似 token 数（0 表示不限制）
+# 以及单个字段的最大字符数（0 表示不截断字段；截断后的记录不应再原样写回）
+NOCODB_RESPONSE_MAX_BYTES = int(os.getenv("NOCODB_RESPONSE_MAX_BYTES", "1000000"))
+NOCODB_RESPONSE_MAX_TOKENS = int(os.getenv("NOCODB_RESPONSE_MAX_TOKENS", "0"))
+NOCODB_FIELD_MAX_CHARS = int(os.getenv("NOCODB_FIELD_MAX_CHARS", "0"))
+
+# 本地 SQLite 只读镜像：逗号分隔的表 ID（为空表示关闭）、数据库路径、后台刷新间隔（秒）
+# 以及镜像可用的最长时间（秒），超过后读取回退到 NocoDB
+NOCODB_MIRROR_TABLES = [table_id.strip() for table_id in os.getenv("NOCODB_MIRROR_TABLES", "").split(",") if table_id.strip()]
+NOCODB_MIRROR_PATH = os.getenv("NOCODB_MIRROR_PATH", ":memory:")
+NOCODB_MIRROR_REFRESH_INTERVAL = float(os.getenv("NOCODB_MIRROR_REFRESH_INTERVAL", "60"))
+NOCODB_MIRROR_MAX_STALENESS = float(os.getenv("NOCODB_MIRROR_MAX_STALENESS", "300"))
+
 if not NOCODB_HOST or not NOCODB_TOKEN:
     raise ValueError("NOCODB_HOST and NOCODB_TOKEN must be set in environment variables")
 
@@ -33,24 +110,54 @@ READONLY_FIELDS = {
     'nc_created_at', 'nc_updated_at', 'nc_created_by', 'nc_updated_by'
 }
 
-def filter_readonly_fields(records: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+# 记录最后修改时间的字段（READONLY_FIELDS 中的更新时间列），按优先顺序排列
+UPDATED_AT_FIELDS = ['UpdatedAt', 'updatedAt', 'nc_updated_at']
+
+# 可以安全重试的 HTTP 状态码
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+# 只读列类型 - 虚拟列和由 NocoDB 自动维护的列，写入时需要被过滤掉
+READONLY_COLUMN_TYPES = {
+    'Formula', 'Lookup', 'Rollup', 'Barcode', 'QrCode', 'AutoNumber',
+    'CreatedTime', 'LastModifiedTime', 'CreatedBy', 'LastModifiedBy',
+    'Links', 'LinkToAnotherRecord', 'Button'
+}
+
+def filter_readonly_fields(
+    records: Union[Dict[str, Any], List[Dict[str, Any]]],
+    in_place: bool = False,
+    readonly_fields: Optional[Set[str]] = None
+) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
     """
     过滤掉只读字段，防止更新时出错
     
+    只读字段都是记录的顶层键，因此只需浅拷贝：返回的新字典与原记录共享嵌套的
+    JSON/附件等值，但原记录本身不会被修改。对于调用方自己持有的数据（例如刚从
+    JSON 字符串解析出来的记录），可以使用 in_place=True 直接删除字段，省去拷贝。
+    
     Args:
         records: 单个记录字典或记录列表
+        in_place: 为 True 时直接在原记录上删除只读字段
+        readonly_fields: 要删除的字段集合，默认为 READONLY_FIELDS
         
     Returns:
         过滤后的记录
     """
+    if readonly_fields is None:
+        readonly_fields = READONLY_FIELDS
+    
     def filter_single_record(record: Dict[str, Any]) -> Dict[str, Any]:
-        # 深拷贝记录以避免修改原始数据
-        filtered_record = copy.deepcopy(record)
+        # 遍历记录键和只读字段集合中较小的一方，找出需要删除的字段
+        if len(record) <= len(readonly_fields):
+            present = [field for field in record if field in readonly_fields]
+        else:
+            present = [field for field in readonly_fields if field in record]
+        
+        filtered_record = record if in_place else dict(record)
         
         # 删除只读字段
-        for field in READONLY_FIELDS:
-            if field in filtered_record:
-                del filtered_record[field]
+        for field in present:
+            del filtered_record[field]
                 
         return filtered_record
     
@@ -59,19 +166,802 @@ def filter_readonly_fields(records: Union[Dict[str, Any], List[Dict[str, Any]]])
     else:
         return filter_single_record(records)
 
-# Initialize FastMCP
-mcp = FastMCP("NocoDB MCP Server")
+def parse_timeout(value: Union[str, float, httpx.Timeout, None], default: httpx.Timeout) -> httpx.Timeout:
+    """
+    Parse a timeout setting into an httpx.Timeout.
+    
+    A single number sets the read and write timeouts and keeps the default
+    connect and pool timeouts; "connect,read,write,pool" sets all four.
+    An empty value returns the default.
+    """
+    if isinstance(value, httpx.Timeout):
+        return value
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    if isinstance(value, (int, float)):
+        parts = [float(value)]
+    else:
+        parts = [float(part) for part in value.split(",")]
+    if len(parts) == 1:
+        return httpx.Timeout(connect=default.connect, read=parts[0], write=parts[0], pool=default.pool)
+    if len(parts) == 4:
+        return httpx.Timeout(connect=parts[0], read=parts[1], write=parts[2], pool=parts[3])
+    raise ValueError(f"Invalid timeout {value!r}: expected one number or 'connect,read,write,pool'")
+
+class JSONBackend:
+    """
+    JSON encoder/decoder for request bodies, responses and JSON string arguments.
+    
+    With "auto" orjson is used when installed, then msgspec, then the standard
+    library. A backend that is requested but not installed falls back to the
+    standard library. Values the fast encoders cannot handle (for example
+    integers beyond 64 bits) are encoded with the standard library. Decode
+    errors are always raised as json.JSONDecodeError.
+    """
+    
+    def __init__(self, name: str = "auto"):
+        candidates = ["orjson", "msgspec"] if name == "auto" else [name]
+        self.name = "json"
+        for candidate in candidates:
+            if candidate == "orjson":
+                try:
+                    import orjson
+                except ImportError:
+                    continue
+                self.name = "orjson"
+                self._loads = orjson.loads
+                self._dumps = lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+                break
+            if candidate == "msgspec":
+                try:
+                    import msgspec
+                except ImportError:
+                    continue
+                decoder = msgspec.json.Decoder()
+                decode_error = msgspec.DecodeError
+                
+                def msgspec_loads(data: Union[str, bytes]) -> Any:
+                    try:
+                        return decoder.decode(data)
+                    except decode_error as e:
+                        raise json.JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from e
+                
+                self.name = "msgspec"
+                self._loads = msgspec_loads
+                self._dumps = msgspec.json.Encoder().encode
+                break
+        
+        if self.name == "json":
+            if name not in ("auto", "json"):
+                import sys
+                print(f"NOCODB_JSON_BACKEND={name} is not installed, falling back to the json module", file=sys.stderr)
+            self._loads = json.loads
+            self._dumps = self._stdlib_dumps
+    
+    @staticmethod
+    def _stdlib_dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode a JSON document from str or UTF-8 bytes"""
+        return self._loads(data)
+    
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value as compact UTF-8 JSON bytes"""
+        try:
+            return self._dumps(value)
+        except (TypeError, ValueError, OverflowError):
+            if self._dumps is self._stdlib_dumps:
+                raise
+            return self._stdlib_dumps(value)
+
+json_backend = JSONBackend(NOCODB_JSON_BACKEND)
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = " \t\n\r"
+
+async def iter_json_list(
+    chunks: AsyncIterator[str],
+    key: str = "list",
+    rest: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Any]:
+    """
+    Incrementally parse a JSON object and yield the items of its `key` array.
+    
+    Text is read from `chunks` only as far as needed, so at any time just the
+    item being decoded and the unread tail of the input are held in memory.
+    The other top-level members (e.g. pageInfo) are decoded whole and stored
+    in `rest` when it is given. Raises json.JSONDecodeError on invalid input.
+    """
+    iterator = chunks.__aiter__()
+    buffer = ""
+    pos = 0
+    eof = False
+    
+    async def read_more() -> None:
+        nonlocal buffer, pos, eof
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            eof = True
+            return
+        # 丢弃已解析的部分，只保留未读完的尾部
+        buffer = buffer[pos:] + chunk
+        pos = 0
+    
+    async def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            await read_more()
+    
+    async def expect(chars: str) -> str:
+        nonlocal pos
+        char = await peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", buffer, pos)
+        pos += 1
+        return char
+    
+    async def decode() -> Any:
+        nonlocal pos
+        await peek()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(buffer, pos)
+                # 恰好在缓冲区末尾结束的值（例如数字）可能还没读完
+                if end < len(buffer) or eof:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            # 按未解析部分的长度成倍读取，避免对大记录反复从头解析
+            pending = len(buffer) - pos
+            while not eof and len(buffer) - pos <= 2 * pending:
+                await read_more()
+    
+    await expect("{")
+    if await peek() == "}":
+        return
+    while True:
+        name = await decode()
+        if not isinstance(name, str):
+            raise json.JSONDecodeError("Expecting property name", buffer, pos)
+        await expect(":")
+        if name == key and await peek() == "[":
+            pos += 1
+            if await peek() == "]":
+                pos += 1
+            else:
+                while True:
+                    yield await decode()
+                    if await expect(",]") == "]":
+                        break
+        else:
+            value = await decode()
+            if rest is not None:
+                rest[name] = value
+        if await expect(",}") == "}":
+            return
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache with a TTL for successful record reads.
+    
+    Entries are grouped by table so that a write to a table drops every cached
+    query for it. Each table also has a generation counter: a read only stores
+    its result if no write to the same table happened while it was in flight.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Tuple], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(table_id: str, params: Dict[str, Any]) -> Tuple[str, Tuple]:
+        """Build a cache key from the table and the full set of query parameters"""
+        return (table_id, tuple(sorted((name, str(value)) for name, value in params.items() if value is not None)))
+    
+    def generation(self, table_id: str) -> int:
+        return self._generations.get(table_id, 0)
+    
+    def get(self, key: Tuple[str, Tuple]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return dict(entry[1])
+    
+    def put(self, key: Tuple[str, Tuple], result: Dict[str, Any], generation: int) -> None:
+        if generation != self.generation(key[0]):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate_table(self, table_id: str) -> None:
+        """Drop every cached query of a table and reject reads already in flight"""
+        self._generations[table_id] = self.generation(table_id) + 1
+        stale = [key for key in self._entries if key[0] == table_id]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open"""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a call's overall deadline passes before NocoDB has answered"""
+
+
+# 当前工具调用的 (单次请求超时, 截止时间)，由 call_limits() 设置
+# 在其中创建的任务（预取的下一页、并发分块）会继承这一设置
+_call_limits: ContextVar[Tuple[Optional[float], Optional[float]]] = ContextVar(
+    "nocodb_call_limits",
+    default=(None, None)
+)
+
+# 当前工具调用开始的时间：NOCODB_RETRY_DEADLINE 从这里起算，而不是每个请求重新计时
+_call_started_at: ContextVar[Optional[float]] = ContextVar("nocodb_call_started_at", default=None)
+
+
+@contextmanager
+def call_limits(timeout: Optional[float] = None, deadline: Optional[float] = None) -> Iterator[None]:
+    """
+    Apply a per-call timeout and an overall deadline to the NocoDB requests
+    made inside the block, including retries, page fetches and chunk workers.
+    
+    `timeout` replaces the read/write timeout (and caps the connect and pool
+    timeouts) of each request. `deadline` is the total number of seconds the
+    block may spend waiting on NocoDB; a nested block can only shorten it.
+    The outermost block also starts the client's retry deadline, so no
+    retry is begun once retry_deadline seconds have passed in the block,
+    however many requests it makes.
+    """
+    current_timeout, current_deadline = _call_limits.get()
+    if deadline is not None:
+        expires_at = time.monotonic() + deadline
+        current_deadline = expires_at if current_deadline is None else min(current_deadline, expires_at)
+    token = _call_limits.set((timeout if timeout is not None else current_timeout, current_deadline))
+    started_token = _call_started_at.set(_call_started_at.get() or time.monotonic())
+    try:
+        yield
+    finally:
+        _call_started_at.reset(started_token)
+        _call_limits.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Return the seconds left before the current call's deadline, or None without a deadline"""
+    deadline = _call_limits.get()[1]
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker around the NocoDB host.
+    
+    After `failure_threshold` consecutive failures (network errors, timeouts
+    or 5xx responses) the circuit opens and requests fail immediately for
+    `recovery_timeout` seconds. It then half-opens and lets up to
+    `half_open_max_calls` probe requests through: a successful probe closes
+    the circuit, a failed one opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.times_opened = 0
+        self.rejected = 0
+    
+    def before_request(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now"""
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"NocoDB circuit breaker is open after {self.consecutive_failures} consecutive failures; "
+                    f"retry in {remaining:.1f}s"
+                )
+            self.state = self.HALF_OPEN
+            self._probes_in_flight = 0
+        
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError("NocoDB circuit breaker is half-open and waiting for a probe request to finish")
+            self._probes_in_flight += 1
+    
+    def record_outcome(self, success: Optional[bool]) -> None:
+        """Record a request result; None means the request was abandoned (e.g. cancelled)"""
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+        if success is None:
+            return
+        
+        if success:
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            return
+        
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "recovery_timeout": self.recovery_timeout,
+            "times_opened": self.times_opened,
+            "rejected_requests": self.rejected
+        }
+
+
+class RecordStream:
+    """
+    One page of records parsed incrementally from a streamed NocoDB response.
+    
+    Iterating yields the rows of the response's "list" array one at a time.
+    The other top-level members are collected in `extra` as they are reached;
+    NocoDB sends pageInfo after the list, so `page_info` is only filled once
+    the whole list has been read.
+    """
+    
+    def __init__(self, response: httpx.Response, error: Optional[Dict[str, Any]] = None):
+        self.response = response
+        self.status_code = response.status_code
+        self.success = error is None
+        self.error = error
+        self.extra: Dict[str, Any] = {}
+        self.rows = 0
+    
+    @property
+    def page_info(self) -> Dict[str, Any]:
+        return self.extra.get("pageInfo", {})
+    
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        async for record in iter_json_list(self.response.aiter_text(), "list", self.extra):
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceededError("Deadline exceeded while streaming records")
+            self.rows += 1
+            yield record
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by all NocoDB requests.
+    
+    Up to `burst` requests may go out back to back; after that requests are
+    released at `rate` per second. Callers that find the bucket empty wait in
+    FIFO order instead of failing.
+    """
+    
+    def __init__(self, rate: float, burst: int = 0):
+        self.rate = rate
+        self.capacity = float(max(1, burst or int(rate) or 1))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        started_at = time.monotonic()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            # asyncio.Lock 按到达顺序唤醒等待者，保证排队公平
+            async with self._lock:
+                self._refill()
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self.queue_depth -= 1
+        
+        waited = time.monotonic() - started_at
+        self.acquired += 1
+        if waited > 0.001:
+            self.delayed += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": int(self.capacity),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.acquired,
+            "delayed_requests": self.delayed,
+            "average_wait": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait": round(self.max_wait, 4)
+        }
 
 class NocoDBClient:
     """NocoDB API client wrapper"""
     
-    def __init__(self, host: str, token: str):
+    def __init__(
+        self,
+        host: str,
+        token: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        retry_max_backoff: float = 10.0,
+        retry_deadline: float = 60.0,
+        rate_limit: float = 0.0,
+        rate_burst: int = 0,
+        circuit_failure_threshold: int = 0,
+        circuit_recovery_timeout: float = 30.0,
+        circuit_half_open_max_calls: int = 1,
+        record_cache_ttl: float = 0.0,
+        record_cache_size: int = 512,
+        timeout: Optional[httpx.Timeout] = None,
+        operation_timeouts: Optional[Dict[str, Union[str, float, httpx.Timeout]]] = None
+    ):
         self.host = host.rstrip('/')
         self.token = token
         self.headers = {
             "xc-token": token,
             "Content-Type": "application/json"
         }
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self.timeout = timeout if timeout is not None else httpx.Timeout(30.0)
+        self.operation_timeouts = {
+            operation: parse_timeout(value, self.timeout)
+            for operation, value in (operation_timeouts or {}).items()
+        }
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_max_backoff = retry_max_backoff
+        self.retry_deadline = retry_deadline
+        self.retries = 0
+        self.rate_limiter = TokenBucket(rate_limit, rate_burst) if rate_limit > 0 else None
+        self.circuit_breaker = CircuitBreaker(
+            circuit_failure_threshold,
+            circuit_recovery_timeout,
+            circuit_half_open_max_calls
+        ) if circuit_failure_threshold > 0 else None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.response_cache = ResponseCache(record_cache_ttl, record_cache_size) if record_cache_ttl > 0 else None
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.upstream_reads = 0
+        self.coalesced_requests = 0
+        # 写操作后回调（参数为表 ID），用于通知本地镜像等
+        self.write_listeners: List[Callable[[str], None]] = []
+    
+    async def start(self) -> None:
+        """Create the shared connection pool (called on server startup)"""
+        self._get_client()
+    
+    async def aclose(self) -> None:
+        """Close the shared connection pool (called on server shutdown)"""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared AsyncClient, creating it lazily if needed"""
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    # HTTP/2 需要安装 h2 包，未安装时回退到 HTTP/1.1
+                    import sys
+                    print("NOCODB_HTTP2 is enabled but 'h2' is not installed, falling back to HTTP/1.1", file=sys.stderr)
+                    http2 = False
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                limits=self.limits,
+                http2=http2
+            )
+        return self._client
+    
+    def get_timeout(self, operation: str, override: Optional[float] = None) -> httpx.Timeout:
+        """Return the timeout for an operation ("get", "meta", "write", "delete"), applying a per-call override"""
+        timeout = self.operation_timeouts.get(operation, self.timeout)
+        if override is None:
+            return timeout
+        return httpx.Timeout(
+            connect=override if timeout.connect is None else min(timeout.connect, override),
+            read=override,
+            write=override,
+            pool=override if timeout.pool is None else min(timeout.pool, override)
+        )
+    
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        operation: str = "get",
+        idempotent: bool = True,
+        stream: bool = False,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Send a request through the shared client, retrying transient failures.
+        
+        Idempotent requests (GET, DELETE, PATCH by id) are retried on 429/502/
+        503/504, timeouts and network errors. Non-idempotent requests are only
+        retried when the server cannot have processed them: on 429 and when no
+        connection could be made. Delays grow exponentially with full jitter,
+        a Retry-After header takes precedence, and no retry is started that
+        would end after the retry deadline, counted from the start of the
+        enclosing call_limits() block (the tool call) when there is one. The last response is returned (or
+        the last exception raised) once retries are exhausted. While the
+        circuit breaker is open, CircuitOpenError is raised without waiting.
+        
+        The timeout comes from the operation's profile, and the deadline set
+        by call_limits() bounds every attempt as well as the waits between
+        them; DeadlineExceededError is raised once it has passed.
+        
+        With stream=True the response body is not read; the caller must
+        close the returned response.
+        """
+        client = self._get_client()
+        call_timeout, call_deadline = _call_limits.get()
+        kwargs.setdefault("timeout", self.get_timeout(operation, call_timeout))
+        # 在 call_limits() 中时重试截止时间按整个工具调用计算
+        deadline = (_call_started_at.get() or time.monotonic()) + self.retry_deadline
+        if call_deadline is not None:
+            deadline = min(deadline, call_deadline)
+        attempt = 0
+        last_response: Optional[httpx.Response] = None
+        last_error: Optional[httpx.TransportError] = None
+        while True:
+            if call_deadline is not None and call_deadline <= time.monotonic():
+                # 等待重试期间截止时间已到：返回上一次的结果
+                if last_response is not None:
+                    return last_response
+                if last_error is not None:
+                    raise last_error
+                raise DeadlineExceededError(f"Deadline exceeded before {method} {url} could be sent")
+            if last_response is not None:
+                await last_response.aclose()
+            
+            try:
+                if call_deadline is None:
+                    response = await self._send_once(client, method, url, stream, **kwargs)
+                else:
+                    # 截止时间同时限制限流排队、熔断探测和请求本身
+                    response = await asyncio.wait_for(
+                        self._send_once(client, method, url, stream, **kwargs),
+                        call_deadline - time.monotonic()
+                    )
+            except asyncio.TimeoutError as e:
+                raise DeadlineExceededError(f"Deadline exceeded while waiting for {method} {url}") from e
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt, None)
+                if time.monotonic() + delay > deadline:
+                    raise
+                last_response, last_error = None, e
+            else:
+                status_code = response.status_code
+                retryable = status_code == 429 or (idempotent and status_code in RETRYABLE_STATUS_CODES)
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                if time.monotonic() + delay > deadline:
+                    return response
+                last_response, last_error = response, None
+            
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+    
+    async def _send_once(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        stream: bool = False,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """Send a single attempt, passing through the circuit breaker and the rate limiter"""
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_request()
+        
+        success: Optional[bool] = None
+        try:
+            # 每次尝试（包括重试）都需要先从令牌桶中取得令牌
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            request = client.build_request(method, url, **kwargs)
+            response = await client.send(request, stream=stream)
+            success = response.status_code < 500
+            return response
+        except httpx.TransportError:
+            success = False
+            raise
+        finally:
+            if breaker is not None:
+                breaker.record_outcome(success)
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Return the wait before the next attempt, honoring Retry-After when present"""
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        # 指数退避 + 完全随机抖动，避免大量请求同时重试
+        return random.uniform(0, min(self.retry_max_backoff, self.retry_backoff * (2 ** attempt)))
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool configuration and usage statistics"""
+        stats: Dict[str, Any] = {
+            "active": self._client is not None and not self._client.is_closed,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "timeouts": {
+                operation: self.get_timeout(operation).as_dict()
+                for operation in ("get", "meta", "write", "delete")
+            },
+            "retries": self.retries
+        }
+        # httpx 没有公开连接池状态，这里通过 httpcore 的连接池读取
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        return stats
+    
+    async def _single_flight(
+        self,
+        key: Tuple,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Deduplicate identical concurrent reads.
+        
+        The first caller for a key starts the upstream request; callers that
+        arrive while it is in flight await the same task instead of sending
+        their own. Only callers with the same per-request timeout share a task.
+        The task runs without the first caller's deadline and is shielded, so
+        neither a cancelled caller nor a short deadline cuts the request short
+        for the others; every caller, the first included, stops waiting at
+        its own deadline. Each caller gets its own copy of the top-level
+        result dict.
+        """
+        # 单次请求超时不同的调用不合并，截止时间则由每个调用者自己等待
+        timeout = _call_limits.get()[0]
+        key = key + (timeout,)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced_requests += 1
+        else:
+            async def shared_fetch() -> Dict[str, Any]:
+                # 共享请求不受发起者的截止时间限制，否则它会波及所有等待者
+                _call_limits.set((timeout, None))
+                return await fetch()
+            
+            task = asyncio.ensure_future(shared_fetch())
+            self._in_flight[key] = task
+            self.upstream_reads += 1
+            
+            def forget(finished: asyncio.Future) -> None:
+                if self._in_flight.get(key) is finished:
+                    del self._in_flight[key]
+            
+            task.add_done_callback(forget)
+        
+        # 每个调用者（包括发起者）只按自己的截止时间等待
+        remaining = remaining_time()
+        if remaining is None:
+            return dict(await asyncio.shield(task))
+        try:
+            return dict(await asyncio.wait_for(asyncio.shield(task), max(0.0, remaining)))
+        except asyncio.TimeoutError as e:
+            raise DeadlineExceededError("Deadline exceeded while waiting for an identical in-flight request") from e
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Return rate limiter queue depth and wait times ({"enabled": False} when disabled)"""
+        if self.rate_limiter is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.rate_limiter.get_stats()}
+    
+    def get_circuit_breaker_stats(self) -> Dict[str, Any]:
+        """Return circuit breaker state ({"enabled": False} when disabled)"""
+        if self.circuit_breaker is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.circuit_breaker.get_stats()}
+    
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Return counters for deduplicated (single-flight) reads"""
+        return {
+            "in_flight": len(self._in_flight),
+            "upstream_reads": self.upstream_reads,
+            "coalesced_requests": self.coalesced_requests
+        }
+    
+    def _invalidate_records_cache(self, table_id: str) -> None:
+        if self.response_cache is not None:
+            self.response_cache.invalidate_table(table_id)
+        for listener in self.write_listeners:
+            listener(table_id)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return record cache statistics ({"enabled": False} when disabled)"""
+        if self.response_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.get_stats()}
     
     async def create_records(self, table_id: str, records: Union[Dict, List[Dict]]) -> Dict[str, Any]:
         """Create new records in a table"""
@@ -81,57 +971,515 @@ class NocoDBClient:
         if isinstance(records, dict):
             records = [records]
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
+        try:
+            response = await self._request(
+                "POST",
                 url,
+                operation="write",
+                idempotent=False,
                 headers=self.headers,
-                json=records,
-                timeout=30.0
+                content=json_backend.dumps(records)
             )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "data": response.json(),
-                    "message": f"Successfully created {len(records)} record(s)"
-                }
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
-                return {
-                    "success": False,
-                    "error": error_data,
-                    "status_code": response.status_code
-                }
+        finally:
+            # 写请求结束后（包括失败、超时或被取消时）使该表的查询缓存失效
+            self._invalidate_records_cache(table_id)
+        
+        if response.status_code == 200:
+            return {
+                "success": True,
+                "data": json_backend.loads(response.content),
+                "message": f"Successfully created {len(records)} record(s)"
+            }
+        else:
+            error_data = json_backend.loads(response.content) if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
+            return {
+                "success": False,
+                "error": error_data,
+                "status_code": response.status_code
+            }
     
-    async def get_records(self, table_id: str, limit: int = 25, offset: int = 0) -> Dict[str, Any]:
-        """Get records from a table"""
+    async def get_records(
+        self,
+        table_id: str,
+        limit: int = 25,
+        offset: int = 0,
+        where: Optional[str] = None,
+        sort: Optional[Union[str, List[str]]] = None,
+        fields: Optional[Union[str, List[str]]] = None,
+        view_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get records from a table, optionally filtered, sorted and projected by NocoDB"""
         url = f"{self.host}/api/v2/tables/{table_id}/records"
-        params = {
+        params = self._record_params(limit, offset, where, sort, fields, view_id)
+        
+        cache_key = ResponseCache.make_key(table_id, params)
+        cache = self.response_cache
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation(table_id)
+        
+        # 相同的查询正在进行时，直接等待它的结果
+        result = await self._single_flight(
+            ("records",) + cache_key,
+            lambda: self._fetch_records(url, params, table_id)
+        )
+        if cache is not None and result["success"]:
+            cache.put(cache_key, result, generation)
+        return result
+    
+    @staticmethod
+    def _record_params(
+        limit: int,
+        offset: int,
+        where: Optional[str],
+        sort: Optional[Union[str, List[str]]],
+        fields: Optional[Union[str, List[str]]],
+        view_id: Optional[str]
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
             "limit": limit,
             "offset": offset
         }
+        # 只把调用方提供的查询条件传给 NocoDB
+        if where:
+            params["where"] = where
+        if sort:
+            params["sort"] = sort if isinstance(sort, str) else ",".join(sort)
+        if fields:
+            params["fields"] = fields if isinstance(fields, str) else ",".join(fields)
+        if view_id:
+            params["viewId"] = view_id
+        return params
+    
+    @asynccontextmanager
+    async def stream_records(
+        self,
+        table_id: str,
+        limit: int = 25,
+        offset: int = 0,
+        where: Optional[str] = None,
+        sort: Optional[Union[str, List[str]]] = None,
+        fields: Optional[Union[str, List[str]]] = None,
+        view_id: Optional[str] = None
+    ) -> AsyncIterator[RecordStream]:
+        """
+        Open a page of records as a RecordStream that parses rows as they arrive.
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers=self.headers,
-                params=params,
-                timeout=30.0
+        Unlike get_records() the page is never held in memory as a whole, and
+        leaving the block early closes the connection without downloading the
+        rest of the page. Streamed reads bypass the record cache and request
+        coalescing.
+        """
+        url = f"{self.host}/api/v2/tables/{table_id}/records"
+        params = self._record_params(limit, offset, where, sort, fields, view_id)
+        
+        response = await self._request(
+            "GET",
+            url,
+            stream=True,
+            headers=self.headers,
+            params=params
+        )
+        try:
+            error = None
+            if response.status_code != 200:
+                await response.aread()
+                error = json_backend.loads(response.content) if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
+            yield RecordStream(response, error)
+        finally:
+            await response.aclose()
+    
+    async def _fetch_records(self, url: str, params: Dict[str, Any], table_id: str) -> Dict[str, Any]:
+        response = await self._request(
+            "GET",
+            url,
+            headers=self.headers,
+            params=params
+        )
+        
+        if response.status_code == 200:
+            return {
+                "success": True,
+                "data": json_backend.loads(response.content),
+                "message": f"Successfully retrieved records from table {table_id}"
+            }
+        else:
+            error_data = json_backend.loads(response.content) if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
+            return {
+                "success": False,
+                "error": error_data,
+                "status_code": response.status_code
+            }
+    
+    async def iter_record_pages(
+        self,
+        table_id: str,
+        page_size: int = 100,
+        offset: int = 0,
+        max_records: Optional[int] = None,
+        **query: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Walk a table page by page following NocoDB's pageInfo.
+        
+        The request for the next page is issued before the current page is
+        yielded, so the caller's processing overlaps with network latency.
+        Each yielded item is a get_records() result; iteration stops after the
+        last page, after max_records records, or after the first failed page.
+        Extra keyword arguments (where, sort, fields, view_id) are passed to
+        get_records() for every page.
+        """
+        fetched = 0
+        
+        def fetch(start: int) -> "asyncio.Task[Dict[str, Any]]":
+            limit = page_size if max_records is None else min(page_size, max_records - fetched)
+            return asyncio.ensure_future(self.get_records(table_id, limit, start, **query))
+        
+        next_page: Optional[asyncio.Task] = fetch(offset)
+        try:
+            while next_page is not None:
+                result = await next_page
+                next_page = None
+                if not result["success"]:
+                    yield result
+                    return
+                
+                records = result["data"].get("list", [])
+                page_info = result["data"].get("pageInfo", {})
+                offset += len(records)
+                fetched += len(records)
+                
+                # 在处理当前页之前预取下一页
+                is_last_page = page_info.get("isLastPage", len(records) < page_size)
+                if records and not is_last_page and (max_records is None or fetched < max_records):
+                    next_page = fetch(offset)
+                yield result
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+    
+    @staticmethod
+    def keyset_where(primary_key: str, after: Any, where: Optional[str] = None, descending: bool = False) -> Optional[str]:
+        """Combine a filter with the keyset condition (primary key after the last row seen)"""
+        if after is None:
+            return where
+        condition = f"({primary_key},{'lt' if descending else 'gt'},{after})"
+        return f"{condition}~and({where})" if where else condition
+    
+    async def iter_record_pages_keyset(
+        self,
+        table_id: str,
+        primary_key: str,
+        page_size: int = 100,
+        after: Any = None,
+        max_records: Optional[int] = None,
+        descending: bool = False,
+        where: Optional[str] = None,
+        fields: Optional[Union[str, List[str]]] = None,
+        view_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Walk a table in primary key order using keyset pagination.
+        
+        Each page asks NocoDB for the rows whose primary key comes after the
+        last row of the previous page (offset is always 0), so every page
+        costs the same however deep the scan is, and rows inserted or
+        deleted meanwhile do not shift later pages. Each yielded item is a
+        get_records() result with "after" set to the last primary key
+        returned so far; iteration stops after the last page, after
+        max_records records, or after the first failed page.
+        """
+        sort = f"-{primary_key}" if descending else primary_key
+        fetched = 0
+        while max_records is None or fetched < max_records:
+            limit = page_size if max_records is None else min(page_size, max_records - fetched)
+            result = await self.get_records(
+                table_id,
+                limit,
+                0,
+                where=self.keyset_where(primary_key, after, where, descending),
+                sort=sort,
+                fields=fields,
+                view_id=view_id
             )
+            if not result["success"]:
+                yield result
+                return
             
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "data": response.json(),
-                    "message": f"Successfully retrieved records from table {table_id}"
+            records = result["data"].get("list", [])
+            if records:
+                after = records[-1].get(primary_key, after)
+            fetched += len(records)
+            result["after"] = after
+            yield result
+            
+            page_info = result["data"].get("pageInfo", {})
+            if not records or page_info.get("isLastPage", len(records) < limit):
+                return
+    
+    async def get_records_parallel(
+        self,
+        table_id: str,
+        page_size: int = 100,
+        offset: int = 0,
+        max_records: Optional[int] = None,
+        concurrency: int = 4,
+        **query: Any
+    ) -> Dict[str, Any]:
+        """
+        Fetch a range of records using concurrent page requests.
+        
+        The first page is fetched on its own to learn pageInfo.totalRows; the
+        remaining offsets are then requested concurrently (at most
+        `concurrency` in flight) and reassembled in offset order. Extra keyword
+        arguments (where, sort, fields, view_id) are passed to get_records().
+        """
+        first_limit = page_size if max_records is None else min(page_size, max_records)
+        first = await self.get_records(table_id, first_limit, offset, **query)
+        if not first["success"]:
+            return first
+        
+        records = list(first["data"].get("list", []))
+        total_rows = first["data"].get("pageInfo", {}).get("totalRows")
+        pages = 1
+        
+        end = offset + len(records)
+        if total_rows is not None and len(records) == first_limit:
+            end = total_rows if max_records is None else min(total_rows, offset + max_records)
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def fetch(start: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_records(table_id, min(page_size, end - start), start, **query)
+        
+        tasks = [
+            asyncio.ensure_future(fetch(start))
+            for start in range(offset + len(records), end, page_size)
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        # 按偏移量顺序拼接各页结果
+        for result in results:
+            if not result["success"]:
+                result["records_fetched"] = len(records)
+                return result
+            records.extend(result["data"].get("list", []))
+            pages += 1
+        
+        return {
+            "success": True,
+            "data": {
+                "list": records,
+                "pageInfo": {
+                    "totalRows": total_rows,
+                    "pages": pages
                 }
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
-                return {
-                    "success": False,
-                    "error": error_data,
-                    "status_code": response.status_code
+            },
+            "message": f"Successfully retrieved {len(records)} records from table {table_id}"
+        }
+    
+    async def delete_records(self, table_id: str, record_ids: List[Any], primary_key: str = "Id") -> Dict[str, Any]:
+        """Delete several records with one request (v2 batch delete)"""
+        url = f"{self.host}/api/v2/tables/{table_id}/records"
+        body = [{primary_key: record_id} for record_id in record_ids]
+        
+        try:
+            response = await self._request(
+                "DELETE",
+                url,
+                operation="delete",
+                headers=self.headers,
+                content=json_backend.dumps(body)
+            )
+        finally:
+            # 写请求结束后（包括失败、超时或被取消时）使该表的查询缓存失效
+            self._invalidate_records_cache(table_id)
+        
+        if response.status_code == 200:
+            return {
+                "success": True,
+                "data": json_backend.loads(response.content),
+                "message": f"Successfully deleted {len(record_ids)} record(s)"
+            }
+        else:
+            error_data = json_backend.loads(response.content) if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
+            return {
+                "success": False,
+                "error": error_data,
+                "status_code": response.status_code
+            }
+    
+    async def get_table_meta(self, table_id: str) -> Dict[str, Any]:
+        """Get a table's metadata (columns, primary key, display value)"""
+        return await self._single_flight(("meta", table_id), lambda: self._fetch_table_meta(table_id))
+    
+    async def _fetch_table_meta(self, table_id: str) -> Dict[str, Any]:
+        url = f"{self.host}/api/v2/meta/tables/{table_id}"
+        
+        response = await self._request(
+            "GET",
+            url,
+            operation="meta",
+            headers=self.headers
+        )
+        
+        if response.status_code == 200:
+            return {
+                "success": True,
+                "data": json_backend.loads(response.content),
+                "message": f"Successfully retrieved metadata for table {table_id}"
+            }
+        else:
+            error_data = json_backend.loads(response.content) if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
+            return {
+                "success": False,
+                "error": error_data,
+                "status_code": response.status_code
+            }
+    
+    async def bulk_create_records(
+        self,
+        table_id: str,
+        records: Union[Dict, List[Dict]],
+        batch_size: int = 100,
+        concurrency: int = 4
+    ) -> Dict[str, Any]:
+        """Create records in chunks of batch_size, sending up to `concurrency` chunks at once"""
+        if isinstance(records, dict):
+            records = [records]
+        if len(records) <= batch_size:
+            return await self.create_records(table_id, records)
+        
+        return await self._run_in_chunks(
+            records,
+            batch_size,
+            concurrency,
+            lambda chunk: self.create_records(table_id, chunk),
+            "created"
+        )
+    
+    async def bulk_update_records(
+        self,
+        table_id: str,
+        records: Union[Dict, List[Dict]],
+        batch_size: int = 100,
+        concurrency: int = 4
+    ) -> Dict[str, Any]:
+        """Update records in chunks of batch_size, sending up to `concurrency` chunks at once"""
+        if isinstance(records, dict):
+            records = [records]
+        if len(records) <= batch_size:
+            return await self.update_records(table_id, records)
+        
+        return await self._run_in_chunks(
+            records,
+            batch_size,
+            concurrency,
+            lambda chunk: self.update_records(table_id, chunk),
+            "updated"
+        )
+    
+    async def bulk_delete_records(
+        self,
+        table_id: str,
+        record_ids: List[Any],
+        batch_size: int = 100,
+        concurrency: int = 4,
+        primary_key: str = "Id"
+    ) -> Dict[str, Any]:
+        """Delete records in chunks of batch_size, sending up to `concurrency` chunks at once"""
+        if len(record_ids) <= batch_size:
+            return await self.delete_records(table_id, record_ids, primary_key)
+        
+        return await self._run_in_chunks(
+            record_ids,
+            batch_size,
+            concurrency,
+            lambda chunk: self.delete_records(table_id, chunk, primary_key),
+            "deleted"
+        )
+    
+    async def _run_in_chunks(
+        self,
+        records: List[Any],
+        batch_size: int,
+        concurrency: int,
+        send: Callable[[List[Any]], Awaitable[Dict[str, Any]]],
+        action: str
+    ) -> Dict[str, Any]:
+        """
+        Send records in fixed-size chunks with a bounded number of workers.
+        
+        Workers pull the next chunk only when they are free, so at most
+        `concurrency` requests are in flight. Every chunk gets an entry in the
+        returned "chunks" report with the row range [start, end) it covered,
+        so a partially failed batch can be retried chunk by chunk.
+        """
+        batch_size = max(1, batch_size)
+        starts = iter(range(0, len(records), batch_size))
+        chunk_reports: Dict[int, Dict[str, Any]] = {}
+        chunk_data: Dict[int, Any] = {}
+        started_at = time.perf_counter()
+        
+        async def worker() -> None:
+            for start in starts:
+                index = start // batch_size
+                chunk = records[start:start + batch_size]
+                report: Dict[str, Any] = {
+                    "chunk": index,
+                    "start": start,
+                    "end": start + len(chunk),
+                    "count": len(chunk)
                 }
+                chunk_started_at = time.perf_counter()
+                try:
+                    result = await send(chunk)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                
+                report["elapsed_seconds"] = round(time.perf_counter() - chunk_started_at, 3)
+                report["success"] = result["success"]
+                if result["success"]:
+                    chunk_data[index] = result.get("data")
+                else:
+                    report["error"] = result.get("error")
+                    if "status_code" in result:
+                        report["status_code"] = result["status_code"]
+                chunk_reports[index] = report
+        
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        elapsed = time.perf_counter() - started_at
+        
+        chunks = [chunk_reports[index] for index in sorted(chunk_reports)]
+        data: List[Any] = []
+        for index in sorted(chunk_data):
+            if isinstance(chunk_data[index], list):
+                data.extend(chunk_data[index])
+            elif chunk_data[index] is not None:
+                data.append(chunk_data[index])
+        
+        failed = [chunk for chunk in chunks if not chunk["success"]]
+        succeeded_rows = sum(chunk["count"] for chunk in chunks if chunk["success"])
+        message = f"{action.capitalize()} {succeeded_rows} of {len(records)} record(s) in {len(chunks)} chunk(s)"
+        if failed:
+            message += f"; {len(failed)} chunk(s) failed"
+        
+        return {
+            "success": not failed,
+            "data": data,
+            "chunks": chunks,
+            "failed_chunks": [chunk["chunk"] for chunk in failed],
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(succeeded_rows / elapsed, 1) if elapsed > 0 else None,
+            "message": message
+        }
     
     async def update_records(self, table_id: str, records: Union[Dict, List[Dict]]) -> Dict[str, Any]:
         """Update records in a table (batch update)"""
@@ -141,66 +1489,1209 @@ class NocoDBClient:
         if isinstance(records, dict):
             records = [records]
         
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
+        try:
+            response = await self._request(
+                "PATCH",
                 url,
+                operation="write",
                 headers=self.headers,
-                json=records,
-                timeout=30.0
+                content=json_backend.dumps(records)
             )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "data": response.json(),
-                    "message": f"Successfully updated {len(records)} record(s)"
-                }
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
-                return {
-                    "success": False,
-                    "error": error_data,
-                    "status_code": response.status_code
-                }
+        finally:
+            # 写请求结束后（包括失败、超时或被取消时）使该表的查询缓存失效
+            self._invalidate_records_cache(table_id)
+        
+        if response.status_code == 200:
+            return {
+                "success": True,
+                "data": json_backend.loads(response.content),
+                "message": f"Successfully updated {len(records)} record(s)"
+            }
+        else:
+            error_data = json_backend.loads(response.content) if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
+            return {
+                "success": False,
+                "error": error_data,
+                "status_code": response.status_code
+            }
     
     async def delete_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
         """Delete a specific record"""
         url = f"{self.host}/api/v2/tables/{table_id}/records/{record_id}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
+        try:
+            response = await self._request(
+                "DELETE",
                 url,
-                headers=self.headers,
-                timeout=30.0
+                operation="delete",
+                headers=self.headers
             )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "message": f"Successfully deleted record {record_id}"
-                }
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
+        finally:
+            # 写请求结束后（包括失败、超时或被取消时）使该表的查询缓存失效
+            self._invalidate_records_cache(table_id)
+        
+        if response.status_code == 200:
+            return {
+                "success": True,
+                "message": f"Successfully deleted record {record_id}"
+            }
+        else:
+            error_data = json_backend.loads(response.content) if response.headers.get("content-type", "").startswith("application/json") else {"msg": response.text}
+            return {
+                "success": False,
+                "error": error_data,
+                "status_code": response.status_code
+            }
+
+def _coerce_integer(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError("expected an integer, got a boolean")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ValueError(f"expected an integer, got {value!r}")
+
+def _coerce_number(value: Any) -> Union[int, float]:
+    if isinstance(value, bool):
+        raise ValueError("expected a number, got a boolean")
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise ValueError(f"expected a number, got {value!r}")
+
+_TRUE_STRINGS = {"true", "1", "yes", "y", "on"}
+_FALSE_STRINGS = {"false", "0", "no", "n", "off", ""}
+
+def _coerce_checkbox(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+def _coerce_date(value: Any) -> str:
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return date.fromisoformat(text).isoformat()
+        except ValueError:
+            try:
+                # 也接受完整的日期时间，只保留日期部分
+                return datetime.fromisoformat(text.replace("Z", "+00:00")).date().isoformat()
+            except ValueError:
+                pass
+    raise ValueError(f"expected a date like 2024-01-31, got {value!r}")
+
+def _coerce_datetime(value: Any) -> str:
+    if isinstance(value, str):
+        try:
+            datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+            return value.strip()
+        except ValueError:
+            pass
+    raise ValueError(f"expected an ISO 8601 date and time, got {value!r}")
+
+def _coerce_time(value: Any) -> str:
+    if isinstance(value, str):
+        try:
+            dt_time.fromisoformat(value.strip())
+            return value.strip()
+        except ValueError:
+            pass
+    raise ValueError(f"expected a time like 13:45:00, got {value!r}")
+
+def _coerce_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"expected a string, got {type(value).__name__}")
+
+_EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def _coerce_email(value: Any) -> str:
+    if isinstance(value, str) and (not value or _EMAIL_PATTERN.match(value.strip())):
+        return value.strip()
+    raise ValueError(f"expected an email address, got {value!r}")
+
+def _coerce_multi_select(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list) and all(isinstance(option, str) for option in value):
+        return ",".join(value)
+    raise ValueError(f"expected a comma separated string or a list of strings, got {value!r}")
+
+def _coerce_attachment(value: Any) -> List[Dict[str, Any]]:
+    if isinstance(value, list) and all(isinstance(item, dict) for item in value):
+        return value
+    raise ValueError("expected a list of attachment objects")
+
+# 各列类型的校验/转换函数，未列出的类型（JSON、Geometry 等）不做校验
+COLUMN_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "Number": _coerce_integer,
+    "Rating": _coerce_integer,
+    "Year": _coerce_integer,
+    "Decimal": _coerce_number,
+    "Currency": _coerce_number,
+    "Percent": _coerce_number,
+    "Duration": _coerce_number,
+    "Checkbox": _coerce_checkbox,
+    "Date": _coerce_date,
+    "DateTime": _coerce_datetime,
+    "Time": _coerce_time,
+    "SingleLineText": _coerce_text,
+    "LongText": _coerce_text,
+    "RichText": _coerce_text,
+    "PhoneNumber": _coerce_text,
+    "URL": _coerce_text,
+    "SingleSelect": _coerce_text,
+    "Email": _coerce_email,
+    "MultiSelect": _coerce_multi_select,
+    "Attachment": _coerce_attachment
+}
+
+class RecordValidator:
+    """
+    Validates and coerces records against a table's column types.
+    
+    The per-column checks are looked up once when the validator is built
+    from the cached schema, so validating a record is a single pass over its
+    fields. Values are coerced in place (e.g. "42" to 42 for a Number column,
+    "yes" to True for a Checkbox); None is always accepted to clear a field.
+    Fields that are not columns of the table are reported as errors.
+    """
+    
+    def __init__(self, column_types: Dict[str, Optional[str]], primary_key: Optional[str] = None):
+        self.primary_key = primary_key
+        self._coercers: Dict[str, Optional[Callable[[Any], Any]]] = {
+            title: COLUMN_COERCERS.get(uidt) for title, uidt in column_types.items()
+        }
+        # 主键也可以用 id / Id 指定
+        for alias in ("id", "Id"):
+            self._coercers.setdefault(alias, None)
+    
+    def validate(
+        self,
+        records: List[Dict[str, Any]],
+        require_primary_key: bool = False,
+        max_errors: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Coerce records in place and return a list of {"index", "field", "error"} problems"""
+        coercers = self._coercers
+        primary_keys = {key for key in (self.primary_key, "id", "Id") if key}
+        errors: List[Dict[str, Any]] = []
+        for index, record in enumerate(records):
+            if require_primary_key and primary_keys.isdisjoint(record):
+                errors.append({"index": index, "field": self.primary_key, "error": "missing primary key"})
+            for field, value in record.items():
+                if field not in coercers:
+                    errors.append({"index": index, "field": field, "error": "unknown column"})
+                    continue
+                coerce = coercers[field]
+                if coerce is None or value is None:
+                    continue
+                try:
+                    record[field] = coerce(value)
+                except ValueError as e:
+                    errors.append({"index": index, "field": field, "error": str(e)})
+            if len(errors) >= max_errors:
+                break
+        return errors[:max_errors]
+
+class TableMetadataCache:
+    """
+    Caches per-table schema summaries fetched from NocoDB.
+    
+    Entries expire after `ttl` seconds and the least recently used table is
+    evicted once more than `max_entries` tables are cached.
+    """
+    
+    # 这些状态码说明重试也不会成功，其余失败（5xx、429 等）不缓存
+    PERMANENT_FAILURE_CODES = {401, 403, 404}
+    
+    def __init__(
+        self,
+        client: NocoDBClient,
+        ttl: float = 300.0,
+        max_entries: int = 256,
+        failure_ttl: float = 30.0
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.failure_ttl = failure_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    async def get(self, table_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached schema summary for a table, fetching it when missing
+        or expired. Returns None when the metadata cannot be read (for example
+        when the token has no access to the meta API). Only 401/403/404
+        answers are cached, for failure_ttl seconds; transient failures are
+        retried on the next call.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(table_id)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            self._entries.move_to_end(table_id)
+            return entry[1]
+        
+        self.misses += 1
+        result = await self.client.get_table_meta(table_id)
+        if not result["success"]:
+            if result.get("status_code") in self.PERMANENT_FAILURE_CODES:
+                self._entries[table_id] = (now + min(self.ttl, self.failure_ttl), None)
+                self._entries.move_to_end(table_id)
+            return None
+        schema = self._build_schema(result["data"])
+        self._entries[table_id] = (now + self.ttl, schema)
+        self._entries.move_to_end(table_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return schema
+    
+    async def get_readonly_fields(self, table_id: str) -> Set[str]:
+        """Return READONLY_FIELDS plus the readonly/virtual columns of the table"""
+        try:
+            schema = await self.get(table_id)
+        except Exception:
+            schema = None
+        return schema["readonly_fields"] if schema is not None else READONLY_FIELDS
+    
+    async def get_primary_key(self, table_id: str, default: Optional[str] = "Id") -> Optional[str]:
+        """Return the title of the table's primary key column, or `default` when the schema cannot tell"""
+        try:
+            schema = await self.get(table_id)
+        except Exception:
+            schema = None
+        if schema is None or schema["primary_key"] is None:
+            return default
+        return schema["primary_key"]
+    
+    async def get_validator(self, table_id: str) -> Optional[RecordValidator]:
+        """Return the compiled record validator of the table, or None when its schema cannot be read"""
+        schema = await self.get(table_id)
+        return schema["validator"] if schema is not None else None
+    
+    def invalidate(self, table_id: Optional[str] = None) -> int:
+        """Drop one table's entry, or every entry when table_id is None; returns the number dropped"""
+        if table_id is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+        return 1 if self._entries.pop(table_id, None) is not None else 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
+    
+    @staticmethod
+    def _build_schema(meta: Dict[str, Any]) -> Dict[str, Any]:
+        columns = meta.get("columns", [])
+        readonly_fields = set(READONLY_FIELDS)
+        primary_key = None
+        display_value = None
+        column_types = {}
+        for column in columns:
+            title = column.get("title")
+            if title is None:
+                continue
+            column_types[title] = column.get("uidt")
+            if column.get("pv") and display_value is None:
+                display_value = title
+            # 主键必须保留，更新记录时需要用它定位
+            if column.get("pk"):
+                if primary_key is None:
+                    primary_key = title
+                continue
+            if column.get("uidt") in READONLY_COLUMN_TYPES or column.get("system"):
+                readonly_fields.add(title)
+        return {
+            "table_id": meta.get("id"),
+            "title": meta.get("title"),
+            "primary_key": primary_key,
+            "display_value": display_value,
+            "column_types": column_types,
+            "columns": columns,
+            "readonly_fields": readonly_fields,
+            "validator": RecordValidator(column_types, primary_key)
+        }
+
+# Initialize NocoDB client
+nocodb_client = NocoDBClient(
+    NOCODB_HOST,
+    NOCODB_TOKEN,
+    max_connections=NOCODB_MAX_CONNECTIONS,
+    max_keepalive_connections=NOCODB_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=NOCODB_KEEPALIVE_EXPIRY,
+    http2=NOCODB_HTTP2,
+    max_retries=NOCODB_MAX_RETRIES,
+    retry_backoff=NOCODB_RETRY_BACKOFF,
+    retry_max_backoff=NOCODB_RETRY_MAX_BACKOFF,
+    retry_deadline=NOCODB_RETRY_DEADLINE,
+    rate_limit=NOCODB_RATE_LIMIT,
+    rate_burst=NOCODB_RATE_BURST,
+    circuit_failure_threshold=NOCODB_CIRCUIT_FAILURE_THRESHOLD,
+    circuit_recovery_timeout=NOCODB_CIRCUIT_RECOVERY_TIMEOUT,
+    circuit_half_open_max_calls=NOCODB_CIRCUIT_HALF_OPEN_MAX_CALLS,
+    record_cache_ttl=NOCODB_RECORD_CACHE_TTL,
+    record_cache_size=NOCODB_RECORD_CACHE_SIZE,
+    timeout=httpx.Timeout(
+        connect=NOCODB_CONNECT_TIMEOUT,
+        read=NOCODB_READ_TIMEOUT,
+        write=NOCODB_WRITE_TIMEOUT,
+        pool=NOCODB_POOL_TIMEOUT
+    ),
+    operation_timeouts=NOCODB_OPERATION_TIMEOUTS
+)
+
+table_metadata = TableMetadataCache(
+    nocodb_client,
+    ttl=NOCODB_META_TTL,
+    max_entries=NOCODB_META_CACHE_SIZE
+)
+
+# 估算 token 数时每个 token 对应的 JSON 字节数
+APPROX_BYTES_PER_TOKEN = 4
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Encode continuation state as an opaque URL-safe token"""
+    return base64.urlsafe_b64encode(json_backend.dumps(state)).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor: str, table_id: str) -> Dict[str, Any]:
+    """Decode a token from encode_cursor(), checking that it belongs to the table"""
+    try:
+        state = json_backend.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if not isinstance(state, dict) or state.get("table") != table_id:
+        raise ValueError("Invalid cursor: it does not belong to this table")
+    return state
+
+def parse_keyset_sort(sort: Optional[Union[str, List[str]]], primary_key: str) -> bool:
+    """Return True for a descending keyset scan; raise ValueError unless sort is empty or the primary key"""
+    items = [sort] if isinstance(sort, str) else list(sort or [])
+    sort_fields = [field.strip() for item in items for field in item.split(",") if field.strip()]
+    if sort_fields not in ([], [primary_key], [f"-{primary_key}"]):
+        raise ValueError(f"Keyset pagination always sorts by the primary key '{primary_key}'")
+    return sort_fields == [f"-{primary_key}"]
+
+def with_primary_key(
+    fields: Optional[Union[str, List[str]]],
+    primary_key: str
+) -> Optional[Union[str, List[str]]]:
+    """Add the primary key to a field selection so keyset cursors can read it from every row"""
+    if not fields:
+        return fields
+    field_list = [field.strip() for field in fields.split(",")] if isinstance(fields, str) else list(fields)
+    return fields if primary_key in field_list else field_list + [primary_key]
+
+def find_updated_field(schema: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Return the column holding each row's last modification time, if the table has one"""
+    if schema is None:
+        return None
+    column_types = schema["column_types"]
+    for title, uidt in column_types.items():
+        if uidt == "LastModifiedTime":
+            return title
+    for title in UPDATED_AT_FIELDS:
+        if title in column_types:
+            return title
+    return None
+
+def changed_since_where(
+    updated_field: str,
+    primary_key: str,
+    updated_at: Optional[str],
+    after: Any = None
+) -> Optional[str]:
+    """
+    Build the filter for rows changed after a watermark.
+    
+    Rows are read in (updated_field, primary_key) order, so a watermark is
+    the pair of the last row seen: rows modified later, or at the same
+    time with a larger primary key, come next. A bare timestamp without a
+    key matches rows modified at or after it.
+    """
+    if updated_at is None:
+        return None
+    if after is None:
+        return f"({updated_field},gte,exactDate,{updated_at})"
+    return (
+        f"({updated_field},gt,exactDate,{updated_at})"
+        f"~or(({updated_field},eq,exactDate,{updated_at})~and({primary_key},gt,{after}))"
+    )
+
+async def read_changes(
+    table_id: str,
+    updated_field: str,
+    primary_key: str,
+    updated_at: Optional[str] = None,
+    after: Any = None,
+    page_size: int = 100,
+    max_records: int = 1000,
+    where: Optional[str] = None,
+    fields: Optional[Union[str, List[str]]] = None,
+    null_after: Any = None
+) -> Dict[str, Any]:
+    """
+    Read the rows changed after the (updated_at, after) watermark, oldest change first.
+    
+    Rows whose modification time is empty cannot be ordered by it, so they
+    are read first, by primary key after `null_after` (the largest key seen
+    so far among them); this relies on new rows getting larger keys. Rows
+    with a modification time follow, each page requested at offset 0 with
+    the watermark moved to the last row of the previous page. Returns
+    {"success", "list", "updated_at", "after", "null_after", "has_more"}
+    with the advanced watermark, or the failed page's result with
+    "records_fetched" set.
+    """
+    records: List[Dict[str, Any]] = []
+    has_more = False
+    null_rows_done = False
+    while True:
+        if len(records) >= max_records:
+            has_more = True
+            break
+        limit = min(page_size, max_records - len(records))
+        if null_rows_done:
+            request_where = changed_since_where(updated_field, primary_key, updated_at, after) or f"({updated_field},notblank)"
+            sort = [updated_field, primary_key]
+        else:
+            request_where = f"({updated_field},blank)"
+            if null_after is not None:
+                request_where = f"{request_where}~and({primary_key},gt,{null_after})"
+            sort = [primary_key]
+        if where:
+            request_where = f"({request_where})~and({where})"
+        result = await nocodb_client.get_records(
+            table_id,
+            limit,
+            0,
+            where=request_where,
+            sort=sort,
+            fields=fields
+        )
+        if not result["success"]:
+            result["records_fetched"] = len(records)
+            return result
+        
+        page = result["data"].get("list", [])
+        records.extend(page)
+        last_page = not page or result["data"].get("pageInfo", {}).get("isLastPage", len(page) < limit)
+        # 水位线前移到本页最后一行；没有前移时不能再发出相同的请求
+        if null_rows_done:
+            watermark = (updated_at, after)
+            if page and page[-1].get(updated_field) is not None:
+                updated_at, after = page[-1][updated_field], page[-1].get(primary_key)
+            if last_page:
+                break
+            advanced = (updated_at, after) != watermark
+        else:
+            watermark = null_after
+            if page:
+                null_after = page[-1].get(primary_key)
+            null_rows_done = last_page
+            advanced = last_page or null_after != watermark
+        if not advanced:
+            return {
+                "success": False,
+                "error": f"The watermark of table {table_id} did not advance past {watermark!r}",
+                "message": "Failed to read changed records",
+                "records_fetched": len(records)
+            }
+    return {
+        "success": True,
+        "list": records,
+        "updated_at": updated_at,
+        "after": after,
+        "null_after": null_after,
+        "has_more": has_more
+    }
+
+def trim_value(value: Any, max_chars: int) -> Tuple[Any, bool]:
+    """Shorten strings longer than max_chars, including those nested in JSON and attachment values"""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value, False
+        return f"{value[:max_chars]}…[+{len(value) - max_chars} chars]", True
+    if isinstance(value, list):
+        trimmed_any = False
+        items = []
+        for item in value:
+            item, trimmed = trim_value(item, max_chars)
+            items.append(item)
+            trimmed_any = trimmed_any or trimmed
+        return (items if trimmed_any else value), trimmed_any
+    if isinstance(value, dict):
+        trimmed_any = False
+        members = {}
+        for key, item in value.items():
+            members[key], trimmed = trim_value(item, max_chars)
+            trimmed_any = trimmed_any or trimmed
+        return (members if trimmed_any else value), trimmed_any
+    return value, False
+
+def fit_records(
+    records: List[Dict[str, Any]],
+    max_bytes: int = 0,
+    max_field_chars: int = 0
+) -> Tuple[List[Dict[str, Any]], int, int, bool]:
+    """
+    Select the leading records that fit a response byte budget.
+    
+    Long field values are shortened first when max_field_chars is set. The
+    first record is always kept so a continuation cursor makes progress.
+    Returns the kept records, their JSON size in bytes, the number of
+    trimmed fields and whether records were left out for the budget.
+    """
+    kept: List[Dict[str, Any]] = []
+    used_bytes = 0
+    trimmed_fields = 0
+    for record in records:
+        trimmed_in_record = 0
+        if max_field_chars > 0:
+            trimmed_record = None
+            for field, value in record.items():
+                value, trimmed = trim_value(value, max_field_chars)
+                if trimmed:
+                    # 只复制需要截断的记录，不修改缓存中的原始数据
+                    if trimmed_record is None:
+                        trimmed_record = dict(record)
+                    trimmed_record[field] = value
+                    trimmed_in_record += 1
+            if trimmed_record is not None:
+                record = trimmed_record
+        if max_bytes > 0:
+            size = len(json_backend.dumps(record))
+            if kept and used_bytes + size > max_bytes:
+                return kept, used_bytes, trimmed_fields, True
+            used_bytes += size
+        kept.append(record)
+        trimmed_fields += trimmed_in_record
+    return kept, used_bytes, trimmed_fields, False
+
+async def validate_table_records(
+    table_id: str,
+    records: Union[Dict[str, Any], List[Dict[str, Any]]],
+    require_primary_key: bool = False,
+    required: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Validate records against the table's cached schema before they are sent.
+    
+    Returns None when the records are valid (they are coerced in place), or
+    an error response listing the invalid fields. When the table's schema
+    cannot be read, validation is skipped, unless `required` (the caller
+    asked for validation explicitly) turns that into an error.
+    """
+    validator = await table_metadata.get_validator(table_id)
+    if validator is None:
+        if not required:
+            return None
+        return {
+            "success": False,
+            "error": f"Could not read the schema of table {table_id} to validate the records",
+            "message": "Record validation was requested but is unavailable; nothing was sent to NocoDB"
+        }
+    errors = validator.validate(records if isinstance(records, list) else [records], require_primary_key)
+    if not errors:
+        return None
+    return {
+        "success": False,
+        "error": {
+            "invalid_fields": errors
+        },
+        "message": f"Record validation failed with {len(errors)} error(s); nothing was sent to NocoDB"
+    }
+
+# 镜像查询中按数值比较的列类型
+MIRROR_NUMERIC_TYPES = {
+    'Number', 'Rating', 'Year', 'Decimal', 'Currency', 'Percent', 'Duration',
+    'ID', 'AutoNumber', 'ForeignKey'
+}
+
+# 镜像查询中不按字符串比较的日期时间列类型（Date 列只支持 exactDate）
+MIRROR_DATE_TYPES = {'Date', 'DateTime', 'CreatedTime', 'LastModifiedTime', 'Time'}
+
+# 镜像中按字符串保存、可以直接比较的文本列类型
+MIRROR_TEXT_TYPES = {'SingleLineText', 'LongText', 'Email', 'URL', 'PhoneNumber', 'SingleSelect'}
+
+# 只有这些类型的列能在本地得到与 NocoDB 相同的过滤和排序结果；
+# Lookup、Rollup、Formula、Links、MultiSelect、附件、JSON、用户等列交给 NocoDB
+MIRROR_QUERYABLE_TYPES = MIRROR_NUMERIC_TYPES | MIRROR_TEXT_TYPES | MIRROR_DATE_TYPES | {'Checkbox'}
+
+_MIRROR_COMPARISONS = {"eq": "=", "gt": ">", "lt": "<", "ge": ">=", "gte": ">=", "le": "<=", "lte": "<="}
+
+def mirror_columns(column_types: Dict[str, Optional[str]], primary_key: str) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Map each column title to its (SQLite column, uidt) in a mirror table; the primary key uses the indexed pk column"""
+    columns = {title: (f"c{index}", uidt) for index, (title, uidt) in enumerate(column_types.items())}
+    columns[primary_key] = ("pk", column_types.get(primary_key, "ID"))
+    return columns
+
+def _mirror_value(value: Any) -> Any:
+    # SQLite 列中保存可比较的标量，列表/对象保存为 JSON 文本
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json_backend.dumps(value).decode("utf-8")
+    return value
+
+def _mirror_column(field: str, columns: Dict[str, Tuple[str, Optional[str]]]) -> Tuple[str, Optional[str]]:
+    if field not in columns:
+        raise ValueError(f"cannot query field {field!r} locally")
+    uidt = columns[field][1]
+    if uidt not in MIRROR_QUERYABLE_TYPES:
+        raise ValueError(f"cannot compare {uidt} column {field!r} locally")
+    return columns[field]
+
+def _mirror_condition(condition: str, columns: Dict[str, Tuple[str, Optional[str]]]) -> Tuple[str, List[Any]]:
+    parts = condition.split(",", 2)
+    if len(parts) < 2:
+        raise ValueError(f"invalid condition ({condition})")
+    field, op = parts[0], parts[1]
+    value = parts[2] if len(parts) > 2 else None
+    column, uidt = _mirror_column(field, columns)
+    
+    if op == "is" and value in ("null", "notnull", "blank", "notblank", "empty", "notempty"):
+        op, value = value, None
+    if op == "null":
+        return f"{column} IS NULL", []
+    if op == "notnull":
+        return f"{column} IS NOT NULL", []
+    if op in ("blank", "empty"):
+        return f"({column} IS NULL OR {column} = '')", []
+    if op in ("notblank", "notempty"):
+        return f"({column} IS NOT NULL AND {column} != '')", []
+    if op == "checked":
+        return f"{column} = 1", []
+    if op == "notchecked":
+        return f"({column} IS NULL OR {column} = 0)", []
+    if value is None:
+        raise ValueError(f"condition ({condition}) needs a value")
+    
+    # 日期列只支持 exactDate 比较，其他日期子操作（today、pastWeek 等）交给 NocoDB
+    if uidt in MIRROR_DATE_TYPES:
+        sub_op, _, date_value = value.partition(",")
+        if uidt != "Date" or sub_op != "exactDate":
+            raise ValueError(f"cannot compare {uidt} column {field!r} locally")
+        value = _coerce_date(date_value)
+    
+    if uidt in MIRROR_NUMERIC_TYPES and op not in ("like", "nlike"):
+        param: Any = _coerce_number(value)
+    elif uidt == "Checkbox":
+        param = 1 if _coerce_checkbox(value) else 0
+    else:
+        param = value
+    
+    if op in _MIRROR_COMPARISONS:
+        return f"{column} {_MIRROR_COMPARISONS[op]} ?", [param]
+    if op in ("neq", "ne"):
+        return f"({column} IS NULL OR {column} != ?)", [param]
+    if op in ("like", "nlike"):
+        # 与 NocoDB 一致：没有通配符时按包含匹配
+        pattern = value if "%" in value else f"%{value}%"
+        if op == "like":
+            return f"{column} LIKE ?", [pattern]
+        return f"({column} IS NULL OR {column} NOT LIKE ?)", [pattern]
+    raise ValueError(f"operator {op!r} is not supported locally")
+
+def _mirror_term(text: str, pos: int, columns: Dict[str, Tuple[str, Optional[str]]]) -> Tuple[str, List[Any], int]:
+    if text.startswith("~not", pos):
+        sql, params, pos = _mirror_term(text, pos + 4, columns)
+        return f"(NOT {sql})", params, pos
+    if not text.startswith("(", pos):
+        raise ValueError(f"expected '(' at position {pos}")
+    if text.startswith("(", pos + 1):
+        # 括号内是一组条件
+        sql, params, pos = _mirror_expression(text, pos + 1, columns)
+        if not text.startswith(")", pos):
+            raise ValueError(f"expected ')' at position {pos}")
+        return sql, params, pos + 1
+    end = text.find(")", pos)
+    if end < 0:
+        raise ValueError("unbalanced parentheses")
+    sql, params = _mirror_condition(text[pos + 1:end], columns)
+    return sql, params, end + 1
+
+def _mirror_expression(text: str, pos: int, columns: Dict[str, Tuple[str, Optional[str]]]) -> Tuple[str, List[Any], int]:
+    sql, params, pos = _mirror_term(text, pos, columns)
+    while True:
+        if text.startswith("~and", pos):
+            joiner, pos = "AND", pos + 4
+        elif text.startswith("~or", pos):
+            joiner, pos = "OR", pos + 3
+        else:
+            return sql, params, pos
+        right_sql, right_params, pos = _mirror_term(text, pos, columns)
+        sql, params = f"({sql} {joiner} {right_sql})", params + right_params
+
+def where_to_sql(where: str, columns: Dict[str, Tuple[str, Optional[str]]]) -> Tuple[str, List[Any]]:
+    """
+    Translate a NocoDB where expression into an SQLite condition over mirrored rows.
+    
+    Raises ValueError for anything that cannot be evaluated exactly as
+    NocoDB would (unknown fields, columns outside MIRROR_QUERYABLE_TYPES
+    such as lookups, rollups, formulas, links or JSON-valued columns,
+    unsupported operators or date sub-ops), so the caller can send the
+    query to NocoDB instead.
+    """
+    sql, params, pos = _mirror_expression(where, 0, columns)
+    if pos != len(where):
+        raise ValueError(f"unexpected text at position {pos}")
+    return sql, params
+
+def sort_to_sql(sort: Optional[Union[str, List[str]]], columns: Dict[str, Tuple[str, Optional[str]]]) -> str:
+    """
+    Translate a NocoDB sort into an ORDER BY clause (nulls last ascending,
+    first descending), ending with the primary key. Raises ValueError for
+    columns outside MIRROR_QUERYABLE_TYPES.
+    """
+    items = sort.split(",") if isinstance(sort, str) else (sort or [])
+    order = []
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        descending = item.startswith("-")
+        column = _mirror_column(item.lstrip("-+"), columns)[0]
+        if descending:
+            order.append(f"{column} IS NULL DESC, {column} DESC")
+        else:
+            order.append(f"{column} IS NULL, {column}")
+    order.append("pk")
+    return ", ".join(order)
+
+class TableMirror:
+    """
+    Local SQLite read replica of a few frequently read tables.
+    
+    Each mirrored table is loaded once in full and then refreshed
+    incrementally by modification time (see read_changes); a table without
+    a modification time column, or whose row count no longer matches
+    NocoDB, is reloaded in full. Writes made through this server mark the
+    table dirty so the next read refreshes it first. Reads are answered
+    locally only when the mirror was refreshed within max_staleness seconds
+    and the query can be translated to SQL; everything else goes to NocoDB.
+    """
+    
+    def __init__(
+        self,
+        client: NocoDBClient,
+        metadata: TableMetadataCache,
+        table_ids: List[str],
+        path: str = ":memory:",
+        refresh_interval: float = 60.0,
+        max_staleness: float = 300.0,
+        page_size: int = 1000
+    ):
+        self.client = client
+        self.metadata = metadata
+        self.table_ids = list(table_ids)
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.page_size = page_size
+        self._db: Optional[sqlite3.Connection] = None
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.fallbacks = 0
+        self.refreshes = 0
+        self.full_reloads = 0
+        self.errors = 0
+        client.write_listeners.append(self.mark_dirty)
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+        return self._db
+    
+    @staticmethod
+    def _table_name(table_id: str) -> str:
+        return "mirror_" + re.sub(r"\W", "_", table_id)
+    
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    def mark_dirty(self, table_id: str) -> None:
+        """Make the next read of a mirrored table refresh it first"""
+        state = self._state.get(table_id)
+        if state is not None:
+            state["dirty"] = True
+            state["writes"] += 1
+    
+    def _store(
+        self,
+        table_id: str,
+        columns: Dict[str, Tuple[str, Optional[str]]],
+        rows: List[Dict[str, Any]],
+        replace_all: bool
+    ) -> None:
+        # 每张镜像表对应一张 SQLite 表：每列一个字段用于过滤排序，data 保存完整记录
+        name = self._table_name(table_id)
+        titles = list(columns)
+        names = [columns[title][0] for title in titles]
+        primary_key = next(title for title in titles if columns[title][0] == "pk")
+        encoded = [
+            [json_backend.dumps(row).decode("utf-8")] + [_mirror_value(row.get(title)) for title in titles]
+            for row in rows if row.get(primary_key) is not None
+        ]
+        db = self._connect()
+        with db:
+            if replace_all:
+                db.execute(f"DROP TABLE IF EXISTS {name}")
+                value_columns = "".join(f", {column}" for column in names if column != "pk")
+                db.execute(f"CREATE TABLE {name} (pk PRIMARY KEY, data TEXT NOT NULL{value_columns})")
+            db.executemany(
+                f"INSERT OR REPLACE INTO {name} (data, {', '.join(names)}) VALUES ({', '.join('?' * (len(names) + 1))})",
+                encoded
+            )
+    
+    def _count(self, table_id: str) -> int:
+        return self._connect().execute(f"SELECT COUNT(*) FROM {self._table_name(table_id)}").fetchone()[0]
+    
+    async def refresh(self, table_id: str, full: bool = False) -> Dict[str, Any]:
+        """Bring one mirrored table up to date; returns {"success", "mode", "changed", "rows"} or an error result"""
+        lock = self._locks.setdefault(table_id, asyncio.Lock())
+        async with lock:
+            schema = await self.metadata.get(table_id)
+            if schema is None:
+                self.errors += 1
                 return {
                     "success": False,
-                    "error": error_data,
-                    "status_code": response.status_code
+                    "error": f"Could not read metadata for table {table_id}",
+                    "message": "Failed to refresh the local mirror"
                 }
+            primary_key = schema["primary_key"] or "Id"
+            columns = mirror_columns(schema["column_types"], primary_key)
+            updated_field = find_updated_field(schema)
+            state = self._state.setdefault(table_id, {"refreshed_at": None, "dirty": False, "writes": 0})
+            # 只有刷新成功、且期间没有新的写操作时才清除 dirty 标记
+            writes = state["writes"]
+            incremental = (
+                not full
+                and state["refreshed_at"] is not None
+                and updated_field is not None
+                and state.get("updated_field") == updated_field
+                and state.get("columns") == columns
+            )
+            
+            changed = 0
+            if incremental:
+                while True:
+                    changes = await read_changes(
+                        table_id,
+                        updated_field,
+                        primary_key,
+                        state["updated_at"],
+                        state["after"],
+                        self.page_size,
+                        self.page_size * 10,
+                        null_after=state["null_after"]
+                    )
+                    if not changes["success"]:
+                        self.errors += 1
+                        return changes
+                    self._store(table_id, columns, changes["list"], replace_all=False)
+                    changed += len(changes["list"])
+                    state["updated_at"], state["after"] = changes["updated_at"], changes["after"]
+                    state["null_after"] = changes["null_after"]
+                    if not changes["has_more"]:
+                        break
+                # 增量同步看不到删除，行数不一致时全量重新加载
+                probe = await self.client.get_records(table_id, 1, 0, fields=primary_key)
+                total_rows = probe["data"].get("pageInfo", {}).get("totalRows") if probe["success"] else None
+                incremental = total_rows is None or total_rows == self._count(table_id)
+            
+            mode = "incremental"
+            if not incremental:
+                mode = "full"
+                rows: List[Dict[str, Any]] = []
+                async for result in self.client.iter_record_pages_keyset(table_id, primary_key, self.page_size):
+                    if not result["success"]:
+                        self.errors += 1
+                        return result
+                    rows.extend(result["data"].get("list", []))
+                self._store(table_id, columns, rows, replace_all=True)
+                changed = len(rows)
+                timestamps = [row[updated_field] for row in rows if updated_field and row.get(updated_field) is not None]
+                state["updated_at"], state["after"] = (max(timestamps) if timestamps else None), None
+                # 没有修改时间的行之后按主键增量读取
+                null_keys = [row[primary_key] for row in rows if updated_field and row.get(updated_field) is None]
+                state["null_after"] = max(null_keys) if null_keys else None
+                self.full_reloads += 1
+            
+            state.update({
+                "refreshed_at": time.monotonic(),
+                "updated_field": updated_field,
+                "columns": columns
+            })
+            if state["writes"] == writes:
+                state["dirty"] = False
+            self.refreshes += 1
+            return {
+                "success": True,
+                "mode": mode,
+                "changed": changed,
+                "rows": self._count(table_id),
+                "message": f"Refreshed the local mirror of table {table_id} ({mode})"
+            }
+    
+    async def run(self) -> None:
+        """Refresh every mirrored table, then again every refresh_interval seconds (runs until cancelled)"""
+        while True:
+            for table_id in self.table_ids:
+                try:
+                    await self.refresh(table_id)
+                except Exception:
+                    self.errors += 1
+            await asyncio.sleep(self.refresh_interval)
+    
+    async def query(
+        self,
+        table_id: str,
+        limit: int = 25,
+        offset: int = 0,
+        where: Optional[str] = None,
+        sort: Optional[Union[str, List[str]]] = None,
+        fields: Optional[Union[str, List[str]]] = None,
+        view_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer a get_records() query from the mirror.
+        
+        Returns a result shaped like get_records(), or None when the table is
+        not mirrored, the mirror is too old, or the query needs NocoDB
+        (views, unsupported filters).
+        """
+        if table_id not in self.table_ids:
+            return None
+        state = self._state.get(table_id)
+        if state is None or state["refreshed_at"] is None or view_id:
+            self.fallbacks += 1
+            return None
+        if state["dirty"]:
+            # 刷新失败（包括抛出异常）时不能用写入前的数据回答
+            try:
+                refreshed = (await self.refresh(table_id))["success"]
+            except Exception:
+                self.errors += 1
+                refreshed = False
+            if not refreshed or state["dirty"]:
+                self.fallbacks += 1
+                return None
+        if time.monotonic() - state["refreshed_at"] > self.max_staleness:
+            self.fallbacks += 1
+            return None
+        
+        columns = state["columns"]
+        try:
+            condition, params = where_to_sql(where, columns) if where else ("1", [])
+            order = sort_to_sql(sort, columns)
+        except ValueError:
+            self.fallbacks += 1
+            return None
+        
+        db = self._connect()
+        filtered = f"FROM {self._table_name(table_id)} WHERE {condition}"
+        total_rows = db.execute(f"SELECT COUNT(*) {filtered}", params).fetchone()[0]
+        rows = [
+            json_backend.loads(data) for (data,) in db.execute(
+                f"SELECT data {filtered} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            )
+        ]
+        if fields:
+            names = fields.split(",") if isinstance(fields, str) else fields
+            rows = [{name: row[name] for name in names if name in row} for row in rows]
+        self.hits += 1
+        return {
+            "success": True,
+            "data": {
+                "list": rows,
+                "pageInfo": {
+                    "totalRows": total_rows,
+                    "page": offset // limit + 1 if limit else 1,
+                    "pageSize": limit,
+                    "isFirstPage": offset == 0,
+                    "isLastPage": offset + limit >= total_rows
+                }
+            },
+            "message": f"Successfully retrieved {len(rows)} records from the local mirror of table {table_id}"
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return per-table mirror state and hit/fallback counters ({"enabled": False} when no table is mirrored)"""
+        if not self.table_ids:
+            return {"enabled": False}
+        now = time.monotonic()
+        tables = {}
+        for table_id in self.table_ids:
+            state = self._state.get(table_id, {})
+            refreshed_at = state.get("refreshed_at")
+            tables[table_id] = {
+                "rows": self._count(table_id) if refreshed_at is not None else 0,
+                "age": round(now - refreshed_at, 3) if refreshed_at is not None else None,
+                "stale": refreshed_at is None or now - refreshed_at > self.max_staleness,
+                "watermark": state.get("updated_at")
+            }
+        return {
+            "enabled": True,
+            "path": self.path,
+            "refresh_interval": self.refresh_interval,
+            "max_staleness": self.max_staleness,
+            "tables": tables,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "refreshes": self.refreshes,
+            "full_reloads": self.full_reloads,
+            "errors": self.errors
+        }
+
+table_mirror = TableMirror(
+    nocodb_client,
+    table_metadata,
+    NOCODB_MIRROR_TABLES,
+    path=NOCODB_MIRROR_PATH,
+    refresh_interval=NOCODB_MIRROR_REFRESH_INTERVAL,
+    max_staleness=NOCODB_MIRROR_MAX_STALENESS
+)
+
+def record_key(value: Any) -> str:
+    """Normalize a key value so that 42, 42.0 and "42" match when looking records up"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+async def find_existing_records(
+    table_id: str,
+    key_field: str,
+    primary_key: str,
+    keys: List[Any],
+    batch_size: int = 100,
+    concurrency: int = 4
+) -> Dict[str, Any]:
+    """
+    Look up which key values already exist in a table.
+    
+    Keys are checked batch_size at a time with one "(key,eq,a)~or(key,eq,b)..."
+    query per batch, up to `concurrency` queries at once. Lookups always go
+    to NocoDB, never to the local mirror, whose view may be stale. Returns {"success", "matches", "requests"} where
+    matches maps record_key(value) to the primary keys of the rows holding it.
+    """
+    batch_size = max(1, batch_size)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    fields = with_primary_key(key_field, primary_key)
+    matches: Dict[str, List[Any]] = {}
+    requests = 0
+    
+    async def lookup(chunk: List[Any]) -> Optional[Dict[str, Any]]:
+        nonlocal requests
+        where = "~or".join(f"({key_field},eq,{value})" for value in chunk)
+        limit = min(1000, 2 * len(chunk))
+        offset = 0
+        async with semaphore:
+            while True:
+                requests += 1
+                result = await nocodb_client.get_records(table_id, limit, offset, where=where, fields=fields)
+                if not result["success"]:
+                    return result
+                page = result["data"].get("list", [])
+                for row in page:
+                    matches.setdefault(record_key(row.get(key_field)), []).append(row.get(primary_key))
+                if not page or result["data"].get("pageInfo", {}).get("isLastPage", len(page) < limit):
+                    return None
+                offset += len(page)
+    
+    failures = await asyncio.gather(*(
+        lookup(keys[start:start + batch_size]) for start in range(0, len(keys), batch_size)
+    ))
+    for failure in failures:
+        if failure is not None:
+            failure["message"] = "Failed to look up existing records"
+            return failure
+    return {"success": True, "matches": matches, "requests": requests}
 
-# Initialize NocoDB client
-nocodb_client = NocoDBClient(NOCODB_HOST, NOCODB_TOKEN)
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Open the shared NocoDB connection pool on startup and close it on shutdown"""
+    await nocodb_client.start()
+    # 后台定时刷新本地镜像
+    refresher = asyncio.create_task(table_mirror.run()) if table_mirror.table_ids else None
+    try:
+        yield
+    finally:
+        if refresher is not None:
+            refresher.cancel()
+            try:
+                await refresher
+            except asyncio.CancelledError:
+                pass
+        await nocodb_client.aclose()
+        table_mirror.close()
+
+# Initialize FastMCP
+mcp = FastMCP("NocoDB MCP Server", lifespan=server_lifespan)
 
 @mcp.tool()
 async def create_table_records(
     table_id: str,
-    records: Union[Dict[str, Any], List[Dict[str, Any]], str]
+    records: Union[Dict[str, Any], List[Dict[str, Any]], str],
+    batch_size: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    validate: Optional[bool] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Create new records in a NocoDB table.
     
+    Large inputs are split into chunks of batch_size records that are sent
+    concurrently; the response then includes a per-chunk report with the row
+    range each chunk covered, so failed chunks can be retried on their own.
+    
     Args:
         table_id: The ID of the table to create records in
         records: A single record object, array of record objects, or JSON string to create
+        batch_size: Records per request (default: NOCODB_BATCH_SIZE)
+        max_concurrency: Maximum chunk requests in flight (default: NOCODB_WRITE_CONCURRENCY)
+        validate: Check and coerce field types against the table schema before sending
+                  (default: NOCODB_VALIDATE_RECORDS)
+        timeout: Per-request timeout in seconds for this call (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for this call, covering retries and every request it makes
     
     Returns:
         Dictionary containing success status, created record IDs, and any error messages
@@ -213,7 +2704,7 @@ async def create_table_records(
         if isinstance(records, str):
             try:
                 import json
-                processed_records = json.loads(records)
+                processed_records = json_backend.loads(records)
             except json.JSONDecodeError as json_error:
                 return {
                     "success": False,
@@ -229,7 +2720,29 @@ async def create_table_records(
                 "message": "Invalid records data type"
             }
         
-        result = await nocodb_client.create_records(table_id, processed_records)
+        # 过滤该表的只读/虚拟列（公式、查找、汇总等），减少无效的请求数据
+        with call_limits(timeout, deadline):
+            readonly_fields = await table_metadata.get_readonly_fields(table_id)
+            filtered_records = filter_readonly_fields(
+                processed_records,
+                in_place=isinstance(records, str),
+                readonly_fields=readonly_fields
+            )
+            
+            # 按表结构校验字段类型，不合法的记录在发送前就被拒绝
+            if validate if validate is not None else NOCODB_VALIDATE_RECORDS:
+                invalid = await validate_table_records(
+                    table_id, filtered_records, require_primary_key=False, required=validate is not None
+                )
+                if invalid is not None:
+                    return invalid
+            
+            result = await nocodb_client.bulk_create_records(
+                table_id,
+                filtered_records,
+                batch_size or NOCODB_BATCH_SIZE,
+                max_concurrency or NOCODB_WRITE_CONCURRENCY
+            )
         return result
     except Exception as e:
         return {
@@ -242,22 +2755,396 @@ async def create_table_records(
 async def get_table_records(
     table_id: str,
     limit: int = 25,
-    offset: int = 0
+    offset: int = 0,
+    where: Optional[str] = None,
+    sort: Optional[Union[str, List[str]]] = None,
+    fields: Optional[Union[str, List[str]]] = None,
+    view_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    keyset: bool = False,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    max_field_chars: Optional[int] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Retrieve records from a NocoDB table.
     
+    Filtering, sorting and column selection are done by NocoDB, so only the
+    requested rows and columns are transferred. The response is kept within
+    a size budget: records are added until the byte or approximate token
+    budget is reached, and pageInfo.nextCursor is returned whenever more rows
+    remain. Pass it back as `cursor` to continue with the same query.
+    
+    With keyset=True pages follow the primary key instead of an offset: the
+    cursor remembers the last key returned and the next page asks NocoDB for
+    the rows after it, so deep pages are as fast as the first one and
+    concurrent inserts or deletes do not cause skipped or repeated rows.
+    
     Args:
         table_id: The ID of the table to retrieve records from
         limit: Maximum number of records to retrieve (default: 25)
         offset: Number of records to skip (default: 0)
+        where: NocoDB filter expression, e.g. "(Status,eq,done)~and(Score,gt,80)"
+        sort: Field names to sort by, prefix with "-" for descending, e.g. "-CreatedAt,Title"
+        fields: Field names to return, as a list or comma separated string
+        view_id: ID of a view whose filters, sorts and visible fields should apply
+        cursor: pageInfo.nextCursor from a previous call; replaces offset and the query arguments
+        keyset: Page by primary key instead of offset (sort may only be the primary key, "-" for descending)
+        max_bytes: JSON size budget for the returned records (default: NOCODB_RESPONSE_MAX_BYTES)
+        max_tokens: Approximate token budget for the returned records (default: NOCODB_RESPONSE_MAX_TOKENS)
+        max_field_chars: Shorten longer text/JSON/attachment values to this many characters
+                         (default: NOCODB_FIELD_MAX_CHARS); trimmed records must not be written back as-is
+        timeout: Per-request timeout in seconds for this call (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for this call, covering retries and every request it makes
     
     Returns:
         Dictionary containing success status, retrieved records, and any error messages
     """
     try:
-        result = await nocodb_client.get_records(table_id, limit, offset)
-        return result
+        after = None
+        primary_key = None
+        if cursor:
+            try:
+                state = decode_cursor(cursor, table_id)
+            except ValueError as e:
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "message": "Failed to parse cursor"
+                }
+            where, sort, fields, view_id = state.get("where"), state.get("sort"), state.get("fields"), state.get("view_id")
+            keyset = "after" in state
+            if keyset:
+                after, primary_key = state["after"], state.get("primary_key")
+            else:
+                offset = state.get("offset", 0)
+        
+        with call_limits(timeout, deadline):
+            if keyset:
+                # 按主键分页：排序固定为主键，用 (主键,gt,上一页最后的值) 代替 offset
+                if primary_key is None:
+                    primary_key = await table_metadata.get_primary_key(table_id)
+                try:
+                    descending = parse_keyset_sort(sort, primary_key)
+                except ValueError as e:
+                    return {
+                        "success": False,
+                        "error": str(e),
+                        "message": "Invalid sort for keyset pagination"
+                    }
+                request = {
+                    "limit": limit,
+                    "offset": 0,
+                    "where": NocoDBClient.keyset_where(primary_key, after, where, descending),
+                    "sort": f"-{primary_key}" if descending else primary_key,
+                    "fields": with_primary_key(fields, primary_key),
+                    "view_id": view_id
+                }
+            else:
+                request = {
+                    "limit": limit,
+                    "offset": offset,
+                    "where": where,
+                    "sort": sort,
+                    "fields": fields,
+                    "view_id": view_id
+                }
+            # 镜像表的查询优先由本地 SQLite 回答
+            result = await table_mirror.query(table_id, **request)
+            if result is None:
+                result = await nocodb_client.get_records(table_id, **request)
+        if not result["success"]:
+            return result
+        
+        # 按字节/近似 token 预算截取记录，并截断过长的字段
+        budgets = [
+            budget for budget in (
+                NOCODB_RESPONSE_MAX_BYTES if max_bytes is None else max_bytes,
+                (NOCODB_RESPONSE_MAX_TOKENS if max_tokens is None else max_tokens) * APPROX_BYTES_PER_TOKEN
+            ) if budget > 0
+        ]
+        page = result["data"].get("list", [])
+        records, used_bytes, trimmed_fields, budget_exhausted = fit_records(
+            page,
+            min(budgets) if budgets else 0,
+            NOCODB_FIELD_MAX_CHARS if max_field_chars is None else max_field_chars
+        )
+        
+        page_info = dict(result["data"].get("pageInfo", {}))
+        has_more = budget_exhausted or not page_info.get("isLastPage", len(page) < limit)
+        next_cursor = None
+        if has_more and records:
+            state = {"table": table_id, "where": where, "sort": sort, "fields": fields, "view_id": view_id}
+            if keyset:
+                state.update({"after": records[-1].get(primary_key), "primary_key": primary_key})
+            else:
+                state["offset"] = offset + len(records)
+            next_cursor = encode_cursor(state)
+        page_info.update({
+            "returned": len(records),
+            "bytes": used_bytes or None,
+            "budgetExhausted": budget_exhausted,
+            "trimmedFields": trimmed_fields,
+            "nextCursor": next_cursor
+        })
+        
+        message = f"Successfully retrieved {len(records)} records from table {table_id}"
+        if budget_exhausted:
+            message += f"; {len(page) - len(records)} more on this page left out to stay within the response budget"
+        return {
+            "success": True,
+            "data": {
+                "list": records,
+                "pageInfo": page_info
+            },
+            "message": message
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to retrieve records due to an unexpected error"
+        }
+
+@mcp.tool()
+async def get_all_table_records(
+    table_id: str,
+    page_size: int = 100,
+    max_records: int = 1000,
+    max_bytes: Optional[int] = None,
+    offset: int = 0,
+    concurrency: Optional[int] = None,
+    where: Optional[str] = None,
+    sort: Optional[Union[str, List[str]]] = None,
+    fields: Optional[Union[str, List[str]]] = None,
+    view_id: Optional[str] = None,
+    keyset: bool = False,
+    cursor: Optional[str] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Retrieve many records from a NocoDB table in a single call.
+    
+    Pages are fetched internally until the table is exhausted or a limit is
+    reached. Once the total row count is known the remaining pages are fetched
+    concurrently. When max_bytes is set each page is parsed as it streams in,
+    so reading stops (and the rest of the page is not downloaded) as soon as
+    the budget is hit; when deadline is set pages are read one after another
+    (with the next page prefetched) and the records read so far are returned
+    once it passes. With keyset=True pages follow the primary key instead of
+    an offset, which keeps deep scans at a constant cost per page.
+    
+    Args:
+        table_id: The ID of the table to retrieve records from
+        page_size: Number of records requested per NocoDB page (default: 100)
+        max_records: Maximum total number of records to return (default: 1000)
+        max_bytes: Optional budget for the JSON size of the returned records;
+                   the first record is always returned so the cursor advances
+        offset: Number of records to skip before reading (default: 0)
+        concurrency: Maximum number of pages fetched at the same time
+                     (default: NOCODB_FETCH_CONCURRENCY, 1 disables parallel fetching)
+        where: NocoDB filter expression, e.g. "(Status,eq,done)"
+        sort: Field names to sort by, prefix with "-" for descending
+        fields: Field names to return, as a list or comma separated string
+        view_id: ID of a view whose filters, sorts and visible fields should apply
+        keyset: Page by primary key instead of offset (sort may only be the primary key, "-" for descending)
+        cursor: pageInfo.nextCursor from a previous call; replaces offset and the query arguments
+        timeout: Per-request timeout in seconds for this call (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for this call, covering retries and every request it makes
+    
+    Returns:
+        Dictionary containing success status, the collected records, and a
+        pageInfo summary with the offset (or cursor) to continue from
+    """
+    try:
+        after = None
+        primary_key = None
+        if cursor:
+            try:
+                state = decode_cursor(cursor, table_id)
+            except ValueError as e:
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "message": "Failed to parse cursor"
+                }
+            where, sort, fields, view_id = state.get("where"), state.get("sort"), state.get("fields"), state.get("view_id")
+            keyset = "after" in state
+            if keyset:
+                after, primary_key = state["after"], state.get("primary_key")
+            else:
+                offset = state.get("offset", 0)
+        
+        records: List[Dict[str, Any]] = []
+        total_rows = None
+        pages = 0
+        used_bytes = 0
+        next_offset = offset
+        last_page_reached = False
+        complete = True
+        budget_exhausted = False
+        deadline_exceeded = False
+        if concurrency is None:
+            concurrency = NOCODB_FETCH_CONCURRENCY
+        query = {"where": where, "sort": sort, "fields": fields, "view_id": view_id}
+        
+        with call_limits(timeout, deadline):
+            if keyset and primary_key is None:
+                primary_key = await table_metadata.get_primary_key(table_id)
+            
+            if not keyset and max_bytes is None and deadline is None and concurrency > 1:
+                result = await nocodb_client.get_records_parallel(
+                    table_id, page_size, offset, max_records, concurrency, **query
+                )
+                if not result["success"]:
+                    result["next_offset"] = offset
+                    return result
+                records = result["data"]["list"]
+                total_rows = result["data"]["pageInfo"]["totalRows"]
+                pages = result["data"]["pageInfo"]["pages"]
+                next_offset = offset + len(records)
+            else:
+                try:
+                    if keyset:
+                        try:
+                            descending = parse_keyset_sort(sort, primary_key)
+                        except ValueError as e:
+                            return {
+                                "success": False,
+                                "error": str(e),
+                                "message": "Invalid sort for keyset pagination"
+                            }
+                        pager = nocodb_client.iter_record_pages_keyset(
+                            table_id,
+                            primary_key,
+                            page_size,
+                            after,
+                            max_records,
+                            descending,
+                            where=where,
+                            fields=with_primary_key(fields, primary_key),
+                            view_id=view_id
+                        )
+                        try:
+                            async for page in pager:
+                                if not page["success"]:
+                                    page["records_fetched"] = len(records)
+                                    return page
+                                
+                                pages += 1
+                                page_info = page["data"].get("pageInfo", {})
+                                if total_rows is None:
+                                    total_rows = page_info.get("totalRows")
+                                page_records = page["data"].get("list", [])
+                                for record in page_records:
+                                    if max_bytes is not None:
+                                        size = len(json_backend.dumps(record))
+                                        # 第一条记录总是返回，保证游标前进
+                                        if records and used_bytes + size > max_bytes:
+                                            budget_exhausted = True
+                                            break
+                                        used_bytes += size
+                                    records.append(record)
+                                    after = record.get(primary_key)
+                                if budget_exhausted:
+                                    complete = False
+                                    break
+                                last_page_reached = not page_records or page_info.get("isLastPage", False)
+                        finally:
+                            await pager.aclose()
+                    elif max_bytes is not None:
+                        # 按字节预算读取时流式解析每一页，预算用完即停止下载剩余数据
+                        while len(records) < max_records and not budget_exhausted:
+                            limit = min(page_size, max_records - len(records))
+                            async with nocodb_client.stream_records(table_id, limit, next_offset, **query) as stream:
+                                if not stream.success:
+                                    return {
+                                        "success": False,
+                                        "error": stream.error,
+                                        "status_code": stream.status_code,
+                                        "records_fetched": len(records),
+                                        "next_offset": next_offset
+                                    }
+                                
+                                async for record in stream:
+                                    size = len(json_backend.dumps(record))
+                                    if records and used_bytes + size > max_bytes:
+                                        budget_exhausted = True
+                                        break
+                                    used_bytes += size
+                                    records.append(record)
+                                    next_offset += 1
+                                
+                                pages += 1
+                                total_rows = stream.page_info.get("totalRows", total_rows)
+                                is_last_page = stream.page_info.get("isLastPage", stream.rows < limit)
+                            if is_last_page or stream.rows == 0:
+                                break
+                        if budget_exhausted:
+                            complete = False
+                    else:
+                        pager = nocodb_client.iter_record_pages(table_id, page_size, offset, max_records, **query)
+                        try:
+                            async for page in pager:
+                                if not page["success"]:
+                                    page["records_fetched"] = len(records)
+                                    page["next_offset"] = next_offset
+                                    return page
+                                
+                                pages += 1
+                                page_info = page["data"].get("pageInfo", {})
+                                total_rows = page_info.get("totalRows", total_rows)
+                                page_records = page["data"].get("list", [])
+                                records.extend(page_records)
+                                next_offset += len(page_records)
+                        finally:
+                            await pager.aclose()
+                except DeadlineExceededError:
+                    # 截止时间已到：返回已读取的记录，调用方可从 nextOffset 继续
+                    if not records:
+                        raise
+                    deadline_exceeded = True
+                    complete = False
+        
+        if keyset:
+            # totalRows 是游标之后符合条件的行数
+            complete = complete and last_page_reached
+        elif total_rows is not None:
+            complete = complete and next_offset >= total_rows
+        elif len(records) >= max_records:
+            complete = False
+        
+        next_cursor = None
+        if not complete:
+            state = {"table": table_id, "where": where, "sort": sort, "fields": fields, "view_id": view_id}
+            if keyset:
+                state.update({"after": after, "primary_key": primary_key})
+            else:
+                state["offset"] = next_offset
+            next_cursor = encode_cursor(state)
+        
+        message = f"Successfully retrieved {len(records)} records from table {table_id}"
+        if deadline_exceeded:
+            message += "; stopped at the deadline"
+        
+        return {
+            "success": True,
+            "data": {
+                "list": records,
+                "pageInfo": {
+                    "totalRows": total_rows,
+                    "pages": pages,
+                    "returned": len(records),
+                    "nextOffset": None if complete or keyset else next_offset,
+                    "nextCursor": next_cursor,
+                    "isComplete": complete
+                }
+            },
+            "message": message
+        }
     except Exception as e:
         return {
             "success": False,
@@ -265,17 +3152,147 @@ async def get_table_records(
             "message": "Failed to retrieve records due to an unexpected error"
         }
 
+@mcp.tool()
+async def sync_table_changes(
+    table_id: str,
+    watermark: Optional[str] = None,
+    updated_field: Optional[str] = None,
+    page_size: int = 100,
+    max_records: int = 1000,
+    where: Optional[str] = None,
+    fields: Optional[Union[str, List[str]]] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Return the records changed since a watermark, and a new watermark.
+    
+    Rows are read in order of their last modification time (UpdatedAt /
+    nc_updated_at or a LastModifiedTime column), so each poll only
+    transfers rows changed since the previous one. Without a watermark all
+    rows are returned, oldest change first. Rows with an empty modification
+    time come first, ordered by primary key; after the first sync only
+    those with a larger primary key are returned. When hasMore is true,
+    call again with the returned watermark right away. Deleted rows are not
+    reported.
+    
+    Args:
+        table_id: The ID of the table to read changes from
+        watermark: The watermark returned by the previous call, or an ISO timestamp
+        updated_field: Column holding the modification time (default: detected from the table schema)
+        page_size: Number of records requested per NocoDB page (default: 100)
+        max_records: Maximum number of changed records to return (default: 1000)
+        where: Additional NocoDB filter expression the changed rows must match
+        fields: Field names to return (the modification time and primary key are always included)
+        timeout: Per-request timeout in seconds for this call (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for this call, covering retries and every request it makes
+    
+    Returns:
+        Dictionary containing success status, the changed records, the new
+        watermark and whether more changes are waiting
+    """
+    try:
+        updated_at = None
+        after = None
+        null_after = None
+        if watermark:
+            try:
+                state = decode_cursor(watermark, table_id)
+                updated_at, after, null_after = state.get("updated_at"), state.get("after"), state.get("null_after")
+                updated_field = updated_field or state.get("updated_field")
+            except ValueError:
+                # 也接受直接传入的时间戳
+                try:
+                    datetime.fromisoformat(watermark.strip().replace("Z", "+00:00"))
+                except ValueError:
+                    return {
+                        "success": False,
+                        "error": "watermark must be a watermark returned by sync_table_changes or an ISO timestamp",
+                        "message": "Invalid watermark"
+                    }
+                updated_at = watermark.strip()
+        
+        with call_limits(timeout, deadline):
+            schema = await table_metadata.get(table_id)
+            primary_key = schema["primary_key"] if schema is not None and schema["primary_key"] else "Id"
+            updated_field = updated_field or find_updated_field(schema)
+            if updated_field is None:
+                return {
+                    "success": False,
+                    "error": f"Table {table_id} has no UpdatedAt or LastModifiedTime column; pass updated_field",
+                    "message": "Failed to find the modification time column"
+                }
+            
+            changes = await read_changes(
+                table_id,
+                updated_field,
+                primary_key,
+                updated_at,
+                after,
+                page_size,
+                max_records,
+                where=where,
+                fields=with_primary_key(with_primary_key(fields, primary_key), updated_field),
+                null_after=null_after
+            )
+            if not changes["success"]:
+                return changes
+            records = changes["list"]
+            updated_at, after, has_more = changes["updated_at"], changes["after"], changes["has_more"]
+            null_after = changes["null_after"]
+        
+        new_watermark = None
+        if updated_at is not None or null_after is not None:
+            new_watermark = encode_cursor({
+                "table": table_id,
+                "updated_field": updated_field,
+                "updated_at": updated_at,
+                "after": after,
+                "null_after": null_after
+            })
+        return {
+            "success": True,
+            "data": {
+                "list": records,
+                "watermark": new_watermark,
+                "updatedAt": updated_at,
+                "hasMore": has_more
+            },
+            "message": f"Found {len(records)} changed record(s) in table {table_id}"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to sync table changes due to an unexpected error"
+        }
+
 @mcp.tool()
 async def update_table_records(
     table_id: str,
-    records: Union[Dict[str, Any], List[Dict[str, Any]], str]
+    records: Union[Dict[str, Any], List[Dict[str, Any]], str],
+    batch_size: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    validate: Optional[bool] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Update records in a NocoDB table (batch update).
     
+    Large inputs are split into chunks of batch_size records that are sent
+    concurrently; the response then includes per-chunk status and the
+    aggregate throughput (rows_per_second).
+    
     Args:
         table_id: The ID of the table containing the records
         records: A single record object (must include id), array of record objects, or JSON string
+        batch_size: Records per request (default: NOCODB_BATCH_SIZE)
+        max_concurrency: Maximum chunk requests in flight (default: NOCODB_WRITE_CONCURRENCY)
+        validate: Check and coerce field types against the table schema before sending
+                  (default: NOCODB_VALIDATE_RECORDS)
+        timeout: Per-request timeout in seconds for this call (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for this call, covering retries and every request it makes
     
     Returns:
         Dictionary containing success status, updated record data, and any error messages
@@ -288,7 +3305,7 @@ async def update_table_records(
         if isinstance(records, str):
             try:
                 import json
-                processed_records = json.loads(records)
+                processed_records = json_backend.loads(records)
             except json.JSONDecodeError as json_error:
                 return {
                     "success": False,
@@ -314,10 +3331,30 @@ async def update_table_records(
                     "message": "Invalid record format - missing id/Id field"
                 }
         
-        # 过滤只读字段，防止更新失败
-        filtered_records = filter_readonly_fields(processed_records)
-        
-        result = await nocodb_client.update_records(table_id, filtered_records)
+        # 过滤只读字段和该表的只读/虚拟列，防止更新失败
+        # （从JSON字符串解析出的记录归本函数所有，可以原地修改）
+        with call_limits(timeout, deadline):
+            readonly_fields = await table_metadata.get_readonly_fields(table_id)
+            filtered_records = filter_readonly_fields(
+                processed_records,
+                in_place=isinstance(records, str),
+                readonly_fields=readonly_fields
+            )
+            
+            # 按表结构校验字段类型，不合法的记录在发送前就被拒绝
+            if validate if validate is not None else NOCODB_VALIDATE_RECORDS:
+                invalid = await validate_table_records(
+                    table_id, filtered_records, require_primary_key=True, required=validate is not None
+                )
+                if invalid is not None:
+                    return invalid
+            
+            result = await nocodb_client.bulk_update_records(
+                table_id,
+                filtered_records,
+                batch_size or NOCODB_BATCH_SIZE,
+                max_concurrency or NOCODB_WRITE_CONCURRENCY
+            )
         return result
     except Exception as e:
         return {
@@ -326,10 +3363,180 @@ async def update_table_records(
             "message": "Failed to update records due to an unexpected error"
         }
 
+@mcp.tool()
+async def upsert_table_records(
+    table_id: str,
+    records: Union[Dict[str, Any], List[Dict[str, Any]], str],
+    key_field: Optional[str] = None,
+    lookup_batch_size: int = 100,
+    batch_size: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    validate: Optional[bool] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Insert or update records matched on a key column.
+    
+    Existence is resolved for the whole batch with one lookup query per
+    lookup_batch_size keys instead of one per record; records whose key is
+    found are updated in bulk, the others are created in bulk, and both
+    writes run concurrently. Keys must be unique within the batch and within
+    the table; nothing is written when they are not.
+    
+    Args:
+        table_id: The ID of the table to upsert records into
+        records: A single record object, array of record objects, or JSON string
+        key_field: Column identifying a record (default: the primary key, also accepted as id/Id;
+                   records without it are created)
+        lookup_batch_size: Keys checked per lookup query (default: 100)
+        batch_size: Records per write request (default: NOCODB_BATCH_SIZE)
+        max_concurrency: Maximum lookup or write requests in flight (default: NOCODB_WRITE_CONCURRENCY)
+        validate: Check and coerce field types against the table schema before sending
+                  (default: NOCODB_VALIDATE_RECORDS)
+        timeout: Per-request timeout in seconds for this call (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for this call, covering retries and every request it makes
+    
+    Returns:
+        Dictionary containing success status, the create and update results, and any error messages
+    """
+    try:
+        # 处理records参数的保护逻辑
+        processed_records = records
+        if isinstance(records, str):
+            try:
+                processed_records = json_backend.loads(records)
+            except json.JSONDecodeError as json_error:
+                return {
+                    "success": False,
+                    "error": f"Invalid JSON string: {str(json_error)}",
+                    "message": "Failed to parse records JSON string"
+                }
+        if isinstance(processed_records, dict):
+            processed_records = [processed_records]
+        if not isinstance(processed_records, list) or not all(isinstance(record, dict) for record in processed_records):
+            return {
+                "success": False,
+                "error": "Records must be a dictionary, list of dictionaries, or valid JSON string",
+                "message": "Invalid records data type"
+            }
+        
+        with call_limits(timeout, deadline):
+            # 更新需要主键，无法确定主键时不能猜测
+            primary_key = await table_metadata.get_primary_key(table_id, default=None)
+            if primary_key is None:
+                return {
+                    "success": False,
+                    "error": f"Could not determine the primary key of table {table_id}",
+                    "message": "Failed to read the table schema - nothing was written"
+                }
+            key_field = key_field or primary_key
+            readonly_fields = await table_metadata.get_readonly_fields(table_id)
+            filtered_records = filter_readonly_fields(
+                processed_records,
+                in_place=isinstance(records, str),
+                readonly_fields=readonly_fields
+            )
+            
+            if validate if validate is not None else NOCODB_VALIDATE_RECORDS:
+                invalid = await validate_table_records(
+                    table_id, filtered_records, require_primary_key=False, required=validate is not None
+                )
+                if invalid is not None:
+                    return invalid
+            
+            # 与其他工具一致，主键也可以用 id / Id 指定
+            if key_field == primary_key:
+                for record in filtered_records:
+                    if primary_key not in record:
+                        for alias in ("id", "Id"):
+                            if alias in record:
+                                record[primary_key] = record.pop(alias)
+                                break
+            
+            # 检查键值：除主键外必须提供，批次内不能重复，且不能包含 where 语法字符
+            keys: List[Any] = []
+            seen: Set[str] = set()
+            for index, record in enumerate(filtered_records):
+                value = record.get(key_field)
+                if value is None:
+                    if key_field == primary_key:
+                        continue
+                    return {
+                        "success": False,
+                        "error": f"Record {index} has no value for key field {key_field!r}",
+                        "message": "Invalid records - missing key"
+                    }
+                key = record_key(value)
+                if key in seen or ")" in key or isinstance(value, (dict, list)):
+                    return {
+                        "success": False,
+                        "error": f"Record {index} has a duplicate or unsupported {key_field!r} value: {value!r}",
+                        "message": "Invalid records - bad key"
+                    }
+                seen.add(key)
+                keys.append(value)
+            
+            concurrency = max_concurrency or NOCODB_WRITE_CONCURRENCY
+            existing = await find_existing_records(table_id, key_field, primary_key, keys, lookup_batch_size, concurrency)
+            if not existing["success"]:
+                return existing
+            matches = existing["matches"]
+            ambiguous = [key for key in seen if len(matches.get(key, [])) > 1]
+            if ambiguous:
+                return {
+                    "success": False,
+                    "error": f"Several rows share the {key_field!r} values {sorted(ambiguous)[:20]}",
+                    "message": "Ambiguous key - nothing was written"
+                }
+            
+            # 已存在的记录按主键更新，其余记录创建
+            to_create: List[Dict[str, Any]] = []
+            to_update: List[Dict[str, Any]] = []
+            for record in filtered_records:
+                found = matches.get(record_key(record.get(key_field)))
+                if found:
+                    to_update.append({**record, primary_key: found[0]})
+                else:
+                    to_create.append(record)
+            
+            async def skip() -> None:
+                return None
+            
+            size = batch_size or NOCODB_BATCH_SIZE
+            created, updated = await asyncio.gather(
+                nocodb_client.bulk_create_records(table_id, to_create, size, concurrency) if to_create else skip(),
+                nocodb_client.bulk_update_records(table_id, to_update, size, concurrency) if to_update else skip()
+            )
+        
+        failed = [result for result in (created, updated) if result is not None and not result["success"]]
+        message = f"Upserted {len(filtered_records)} record(s): {len(to_create)} created, {len(to_update)} updated"
+        if failed:
+            message += "; some writes failed"
+        return {
+            "success": not failed,
+            "data": {
+                "created": created,
+                "updated": updated
+            },
+            "created_count": len(to_create),
+            "updated_count": len(to_update),
+            "lookup_requests": existing["requests"],
+            "message": message
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to upsert records due to an unexpected error"
+        }
+
 @mcp.tool()
 async def delete_table_record(
     table_id: str,
-    record_id: str
+    record_id: str,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Delete a specific record from a NocoDB table.
@@ -337,12 +3544,15 @@ async def delete_table_record(
     Args:
         table_id: The ID of the table containing the record
         record_id: The ID of the record to delete
+        timeout: Per-request timeout in seconds for this call (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for this call, covering retries and every request it makes
     
     Returns:
         Dictionary containing success status and any error messages
     """
     try:
-        result = await nocodb_client.delete_record(table_id, record_id)
+        with call_limits(timeout, deadline):
+            result = await nocodb_client.delete_record(table_id, record_id)
         return result
     except Exception as e:
         return {
@@ -351,6 +3561,295 @@ async def delete_table_record(
             "message": "Failed to delete record due to an unexpected error"
         }
 
+@mcp.tool()
+async def delete_table_records(
+    table_id: str,
+    record_ids: Union[List[Union[str, int, Dict[str, Any]]], str],
+    batch_size: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Delete multiple records from a NocoDB table.
+    
+    Uses NocoDB's batch delete endpoint; long id lists are split into chunks of
+    batch_size ids that are sent concurrently.
+    
+    Args:
+        table_id: The ID of the table containing the records
+        record_ids: An array of record IDs (or record objects with id/Id), or a JSON string of it
+        batch_size: Record IDs per request (default: NOCODB_BATCH_SIZE)
+        max_concurrency: Maximum chunk requests in flight (default: NOCODB_WRITE_CONCURRENCY)
+        timeout: Per-request timeout in seconds for this call (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for this call, covering retries and every request it makes
+    
+    Returns:
+        Dictionary containing success status, deleted record IDs, and any error messages
+    """
+    try:
+        # 处理record_ids参数的保护逻辑
+        processed_ids = record_ids
+        
+        # 如果record_ids是字符串，尝试解析为JSON
+        if isinstance(record_ids, str):
+            try:
+                processed_ids = json_backend.loads(record_ids)
+            except json.JSONDecodeError as json_error:
+                return {
+                    "success": False,
+                    "error": f"Invalid JSON string: {str(json_error)}",
+                    "message": "Failed to parse record_ids JSON string"
+                }
+        
+        if not isinstance(processed_ids, list):
+            processed_ids = [processed_ids]
+        
+        # 支持直接传入ID，或包含'id'/'Id'字段的记录对象
+        ids_to_delete = []
+        for item in processed_ids:
+            if isinstance(item, dict):
+                item = item.get("Id", item.get("id"))
+            if item is None or isinstance(item, (dict, list, bool)):
+                return {
+                    "success": False,
+                    "error": "Each record ID must be a string, a number, or an object containing an 'id' or 'Id' field",
+                    "message": "Invalid record_ids format"
+                }
+            ids_to_delete.append(item)
+        
+        if not ids_to_delete:
+            return {
+                "success": False,
+                "error": "record_ids must not be empty",
+                "message": "No records to delete"
+            }
+        
+        with call_limits(timeout, deadline):
+            # 表结构不可读时按 "Id" 删除：主键名错误时 NocoDB 会拒绝请求，不会删错记录
+            result = await nocodb_client.bulk_delete_records(
+                table_id,
+                ids_to_delete,
+                batch_size or NOCODB_BATCH_SIZE,
+                max_concurrency or NOCODB_WRITE_CONCURRENCY,
+                await table_metadata.get_primary_key(table_id)
+            )
+        return result
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to delete records due to an unexpected error"
+        }
+
+@mcp.tool()
+async def refresh_table_metadata(
+    table_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Invalidate cached table metadata and reload it from NocoDB.
+    
+    Call this after changing a table's columns so that readonly filtering and
+    other schema-aware features pick up the new schema immediately.
+    
+    Args:
+        table_id: The ID of the table to refresh; omit to clear the whole cache
+    
+    Returns:
+        Dictionary containing success status and the reloaded schema summary
+    """
+    try:
+        if table_id is None:
+            dropped = table_metadata.invalidate()
+            return {
+                "success": True,
+                "message": f"Cleared cached metadata for {dropped} table(s)"
+            }
+        
+        table_metadata.invalidate(table_id)
+        schema = await table_metadata.get(table_id)
+        if schema is None:
+            return {
+                "success": False,
+                "error": f"Could not read metadata for table {table_id}",
+                "message": "Failed to refresh table metadata"
+            }
+        return {
+            "success": True,
+            "data": {
+                "table_id": table_id,
+                "title": schema["title"],
+                "primary_key": schema["primary_key"],
+                "display_value": schema["display_value"],
+                "column_types": schema["column_types"],
+                "readonly_columns": sorted(schema["readonly_fields"] - READONLY_FIELDS)
+            },
+            "message": f"Successfully refreshed metadata for table {table_id}"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to refresh table metadata due to an unexpected error"
+        }
+
+# batch_operations 支持的操作及对应的工具
+BATCH_OPERATIONS: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+    "create": create_table_records,
+    "read": get_table_records,
+    "read_all": get_all_table_records,
+    "sync": sync_table_changes,
+    "update": update_table_records,
+    "upsert": upsert_table_records,
+    "delete": delete_table_records
+}
+
+@mcp.tool()
+async def batch_operations(
+    operations: Union[List[Dict[str, Any]], str],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Run several create/read/update/delete operations, possibly on different tables, in one call.
+    
+    Each operation is an object with "op" (create, read, read_all, sync,
+    update, upsert or delete), "table_id" and the arguments of the matching
+    tool (e.g. "records", "where", "record_ids"). Operations run
+    concurrently through the shared connection pool unless one lists others
+    in "depends_on"; it then starts after they succeed and is skipped if any
+    of them fails. A depends_on entry refers to the operation whose "id"
+    equals it (compared as strings); only when no id matches is an integer
+    taken as a zero-based position in the array. Ids must be unique. A failing operation
+    does not affect the others. Results are returned in input order.
+    
+    Args:
+        operations: Array of operation objects, or its JSON string
+        max_concurrency: Maximum operations running at once (default: NOCODB_WRITE_CONCURRENCY)
+        timeout: Per-request timeout in seconds for every operation (default: the operation's configured timeout)
+        deadline: Overall time budget in seconds for the whole batch
+    
+    Returns:
+        Dictionary containing overall success status and one result per operation
+    """
+    try:
+        processed_operations = operations
+        if isinstance(operations, str):
+            try:
+                processed_operations = json_backend.loads(operations)
+            except json.JSONDecodeError as json_error:
+                return {
+                    "success": False,
+                    "error": f"Invalid JSON string: {str(json_error)}",
+                    "message": "Failed to parse operations JSON string"
+                }
+        if isinstance(processed_operations, dict):
+            processed_operations = [processed_operations]
+        if not isinstance(processed_operations, list) or not processed_operations:
+            return {
+                "success": False,
+                "error": "operations must be a non-empty array of operation objects, or its JSON string",
+                "message": "Invalid operations"
+            }
+        
+        # 检查每个操作，并把 depends_on 解析为位置
+        names: Dict[str, int] = {}
+        for index, operation in enumerate(processed_operations):
+            if not isinstance(operation, dict) or operation.get("op") not in BATCH_OPERATIONS or not operation.get("table_id"):
+                return {
+                    "success": False,
+                    "error": f"Operation {index} must be an object with a table_id and an op in {sorted(BATCH_OPERATIONS)}",
+                    "message": "Invalid operations"
+                }
+            if operation.get("id") is not None:
+                if str(operation["id"]) in names:
+                    return {
+                        "success": False,
+                        "error": f"Operations {names[str(operation['id'])]} and {index} share the id {operation['id']!r}",
+                        "message": "Invalid operations"
+                    }
+                names[str(operation["id"])] = index
+        dependencies: List[List[int]] = []
+        for index, operation in enumerate(processed_operations):
+            depends_on = operation.get("depends_on") or []
+            if not isinstance(depends_on, list):
+                depends_on = [depends_on]
+            resolved = []
+            for reference in depends_on:
+                # 先按 id 匹配，没有匹配的 id 时整数才表示位置
+                position = names.get(str(reference))
+                if position is None and isinstance(reference, int) and not isinstance(reference, bool):
+                    position = reference
+                if position is None or not 0 <= position < len(processed_operations) or position == index:
+                    return {
+                        "success": False,
+                        "error": f"Operation {index} depends on unknown operation {reference!r}",
+                        "message": "Invalid operation dependencies"
+                    }
+                resolved.append(position)
+            dependencies.append(resolved)
+        
+        # 依赖关系中不能有环
+        remaining = {index: set(deps) for index, deps in enumerate(dependencies)}
+        while remaining:
+            ready = [index for index, deps in remaining.items() if not deps & remaining.keys()]
+            if not ready:
+                return {
+                    "success": False,
+                    "error": f"Operations {sorted(remaining)} depend on each other in a cycle",
+                    "message": "Invalid operation dependencies"
+                }
+            for index in ready:
+                del remaining[index]
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or NOCODB_WRITE_CONCURRENCY))
+        tasks: List[asyncio.Task] = []
+        
+        async def run(index: int, operation: Dict[str, Any]) -> Dict[str, Any]:
+            report: Dict[str, Any] = {"index": index, "id": operation.get("id"), "op": operation["op"], "table_id": operation["table_id"]}
+            for position in dependencies[index]:
+                dependency = await tasks[position]
+                if not dependency["success"]:
+                    report.update({
+                        "success": False,
+                        "skipped": True,
+                        "error": f"Skipped because operation {position} failed"
+                    })
+                    return report
+            
+            arguments = {key: value for key, value in operation.items() if key not in ("op", "id", "depends_on")}
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    result = await BATCH_OPERATIONS[operation["op"]](**arguments)
+                except TypeError as e:
+                    result = {"success": False, "error": str(e), "message": "Invalid operation arguments"}
+                report["elapsed_seconds"] = round(time.perf_counter() - started_at, 3)
+            report["success"] = bool(result.get("success"))
+            if not report["success"]:
+                report["error"] = result.get("error")
+            report["result"] = result
+            return report
+        
+        with call_limits(timeout, deadline):
+            for index, operation in enumerate(processed_operations):
+                tasks.append(asyncio.ensure_future(run(index, operation)))
+            results = await asyncio.gather(*tasks)
+        
+        succeeded = sum(1 for result in results if result["success"])
+        return {
+            "success": succeeded == len(results),
+            "data": results,
+            "message": f"{succeeded} of {len(results)} operation(s) succeeded"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "Failed to run batch operations due to an unexpected error"
+        }
+
 @mcp.tool()
 async def get_server_info() -> Dict[str, Any]:
     """
@@ -363,11 +3862,25 @@ async def get_server_info() -> Dict[str, Any]:
         "server_name": "NocoDB MCP Server",
         "nocodb_host": NOCODB_HOST,
         "mcp_port": MCP_PORT,
+        "connection_pool": nocodb_client.get_pool_stats(),
+        "metadata_cache": table_metadata.get_stats(),
+        "record_cache": nocodb_client.get_cache_stats(),
+        "request_coalescing": nocodb_client.get_coalescing_stats(),
+        "rate_limiter": nocodb_client.get_rate_limit_stats(),
+        "circuit_breaker": nocodb_client.get_circuit_breaker_stats(),
+        "json_backend": json_backend.name,
+        "mirror": table_mirror.get_stats(),
         "available_tools": [
             "create_table_records",
             "get_table_records", 
+            "get_all_table_records",
+            "sync_table_changes",
             "update_table_records",
+            "upsert_table_records",
             "delete_table_record",
+            "delete_table_records",
+            "refresh_table_metadata",
+            "batch_operations",
             "get_server_info"
         ]
     }
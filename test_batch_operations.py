@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+测试 batch_operations 在一次调用中并发执行多张表的创建/读取/更新/删除
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import json
+import time
+import asyncio
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    nocodb_client,
+    table_metadata,
+    batch_operations
+)
+
+class MultiTableNocoDB:
+    """按表保存记录的 NocoDB 模拟服务，每个请求模拟固定延迟，并记录请求的开始和结束时间"""
+
+    def __init__(self, tables, latency=0.05):
+        self.tables = {table_id: [{"Id": i, "Title": f"{table_id} {i}"} for i in range(1, rows + 1)] for table_id, rows in tables.items()}
+        self.latency = latency
+        self.log = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.split("/")
+        table_id = parts[parts.index("tables") + 1]
+        if "/meta/" in request.url.path:
+            return httpx.Response(200, json={"id": table_id, "columns": [{"title": "Id", "uidt": "ID", "pk": True}, {"title": "Title", "uidt": "SingleLineText"}]})
+        started_at = time.perf_counter()
+        await asyncio.sleep(self.latency)
+        self.log.append((request.method, table_id, started_at, time.perf_counter()))
+        rows = self.tables.get(table_id)
+        if rows is None:
+            return httpx.Response(404, json={"msg": f"Table '{table_id}' not found"})
+        if request.method == "POST":
+            body = json.loads(request.content)
+            created = []
+            for record in body:
+                rows.append({"Id": len(rows) + 1, **record})
+                created.append({"Id": len(rows)})
+            return httpx.Response(200, json=created)
+        if request.method == "PATCH":
+            body = json.loads(request.content)
+            for update in body:
+                for row in rows:
+                    if row["Id"] == update["Id"]:
+                        row.update(update)
+            return httpx.Response(200, json=[{"Id": update["Id"]} for update in body])
+        if request.method == "DELETE":
+            ids = {item["Id"] for item in json.loads(request.content)}
+            rows[:] = [row for row in rows if row["Id"] not in ids]
+            return httpx.Response(200, json=[{"Id": record_id} for record_id in ids])
+        limit = int(request.url.params.get("limit", 25))
+        offset = int(request.url.params.get("offset", 0))
+        return httpx.Response(200, json={
+            "list": rows[offset:offset + limit],
+            "pageInfo": {"totalRows": len(rows), "isLastPage": offset + limit >= len(rows)}
+        })
+
+def install_fake(tables, latency=0.05) -> MultiTableNocoDB:
+    fake = MultiTableNocoDB(tables, latency)
+    install_mock(fake.handler)
+    return fake
+
+async def run_batch_tests():
+    print("测试多表批量操作")
+    print("=" * 60)
+
+    # 测试案例1: 五张表的操作并发执行，结果按输入顺序返回
+    print("\n1. 测试并发执行:")
+    fake = install_fake({f"t{i}": 3 for i in range(5)})
+    # 预先加载表结构，只统计记录请求的耗时
+    for i in range(5):
+        await table_metadata.get(f"t{i}")
+    started_at = time.perf_counter()
+    result = await batch_operations([
+        {"op": "read", "table_id": "t0", "limit": 10},
+        {"op": "create", "table_id": "t1", "records": [{"Title": "new"}]},
+        {"op": "update", "table_id": "t2", "records": [{"Id": 1, "Title": "changed"}]},
+        {"op": "delete", "table_id": "t3", "record_ids": [1, 2]},
+        {"op": "read_all", "table_id": "t4"}
+    ], max_concurrency=5)
+    elapsed = time.perf_counter() - started_at
+    print(f"耗时: {elapsed * 1000:.0f}ms (顺序执行约 {5 * fake.latency * 1000:.0f}ms), 消息: {result['message']}")
+    assert result["success"] and [item["op"] for item in result["data"]] == ["read", "create", "update", "delete", "read_all"]
+    assert len(result["data"][0]["result"]["data"]["list"]) == 3
+    assert fake.tables["t2"][0]["Title"] == "changed" and len(fake.tables["t3"]) == 1 and len(fake.tables["t1"]) == 4
+    assert elapsed < 3 * fake.latency
+
+    # 测试案例2: depends_on 保证执行顺序
+    print("\n2. 测试依赖顺序:")
+    fake = install_fake({"orders": 0, "items": 0}, latency=0.02)
+    result = await batch_operations(json.dumps([
+        {"id": "items", "op": "create", "table_id": "items", "records": [{"Title": "item"}], "depends_on": ["order"]},
+        {"id": "order", "op": "create", "table_id": "orders", "records": [{"Title": "order"}]},
+        {"op": "read", "table_id": "items", "depends_on": ["items", 1]}
+    ]))
+    calls = [(method, table_id) for method, table_id, _, _ in fake.log]
+    print(f"执行顺序: {calls}")
+    assert result["success"] and calls == [("POST", "orders"), ("POST", "items"), ("GET", "items")]
+    order_done = fake.log[0][3]
+    assert fake.log[1][2] >= order_done
+    assert result["data"][2]["result"]["data"]["list"] == [{"Id": 1, "Title": "item"}]
+
+    # 数字 id 优先于位置：第 2 个操作的 depends_on [1] 指 id 为 1 的第 1 个操作，而不是它自己
+    fake = install_fake({"orders": 0, "items": 0}, latency=0.02)
+    result = await batch_operations([
+        {"id": 1, "op": "create", "table_id": "orders", "records": [{"Title": "order"}]},
+        {"id": 0, "op": "create", "table_id": "items", "records": [{"Title": "item"}], "depends_on": [1]}
+    ])
+    calls = [(method, table_id) for method, table_id, _, _ in fake.log]
+    print(f"数字 id 的执行顺序: {calls}")
+    assert result["success"] and calls == [("POST", "orders"), ("POST", "items")]
+    assert fake.log[1][2] >= fake.log[0][3]
+
+    # 测试案例3: 单个操作失败不影响其他操作，依赖它的操作被跳过
+    print("\n3. 测试错误隔离:")
+    fake = install_fake({"good": 2}, latency=0.01)
+    result = await batch_operations([
+        {"id": "bad", "op": "create", "table_id": "missing", "records": [{"Title": "x"}]},
+        {"op": "read", "table_id": "good"},
+        {"op": "update", "table_id": "good", "records": [{"Id": 1, "Title": "y"}], "depends_on": ["bad"]},
+        {"op": "read", "table_id": "good", "not_an_argument": 1}
+    ])
+    for item in result["data"]:
+        print(f"  {item['index']} {item['op']}: success={item['success']} {item.get('error', '')}")
+    assert not result["success"] and [item["success"] for item in result["data"]] == [False, True, False, False]
+    assert result["data"][2]["skipped"] and fake.tables["good"][0]["Title"] == "good 1"
+    assert result["message"] == "1 of 4 operation(s) succeeded"
+
+    # 测试案例4: 无效的操作、未知依赖、循环依赖和重复的 id 在执行前被拒绝
+    print("\n4. 测试无效的批量操作:")
+    fake = install_fake({"t": 1}, latency=0.01)
+    for operations in (
+        [{"op": "drop", "table_id": "t"}],
+        [{"op": "read"}],
+        [{"op": "read", "table_id": "t", "depends_on": ["nope"]}],
+        [{"id": "a", "op": "read", "table_id": "t", "depends_on": ["b"]}, {"id": "b", "op": "read", "table_id": "t", "depends_on": ["a"]}],
+        [{"id": "a", "op": "read", "table_id": "t"}, {"id": "a", "op": "read", "table_id": "t"}],
+        "not json",
+        []
+    ):
+        result = await batch_operations(operations)
+        print(f"  {result['error']}")
+        assert not result["success"]
+    assert fake.log == []
+
+    # 测试案例5: max_concurrency 限制同时执行的操作数
+    print("\n5. 测试并发上限:")
+    fake = install_fake({f"t{i}": 1 for i in range(6)}, latency=0.02)
+    for i in range(6):
+        await table_metadata.get(f"t{i}")
+    await batch_operations([{"op": "read", "table_id": f"t{i}"} for i in range(6)], max_concurrency=2)
+    events = sorted([(start, 1) for _, _, start, _ in fake.log] + [(end, -1) for _, _, _, end in fake.log])
+    running = peak = 0
+    for _, change in events:
+        running += change
+        peak = max(peak, running)
+    print(f"最大同时执行数: {peak}")
+    assert peak == 2
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+def test_batch_operations():
+    run_with_mock(run_batch_tests)
+
+if __name__ == "__main__":
+    test_batch_operations()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+测试批量写入的分块与并发逻辑（create / update / delete），以及按表结构过滤只读列
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import json
+import asyncio
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    nocodb_client,
+    create_table_records,
+    update_table_records,
+    delete_table_records
+)
+
+class FakeNocoDB:
+    """记录收到的请求，并模拟 NocoDB 的批量接口"""
+
+    def __init__(self):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.next_id = 1
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(200, json={
+                "columns": [
+                    {"title": "Id", "uidt": "ID", "pk": True},
+                    {"title": "Title", "uidt": "SingleLineText"},
+                    {"title": "Total", "uidt": "Formula"},
+                    {"title": "Owner Name", "uidt": "Lookup"}
+                ]
+            })
+        body = json.loads(request.content) if request.content else None
+        self.requests.append((request.method, body))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if any(row.get("Title") == "bad" for row in body or []):
+                return httpx.Response(400, json={"msg": "BadRequest [Error]: invalid row"})
+            if request.method == "POST":
+                ids = []
+                for _ in body:
+                    ids.append({"Id": self.next_id})
+                    self.next_id += 1
+                return httpx.Response(200, json=ids)
+            return httpx.Response(200, json=[{"Id": row.get("Id", row.get("id"))} for row in body])
+        finally:
+            self.in_flight -= 1
+
+def install_fake() -> FakeNocoDB:
+    fake = FakeNocoDB()
+    install_mock(fake.handler, headers=nocodb_client.headers)
+    return fake
+
+async def run_bulk_tests():
+    print("测试批量写入的分块与并发逻辑")
+    print("=" * 60)
+
+    # 测试案例1: 小批量保持单次请求和原有返回格式
+    print("\n1. 测试小批量创建（不分块）:")
+    fake = install_fake()
+    result = await create_table_records("tbl", [{"Title": "a"}, {"Title": "b"}], batch_size=10)
+    print(f"请求次数: {len(fake.requests)}")
+    print(f"结果: {result}")
+    assert len(fake.requests) == 1
+    assert result["success"] and "chunks" not in result
+
+    # 测试案例2: 大批量创建自动分块，并限制并发数
+    print("\n2. 测试大批量创建（分块 + 并发限制）:")
+    fake = install_fake()
+    records = [{"Title": f"row {i}"} for i in range(1050)]
+    result = await create_table_records("tbl", records, batch_size=100, max_concurrency=3)
+    print(f"结果: {result['message']}")
+    print(f"请求次数: {len(fake.requests)}, 最大并发: {fake.max_in_flight}")
+    assert result["success"]
+    assert len(fake.requests) == 11
+    assert fake.max_in_flight <= 3
+    assert [row["Id"] for row in result["data"]] == sorted(row["Id"] for row in result["data"])
+    assert len(result["data"]) == 1050
+
+    # 测试案例3: 部分分块失败时返回每个分块的状态
+    print("\n3. 测试部分分块失败:")
+    fake = install_fake()
+    records = [{"Title": f"row {i}"} for i in range(300)]
+    records[150]["Title"] = "bad"
+    result = await create_table_records("tbl", json.dumps(records), batch_size=100)
+    print(f"结果: {result['message']}")
+    print(f"失败的分块: {result['failed_chunks']}")
+    print(f"失败分块详情: {result['chunks'][1]}")
+    assert not result["success"]
+    assert result["failed_chunks"] == [1]
+    assert result["chunks"][1]["start"] == 100 and result["chunks"][1]["end"] == 200
+    assert len(result["data"]) == 200
+
+    # 测试案例4: 批量更新返回吞吐量，并过滤只读字段
+    print("\n4. 测试批量更新（吞吐量统计）:")
+    fake = install_fake()
+    records = [{"Id": i, "Title": f"row {i}", "UpdatedAt": "2025-01-01"} for i in range(1, 251)]
+    result = await update_table_records("tbl", records, batch_size=100)
+    print(f"结果: {result['message']}")
+    print(f"耗时: {result['elapsed_seconds']}s, 吞吐量: {result['rows_per_second']} rows/s")
+    assert result["success"] and len(fake.requests) == 3
+    assert all("UpdatedAt" not in row for _, body in fake.requests for row in body)
+    assert result["rows_per_second"] is not None
+
+    # 测试案例5: 根据表结构过滤公式、查找等只读列
+    print("\n5. 测试根据表结构过滤只读列:")
+    fake = install_fake()
+    records = [{"Id": 1, "Title": "a", "Total": 10, "Owner Name": "x"}]
+    result = await update_table_records("tbl", records)
+    print(f"发送的数据: {fake.requests[0][1]}")
+    assert result["success"]
+    assert fake.requests[0][1] == [{"Id": 1, "Title": "a"}]
+    assert records[0]["Total"] == 10
+
+    # 测试案例6: 批量删除使用请求体形式，并支持多种ID格式
+    print("\n6. 测试批量删除:")
+    fake = install_fake()
+    result = await delete_table_records("tbl", json.dumps([1, "2", {"Id": 3}, {"id": 4}]))
+    print(f"请求: {fake.requests}")
+    print(f"结果: {result}")
+    assert result["success"]
+    assert fake.requests == [("DELETE", [{"Id": 1}, {"Id": "2"}, {"Id": 3}, {"Id": 4}])]
+
+    fake = install_fake()
+    result = await delete_table_records("tbl", list(range(1, 251)), batch_size=100)
+    print(f"分块删除结果: {result['message']}")
+    assert result["success"] and len(fake.requests) == 3
+
+    # 测试案例7: 无效的ID格式
+    print("\n7. 测试无效的ID格式:")
+    result = await delete_table_records("tbl", [{"Title": "no id"}])
+    print(f"结果: {result}")
+    assert not result["success"]
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+def test_bulk_operations():
+    run_with_mock(run_bulk_tests)
+
+if __name__ == "__main__":
+    test_bulk_operations()
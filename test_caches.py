@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+测试表结构元数据缓存、记录查询缓存和并发查询合并
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import asyncio
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    DeadlineExceededError,
+    NocoDBClient,
+    ResponseCache,
+    TableMetadataCache,
+    call_limits,
+    refresh_table_metadata,
+    table_metadata
+)
+
+class FakeNocoDB:
+    """统计各类请求次数的 NocoDB 模拟服务"""
+
+    def __init__(self):
+        self.meta_requests = 0
+        self.record_requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            self.meta_requests += 1
+            return httpx.Response(200, json={
+                "id": request.url.path.rsplit("/", 1)[1],
+                "title": "Tasks",
+                "columns": [
+                    {"title": "Id", "uidt": "ID", "pk": True},
+                    {"title": "Title", "uidt": "SingleLineText", "pv": True},
+                    {"title": "Score", "uidt": "Rollup"}
+                ]
+            })
+        if request.method == "GET":
+            self.record_requests += 1
+            return httpx.Response(200, json={"list": [{"Id": 1}], "pageInfo": {"totalRows": 1}})
+        return httpx.Response(200, json=[{"Id": 1}])
+
+def make_client(fake: FakeNocoDB, **kwargs) -> NocoDBClient:
+    client = NocoDBClient("http://nocodb.test", "token", **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    return client
+
+async def run_cache_tests():
+    print("测试表结构元数据缓存、记录查询缓存和并发查询合并")
+    print("=" * 60)
+
+    # 测试案例1: 元数据缓存命中、主键和只读列
+    print("\n1. 测试元数据缓存:")
+    fake = FakeNocoDB()
+    client = make_client(fake)
+    metadata = TableMetadataCache(client, ttl=60, max_entries=2)
+    schema = await metadata.get("tbl_a")
+    await metadata.get("tbl_a")
+    print(f"主键: {schema['primary_key']}, 显示列: {schema['display_value']}")
+    print(f"只读列包含Score: {'Score' in schema['readonly_fields']}")
+    print(f"统计: {metadata.get_stats()}")
+    assert schema["primary_key"] == "Id" and schema["display_value"] == "Title"
+    assert "Score" in schema["readonly_fields"] and "Id" not in schema["readonly_fields"]
+    assert fake.meta_requests == 1 and metadata.hits == 1
+
+    # 测试案例2: 元数据缓存的LRU淘汰与失效
+    print("\n2. 测试元数据LRU淘汰与失效:")
+    await metadata.get("tbl_b")
+    await metadata.get("tbl_a")
+    await metadata.get("tbl_c")
+    print(f"缓存中的表: {list(metadata._entries)}")
+    assert list(metadata._entries) == ["tbl_a", "tbl_c"]
+    assert metadata.evictions == 1
+    assert metadata.invalidate("tbl_a") == 1
+    await metadata.get("tbl_a")
+    print(f"失效后重新读取次数: {fake.meta_requests}")
+    assert fake.meta_requests == 4
+
+    # 测试案例3: 元数据TTL过期
+    print("\n3. 测试元数据TTL过期:")
+    expiring = TableMetadataCache(client, ttl=0.05)
+    await expiring.get("tbl_x")
+    await asyncio.sleep(0.1)
+    await expiring.get("tbl_x")
+    print(f"过期后未命中次数: {expiring.misses}")
+    assert expiring.misses == 2
+    await client.aclose()
+
+    # 测试案例4: 记录查询缓存命中与写操作后失效
+    print("\n4. 测试记录查询缓存:")
+    fake = FakeNocoDB()
+    client = make_client(fake, record_cache_ttl=30, record_cache_size=2)
+    await client.get_records("tbl_a", 25, 0)
+    await client.get_records("tbl_a", 25, 0)
+    await client.get_records("tbl_a", 25, 25)
+    print(f"请求次数（3次查询，其中1次命中）: {fake.record_requests}")
+    assert fake.record_requests == 2
+    await client.update_records("tbl_a", [{"Id": 1, "Title": "x"}])
+    await client.get_records("tbl_a", 25, 0)
+    print(f"写操作后重新请求: {fake.record_requests}")
+    print(f"统计: {client.get_cache_stats()}")
+    assert fake.record_requests == 3
+
+    # 测试案例5: 写操作期间发出的读请求结果不会被缓存
+    print("\n5. 测试写操作期间的读请求:")
+    cache = ResponseCache(ttl=30)
+    key = cache.make_key("tbl_a", {"limit": 25, "offset": 0})
+    generation = cache.generation("tbl_a")
+    cache.invalidate_table("tbl_a")
+    cache.put(key, {"success": True, "data": {}}, generation)
+    print(f"过期的读取结果被丢弃: {cache.get(key) is None}")
+    assert cache.get(key) is None
+
+    # 写请求抛出异常（可能已经被 NocoDB 处理）时缓存同样失效
+    async def timeout_on_write(request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            raise httpx.ReadTimeout("write timed out")
+        return await fake.handler(request)
+
+    await client._client.aclose()
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(timeout_on_write))
+    await client.get_records("tbl_a", 25, 0)
+    requests_before = fake.record_requests
+    try:
+        await client.create_records("tbl_a", [{"Title": "x"}])
+        raised = False
+    except httpx.ReadTimeout:
+        raised = True
+    await client.get_records("tbl_a", 25, 0)
+    print(f"写请求失败后重新请求: {fake.record_requests - requests_before} 次")
+    assert raised and fake.record_requests == requests_before + 1
+
+    # 测试案例6: 未开启缓存时每次都请求
+    print("\n6. 测试关闭缓存:")
+    fake = FakeNocoDB()
+    disabled = make_client(fake)
+    await disabled.get_records("tbl_a")
+    await disabled.get_records("tbl_a")
+    print(f"请求次数: {fake.record_requests}, 统计: {disabled.get_cache_stats()}")
+    assert fake.record_requests == 2
+    await client.aclose()
+    await disabled.aclose()
+
+    # 测试案例7: 并发的相同查询只发送一次请求
+    print("\n7. 测试并发相同查询合并:")
+    fake = FakeNocoDB()
+    original_handler = fake.handler
+
+    async def slow_handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return await original_handler(request)
+
+    coalescing = NocoDBClient("http://nocodb.test", "token")
+    coalescing._client = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+    results = await asyncio.gather(
+        *[coalescing.get_records("tbl_a", 25, 0) for _ in range(5)],
+        coalescing.get_records("tbl_a", 25, 25)
+    )
+    print(f"请求次数（6次调用，其中5次相同）: {fake.record_requests}")
+    print(f"统计: {coalescing.get_coalescing_stats()}")
+    assert all(result["success"] for result in results)
+    assert fake.record_requests == 2
+    assert coalescing.get_coalescing_stats()["coalesced_requests"] == 4
+
+    # 测试案例8: 发起者的截止时间只限制它自己的等待，不影响共享的请求
+    print("\n8. 测试合并请求的截止时间:")
+    fake.record_requests = 0
+
+    async def with_deadline():
+        with call_limits(deadline=0.01):
+            return await coalescing.get_records("tbl_a", 25, 0)
+
+    first = asyncio.ensure_future(with_deadline())
+    await asyncio.sleep(0)
+    results = await asyncio.gather(first, coalescing.get_records("tbl_a", 25, 0), return_exceptions=True)
+    print(f"结果: {[type(result).__name__ for result in results]}, 请求次数: {fake.record_requests}")
+    assert isinstance(results[0], DeadlineExceededError)
+    assert results[1]["success"] and fake.record_requests == 1
+    await coalescing.aclose()
+
+    # 测试案例9: 表结构读取的临时失败不缓存，404 只缓存 failure_ttl 秒
+    print("\n9. 测试表结构读取失败:")
+    statuses = [503, 200, 404, 200]
+    meta_requests = []
+
+    async def failing_meta(request: httpx.Request) -> httpx.Response:
+        status_code = statuses.pop(0)
+        meta_requests.append(status_code)
+        if status_code != 200:
+            return httpx.Response(status_code, json={"msg": f"status {status_code}"})
+        return await original_handler(request)
+
+    failing = NocoDBClient("http://nocodb.test", "token", max_retries=0)
+    failing._client = httpx.AsyncClient(transport=httpx.MockTransport(failing_meta))
+    metadata = TableMetadataCache(failing, ttl=60, failure_ttl=0.05)
+    assert await metadata.get("tbl_a") is None
+    assert (await metadata.get("tbl_a"))["primary_key"] == "Id"
+    assert await metadata.get("tbl_b") is None
+    assert await metadata.get("tbl_b") is None
+    await asyncio.sleep(0.1)
+    assert (await metadata.get("tbl_b"))["primary_key"] == "Id"
+    print(f"表结构请求: {meta_requests}")
+    assert meta_requests == [503, 200, 404, 200]
+    await failing.aclose()
+
+    # 测试案例10: refresh_table_metadata 重新读取单个表、清空整个缓存，以及读取失败
+    print("\n10. 测试 refresh_table_metadata:")
+    columns = [{"title": "Id", "uidt": "ID", "pk": True}, {"title": "Title", "uidt": "SingleLineText", "pv": True}]
+    shared_meta = []
+
+    async def shared_handler(request: httpx.Request) -> httpx.Response:
+        table_id = request.url.path.rsplit("/", 1)[1]
+        shared_meta.append(table_id)
+        if table_id == "tbl_missing":
+            return httpx.Response(404, json={"msg": "table not found"})
+        return httpx.Response(200, json={"id": table_id, "title": "Tasks", "columns": list(columns)})
+
+    install_mock(shared_handler)
+    assert (await table_metadata.get("tbl_a"))["column_types"] == {"Id": "ID", "Title": "SingleLineText"}
+    columns.append({"title": "Score", "uidt": "Rollup"})
+    assert "Score" not in (await table_metadata.get("tbl_a"))["column_types"]
+    result = await refresh_table_metadata("tbl_a")
+    print(f"重新读取单个表: {result['data']}")
+    assert result["success"] and result["data"]["column_types"]["Score"] == "Rollup"
+    assert result["data"]["primary_key"] == "Id" and result["data"]["display_value"] == "Title"
+    assert result["data"]["readonly_columns"] == ["Score"] and shared_meta == ["tbl_a", "tbl_a"]
+    await table_metadata.get("tbl_b")
+    result = await refresh_table_metadata()
+    print(f"清空缓存: {result['message']}")
+    assert result["success"] and result["message"] == "Cleared cached metadata for 2 table(s)"
+    assert table_metadata.get_stats()["entries"] == 0
+    result = await refresh_table_metadata("tbl_missing")
+    print(f"读取失败: {result}")
+    assert not result["success"] and "tbl_missing" in result["error"]
+
+    print("\n测试完成！")
+
+def test_caches():
+    run_with_mock(run_cache_tests)
+
+if __name__ == "__main__":
+    test_caches()
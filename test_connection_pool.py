@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+测试共享连接池：服务启动时创建、多次请求复用同一连接、关闭后释放，以及 get_server_info 中的连接池统计
+使用本地的 HTTP 服务模拟 NocoDB，不会真正调用API
+"""
+
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from mock_nocodb import run_with_mock
+from server import (
+    NocoDBClient,
+    mcp,
+    nocodb_client,
+    server_lifespan,
+    get_server_info
+)
+
+class LocalNocoDB(BaseHTTPRequestHandler):
+    """返回一页记录的本地 HTTP 服务，记录每个请求来自哪个客户端连接，以及同时处理的最大请求数"""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    connections = set()
+    requests = 0
+    active = 0
+    peak = 0
+
+    def do_GET(self):
+        with LocalNocoDB.lock:
+            LocalNocoDB.connections.add(self.client_address)
+            LocalNocoDB.requests += 1
+            LocalNocoDB.active += 1
+            LocalNocoDB.peak = max(LocalNocoDB.peak, LocalNocoDB.active)
+        time.sleep(0.01)
+        with LocalNocoDB.lock:
+            LocalNocoDB.active -= 1
+        body = json.dumps({"list": [{"Id": 1}], "pageInfo": {"totalRows": 1, "isLastPage": True}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+async def run_pool_tests():
+    print("测试共享连接池")
+    print("=" * 60)
+
+    # 测试案例1: 多次请求复用同一个客户端和同一个 TCP 连接
+    print("\n1. 测试连接复用:")
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), LocalNocoDB)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = NocoDBClient(f"http://127.0.0.1:{httpd.server_address[1]}", "token", max_connections=5, max_keepalive_connections=2)
+        await client.start()
+        pooled = client._client
+        for offset in range(10):
+            result = await client.get_records("tbl", 1, offset)
+            assert result["success"]
+        stats = client.get_pool_stats()
+        print(f"请求数: {LocalNocoDB.requests}, 服务端看到的连接数: {len(LocalNocoDB.connections)}, 统计: {stats}")
+        assert client._client is pooled and LocalNocoDB.requests == 10 and len(LocalNocoDB.connections) == 1
+        assert stats["active"] and stats["max_connections"] == 5 and stats["max_keepalive_connections"] == 2
+        assert stats["open_connections"] == 1 and stats["idle_connections"] == 1
+
+        # 测试案例2: 并发请求不超过 max_connections 个连接
+        print("\n2. 测试连接数上限:")
+        LocalNocoDB.peak = 0
+        results = await asyncio.gather(*[client.get_records("tbl", 1, offset) for offset in range(100, 140)])
+        print(f"40 个并发请求同时使用的最大连接数: {LocalNocoDB.peak}")
+        assert all(result["success"] for result in results) and LocalNocoDB.peak == 5
+
+        # 测试案例3: 关闭后连接池释放，之后的请求重新创建
+        print("\n3. 测试关闭连接池:")
+        await client.aclose()
+        print(f"关闭后: {client.get_pool_stats()['active']}")
+        assert not client.get_pool_stats()["active"] and pooled.is_closed
+        assert (await client.get_records("tbl", 1, 0))["success"] and client._client is not pooled
+        await client.aclose()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    # 测试案例4: 服务的 lifespan 在启动时创建共享连接池，退出时关闭
+    print("\n4. 测试服务启动与关闭:")
+    await nocodb_client.aclose()
+    assert not (await get_server_info())["connection_pool"]["active"]
+    async with server_lifespan(mcp):
+        info = await get_server_info()
+        shared = nocodb_client._client
+        print(f"运行中的连接池: {info['connection_pool']}")
+        assert info["connection_pool"]["active"] and shared is not None
+        assert nocodb_client._get_client() is shared
+    print(f"退出后: {nocodb_client.get_pool_stats()['active']}")
+    assert shared.is_closed and not nocodb_client.get_pool_stats()["active"]
+
+    print("\n测试完成！")
+
+def test_connection_pool():
+    run_with_mock(run_pool_tests)
+
+if __name__ == "__main__":
+    test_connection_pool()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+测试可插拔的 JSON 编解码后端，并对比各后端的编码/解码性能
+未安装的后端（orjson / msgspec）会被跳过
+"""
+
+import json
+import time
+from server import JSONBackend, json_backend
+
+def make_records(count):
+    return [
+        {
+            "Id": i,
+            "Title": f"记录 {i}",
+            "Email": f"user{i}@example.com",
+            "Score": i * 1.5,
+            "Done": i % 2 == 0,
+            "Tags": ["a", "b", "c"],
+            "Meta": {"source": "import", "rank": i, "note": None},
+            "Attachment": [{"title": "file.txt", "size": 1024, "mimetype": "text/plain"}]
+        }
+        for i in range(count)
+    ]
+
+def available_backends():
+    backends = []
+    for name in ("json", "orjson", "msgspec"):
+        backend = JSONBackend(name)
+        if backend.name == name:
+            backends.append(backend)
+    return backends
+
+def best_time(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+def test_json_backend():
+    print("测试 JSON 编解码后端")
+    print("=" * 60)
+
+    backends = available_backends()
+    print(f"当前使用: {json_backend.name}, 可用后端: {[backend.name for backend in backends]}")
+
+    # 测试案例1: 各后端的编码结果可以互相解码，结果一致
+    print("\n1. 测试编解码结果一致:")
+    records = make_records(100)
+    for encoder in backends:
+        encoded = encoder.dumps(records)
+        assert isinstance(encoded, bytes)
+        for decoder in backends:
+            assert decoder.loads(encoded) == records, (encoder.name, decoder.name)
+            assert decoder.loads(encoded.decode("utf-8")) == records, (encoder.name, decoder.name)
+    print("通过")
+
+    # 测试案例2: 无效 JSON 统一抛出 json.JSONDecodeError
+    print("\n2. 测试无效 JSON:")
+    for backend in backends:
+        try:
+            backend.loads('{"Title": ')
+            raised = False
+        except json.JSONDecodeError:
+            raised = True
+        print(f"{backend.name}: {raised}")
+        assert raised
+
+    # 测试案例3: 快速后端无法编码的值回退到标准库
+    print("\n3. 测试回退到标准库:")
+    value = {"Big": 2 ** 70, 1: "int key"}
+    for backend in backends:
+        assert json.loads(backend.dumps(value)) == {"Big": 2 ** 70, "1": "int key"}, backend.name
+    print("通过")
+
+    # 测试案例4: 未安装的后端回退到标准库
+    print("\n4. 测试未知后端:")
+    assert JSONBackend("not-a-backend").name == "json"
+    print("通过")
+
+    # 测试案例5: 性能对比（10000 条记录）
+    print("\n5. 性能对比（10000 条记录）:")
+    records = make_records(10000)
+    payload = json.dumps(records).encode("utf-8")
+    timings = {}
+    for backend in backends:
+        encode = best_time(lambda: backend.dumps(records))
+        decode = best_time(lambda: backend.loads(payload))
+        timings[backend.name] = (encode, decode)
+        print(f"{backend.name:>8}: 编码 {encode * 1000:7.1f}ms, 解码 {decode * 1000:7.1f}ms")
+
+    baseline_encode, baseline_decode = timings["json"]
+    for name, (encode, decode) in timings.items():
+        if name != "json":
+            print(f"{name} 相对标准库: 编码快 {baseline_encode / encode:.1f}x, 解码快 {baseline_decode / decode:.1f}x")
+            assert encode + decode < baseline_encode + baseline_decode
+
+    print("\n测试完成！")
+
+if __name__ == "__main__":
+    test_json_backend()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+测试本地 SQLite 只读镜像：查询条件转换、增量刷新、写入后刷新、过期回退和查询延迟
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import re
+import json
+import time
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    mirror_columns,
+    sort_to_sql,
+    where_to_sql,
+    nocodb_client,
+    table_mirror,
+    get_table_records,
+    update_table_records
+)
+
+COLUMNS = [
+    {"title": "Id", "uidt": "ID", "pk": True},
+    {"title": "Title", "uidt": "SingleLineText", "pv": True},
+    {"title": "Status", "uidt": "SingleSelect"},
+    {"title": "Score", "uidt": "Number"},
+    {"title": "Done", "uidt": "Checkbox"},
+    {"title": "Note", "uidt": "LongText"},
+    {"title": "Total", "uidt": "Rollup"},
+    {"title": "Tags", "uidt": "MultiSelect"},
+    {"title": "UpdatedAt", "uidt": "DateTime"}
+]
+MIRROR_COLUMNS = mirror_columns({column["title"]: column["uidt"] for column in COLUMNS}, "Id")
+
+class MirroredNocoDB:
+    """支持主键游标、按修改时间过滤和批量更新的 NocoDB 模拟服务，统计记录请求次数"""
+
+    def __init__(self, total_rows):
+        self.clock = 0
+        self.rows = [self.make_row(i) for i in range(1, total_rows + 1)]
+        self.record_requests = []
+
+    def timestamp(self):
+        self.clock += 1
+        return f"2025-01-01 10:{self.clock // 3600:02d}:{self.clock % 3600 // 60:02d}.{self.clock % 60:02d}+00:00"
+
+    def make_row(self, i):
+        return {
+            "Id": i,
+            "Title": f"row {i}",
+            "Status": "done" if i % 3 == 0 else "todo",
+            "Score": i * 7 % 100,
+            "Done": i % 2 == 0,
+            "Note": None if i % 5 == 0 else f"note {i}",
+            "Total": i * 10,
+            "Tags": ["a"] if i % 2 else ["a", "b"],
+            "UpdatedAt": self.timestamp()
+        }
+
+    def matches(self, row, where):
+        if not where:
+            return True
+        blank = re.match(r"^\(UpdatedAt,blank\)(?:~and\(Id,gt,(\d+)\))?$", where)
+        if blank:
+            return row["UpdatedAt"] is None and (blank.group(1) is None or row["Id"] > int(blank.group(1)))
+        if where == "(UpdatedAt,notblank)":
+            return row["UpdatedAt"] is not None
+        strict = re.search(r"\(UpdatedAt,gt,exactDate,([^)]+)\)~or", where)
+        if strict:
+            after = int(re.search(r"\(Id,gt,(\d+)\)\)$", where).group(1))
+            if not (row["UpdatedAt"] > strict.group(1) or (row["UpdatedAt"] == strict.group(1) and row["Id"] > after)):
+                return False
+            return True
+        since = re.search(r"\(UpdatedAt,gte,exactDate,([^)]+)\)", where)
+        if since:
+            return row["UpdatedAt"] >= since.group(1)
+        keyset = re.match(r"^\(Id,gt,(\d+)\)$", where)
+        if keyset:
+            return row["Id"] > int(keyset.group(1))
+        raise AssertionError(f"unexpected where {where}")
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(200, json={"id": "tbl", "title": "Ref", "columns": COLUMNS})
+        if request.method == "PATCH":
+            body = json.loads(request.content)
+            for update in body:
+                for row in self.rows:
+                    if row["Id"] == update["Id"]:
+                        row.update(update)
+                        row["UpdatedAt"] = self.timestamp()
+            return httpx.Response(200, json=[{"Id": update["Id"]} for update in body])
+        params = dict(request.url.params)
+        self.record_requests.append(params)
+        rows = [row for row in self.rows if self.matches(row, params.get("where"))]
+        if params.get("sort") == "UpdatedAt,Id":
+            rows.sort(key=lambda row: (row["UpdatedAt"], row["Id"]))
+        else:
+            rows.sort(key=lambda row: row["Id"])
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 25))
+        page = rows[offset:offset + limit]
+        if "fields" in params:
+            page = [{key: row[key] for key in params["fields"].split(",")} for row in page]
+        return httpx.Response(200, json={
+            "list": page,
+            "pageInfo": {"totalRows": len(rows), "isLastPage": offset + limit >= len(rows)}
+        })
+
+def install_fake(total_rows) -> MirroredNocoDB:
+    fake = MirroredNocoDB(total_rows)
+    install_mock(fake.handler)
+    table_mirror.table_ids[:] = ["tbl"]
+    table_mirror._state.clear()
+    return fake
+
+def expected(rows, predicate, key, reverse=False):
+    return [row["Id"] for row in sorted((row for row in rows if predicate(row)), key=key, reverse=reverse)]
+
+async def run_mirror_tests():
+    print("测试本地 SQLite 镜像")
+    print("=" * 60)
+
+    # 测试案例1: 查询条件转换为 SQL，无法精确转换的条件和列类型报错（由 NocoDB 处理）
+    print("\n1. 测试查询条件转换:")
+    sql, params = where_to_sql("(Status,eq,done)~and((Score,gt,50)~or(Note,blank))", MIRROR_COLUMNS)
+    print(f"SQL: {sql}, 参数: {params}")
+    assert params == ["done", 50.0] and "OR" in sql and "AND" in sql
+    for unsupported in (
+        "(UpdatedAt,gt,exactDate,2025-01-01)",
+        "(Missing,eq,1)",
+        "(Score,eq,abc)",
+        "(Title,anyof,a)",
+        "(Title,eq,a",
+        "(Title,eq,a)~xor(Title,eq,b)",
+        "(Total,gt,100)",
+        "(Tags,eq,a)",
+        "(Tags,like,a)",
+        "(Title,eq,a)~or(Tags,blank)"
+    ):
+        try:
+            where_to_sql(unsupported, MIRROR_COLUMNS)
+            raised = False
+        except ValueError:
+            raised = True
+        print(f"{unsupported}: 报错 {raised}")
+        assert raised
+    try:
+        sort_to_sql("-Total", MIRROR_COLUMNS)
+        raised = False
+    except ValueError:
+        raised = True
+    assert raised
+
+    # 测试案例2: 全量加载后，过滤、排序和字段选择都在本地完成
+    print("\n2. 测试本地查询:")
+    fake = install_fake(300)
+    refreshed = await table_mirror.refresh("tbl")
+    print(f"刷新: {refreshed}")
+    assert refreshed["success"] and refreshed["mode"] == "full" and refreshed["rows"] == 300
+    fake.record_requests.clear()
+    queries = [
+        ({"where": "(Status,eq,done)~and(Score,gt,50)", "sort": "-Score"},
+         expected(fake.rows, lambda row: row["Status"] == "done" and row["Score"] > 50, lambda row: (row["Score"], -row["Id"]), True)),
+        ({"where": "~not(Status,eq,done)~and(Done,eq,true)", "limit": 100},
+         expected(fake.rows, lambda row: row["Status"] != "done" and row["Done"], lambda row: row["Id"])[:100]),
+        ({"where": "(Note,blank)", "sort": "Score,-Id", "limit": 10},
+         expected(fake.rows, lambda row: row["Note"] is None, lambda row: (row["Score"], -row["Id"]))[:10]),
+        ({"where": "(Title,like,row 1%)", "limit": 1000},
+         expected(fake.rows, lambda row: row["Title"].startswith("row 1"), lambda row: row["Id"])),
+        ({"offset": 290, "limit": 25}, list(range(291, 301)))
+    ]
+    for query, ids in queries:
+        result = await get_table_records("tbl", **{"limit": 1000, **query})
+        got = [row["Id"] for row in result["data"]["list"]]
+        print(f"{query}: {len(got)} 条")
+        assert result["success"] and got == ids, (query, got[:10], ids[:10])
+    result = await get_table_records("tbl", where="(Score,lte,10)", fields="Title,Score", limit=3)
+    print(f"字段选择: {result['data']['list']}, pageInfo: {result['data']['pageInfo']}")
+    assert all(set(row) == {"Title", "Score"} for row in result["data"]["list"])
+    assert result["data"]["pageInfo"]["totalRows"] == sum(1 for row in fake.rows if row["Score"] <= 10)
+    assert fake.record_requests == []
+    # Rollup、MultiSelect 等列的过滤和排序不在本地执行
+    fallbacks = table_mirror.fallbacks
+    assert await table_mirror.query("tbl", where="(Total,gt,100)") is None
+    assert await table_mirror.query("tbl", where="(Tags,eq,a)") is None
+    assert await table_mirror.query("tbl", sort="Total") is None
+    assert table_mirror.fallbacks == fallbacks + 3
+
+    # 测试案例3: 增量刷新只读取修改过的记录
+    print("\n3. 测试增量刷新:")
+    fake.rows[4]["Title"] = "changed"
+    fake.rows[4]["UpdatedAt"] = fake.timestamp()
+    fake.rows.append(fake.make_row(301))
+    fake.record_requests.clear()
+    refreshed = await table_mirror.refresh("tbl")
+    print(f"刷新: {refreshed}, 请求: {len(fake.record_requests)} 次")
+    assert refreshed["mode"] == "incremental" and refreshed["rows"] == 301
+    result = await get_table_records("tbl", where="(Title,eq,changed)")
+    assert [row["Id"] for row in result["data"]["list"]] == [5]
+
+    # 测试案例4: 删除的记录通过行数比对发现，全量重新加载
+    print("\n4. 测试删除后重新加载:")
+    del fake.rows[0]
+    refreshed = await table_mirror.refresh("tbl")
+    print(f"刷新: {refreshed}")
+    assert refreshed["mode"] == "full" and refreshed["rows"] == 300
+
+    # 测试案例5: 通过本服务写入后，下一次读取先刷新镜像
+    print("\n5. 测试写入后刷新:")
+    await update_table_records("tbl", [{"Id": 10, "Status": "archived"}])
+    result = await get_table_records("tbl", where="(Status,eq,archived)")
+    print(f"结果: {[row['Id'] for row in result['data']['list']]}")
+    assert [row["Id"] for row in result["data"]["list"]] == [10]
+
+    # 测试案例6: 镜像过期、视图查询和无法转换的条件回退到 NocoDB
+    print("\n6. 测试回退到 NocoDB:")
+    fake.record_requests.clear()
+    await get_table_records("tbl", view_id="vw1")
+    await get_table_records("tbl", where="(UpdatedAt,gt,exactDate,2025-01-01)~or(Id,gt,0)")
+    table_mirror._state["tbl"]["refreshed_at"] -= table_mirror.max_staleness + 1
+    await get_table_records("tbl")
+    print(f"回退请求: {len(fake.record_requests)} 次, 统计: {table_mirror.get_stats()}")
+    assert len(fake.record_requests) == 3
+
+    # 测试案例7: 写入后刷新失败时镜像保持过期，读取回退到 NocoDB
+    print("\n7. 测试刷新失败后回退:")
+    await table_mirror.refresh("tbl")
+    await update_table_records("tbl", [{"Id": 2, "Title": "after write"}])
+    handler = fake.handler
+
+    async def failing_refresh(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("sort") == "UpdatedAt,Id":
+            raise httpx.ConnectError("mirror refresh failed")
+        return await handler(request)
+
+    install_mock(failing_refresh)
+    max_retries = nocodb_client.max_retries
+    nocodb_client.max_retries = 0
+    try:
+        fallbacks = table_mirror.fallbacks
+        result = await get_table_records("tbl", where="(Id,gt,1)", limit=1)
+        print(f"结果: {result['data']['list']}, 统计: {table_mirror.get_stats()}")
+        assert result["success"] and result["data"]["list"][0]["Title"] == "after write"
+        assert table_mirror._state["tbl"]["dirty"] and table_mirror.fallbacks == fallbacks + 1
+    finally:
+        nocodb_client.max_retries = max_retries
+    install_mock(handler)
+    result = await get_table_records("tbl", where="(Id,gt,1)", limit=1)
+    assert result["data"]["list"][0]["Title"] == "after write" and not table_mirror._state["tbl"]["dirty"]
+
+    # 测试案例8: 本地查询延迟（只打印，不作为断言）
+    print("\n8. 测试本地查询延迟:")
+    install_fake(2000)
+    await table_mirror.refresh("tbl")
+    started_at = time.perf_counter()
+    for i in range(200):
+        await table_mirror.query("tbl", limit=25, where=f"(Status,eq,done)~and(Score,gt,{i % 100})", sort="-Score")
+    elapsed = (time.perf_counter() - started_at) / 200
+    print(f"2000 行镜像，过滤+排序查询平均耗时: {elapsed * 1000:.3f}ms")
+    started_at = time.perf_counter()
+    for i in range(200):
+        await table_mirror.query("tbl", limit=25, where=f"(Id,gt,{i * 5})")
+    elapsed = (time.perf_counter() - started_at) / 200
+    print(f"2000 行镜像，主键游标查询平均耗时: {elapsed * 1000:.3f}ms")
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+def test_mirror():
+    run_with_mock(run_mirror_tests)
+
+if __name__ == "__main__":
+    test_mirror()
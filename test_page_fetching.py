@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+测试分页读取：iter_record_pages 预取下一页，get_records_parallel 并发读取各页并按偏移量顺序拼接
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import time
+import asyncio
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    nocodb_client,
+    get_all_table_records
+)
+
+class SlowPagesNocoDB:
+    """按 offset/limit 返回记录的 NocoDB 模拟服务；越靠后的页响应越快，可以让指定偏移量的页失败"""
+
+    def __init__(self, total_rows, latency=0.02, failing_offsets=()):
+        self.rows = [{"Id": i, "Title": f"row {i}"} for i in range(1, total_rows + 1)]
+        self.latency = latency
+        self.failing_offsets = set(failing_offsets)
+        self.requests = []
+        self.events = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(200, json={"columns": [{"title": "Id", "uidt": "ID", "pk": True}]})
+        offset = int(request.url.params.get("offset", 0))
+        limit = int(request.url.params.get("limit", 25))
+        self.requests.append((offset, limit))
+        self.events.append(("request", offset))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # 后面的页先返回，用来检查结果是否按偏移量顺序拼接
+            await asyncio.sleep(self.latency * (1 + 1 / (1 + offset)))
+        finally:
+            self.in_flight -= 1
+        if offset in self.failing_offsets:
+            return httpx.Response(500, json={"msg": "page failed"})
+        page = self.rows[offset:offset + limit]
+        return httpx.Response(200, json={
+            "list": page,
+            "pageInfo": {"totalRows": len(self.rows), "isLastPage": offset + limit >= len(self.rows)}
+        })
+
+def install_fake(total_rows, latency=0.02, failing_offsets=()) -> SlowPagesNocoDB:
+    fake = SlowPagesNocoDB(total_rows, latency, failing_offsets)
+    install_mock(fake.handler, timeout=None)
+    return fake
+
+async def run_page_tests():
+    print("测试分页读取")
+    print("=" * 60)
+
+    # 测试案例1: 读取下一页的请求在处理当前页之前发出
+    print("\n1. 测试预取下一页:")
+    fake = install_fake(50, latency=0.01)
+    ids = []
+    started_at = time.perf_counter()
+    async for result in nocodb_client.iter_record_pages("tbl", page_size=10):
+        assert result["success"]
+        ids.extend(row["Id"] for row in result["data"]["list"])
+        await asyncio.sleep(0.02)
+        fake.events.append(("processed", result["data"]["list"][0]["Id"] - 1))
+    elapsed = time.perf_counter() - started_at
+    print(f"事件顺序: {fake.events[:5]}..., 耗时: {elapsed * 1000:.0f}ms")
+    assert ids == list(range(1, 51))
+    for offset in range(0, 40, 10):
+        assert fake.events.index(("request", offset + 10)) < fake.events.index(("processed", offset))
+
+    # 测试案例2: 达到 max_records 或某一页失败后停止
+    print("\n2. 测试停止条件:")
+    fake = install_fake(100, latency=0.001)
+    pages = [result async for result in nocodb_client.iter_record_pages("tbl", page_size=30, max_records=45)]
+    print(f"max_records=45 的请求: {fake.requests}")
+    assert sum(len(page["data"]["list"]) for page in pages) == 45 and fake.requests == [(0, 30), (30, 15)]
+    fake = install_fake(100, latency=0.001, failing_offsets={20})
+    pages = [result async for result in nocodb_client.iter_record_pages("tbl", page_size=10)]
+    print(f"第 3 页失败后的请求: {fake.requests}")
+    assert [page["success"] for page in pages] == [True, True, False] and len(fake.requests) == 3
+
+    # 测试案例3: 并发读取的各页按偏移量顺序拼接
+    print("\n3. 测试并发读取与按顺序拼接:")
+    fake = install_fake(1000)
+    result = await nocodb_client.get_records_parallel("tbl", page_size=100, concurrency=4)
+    ids = [row["Id"] for row in result["data"]["list"]]
+    print(f"读取 {len(ids)} 条, 页数: {result['data']['pageInfo']['pages']}, 最大并发: {fake.max_in_flight}")
+    assert result["success"] and ids == list(range(1, 1001))
+    assert result["data"]["pageInfo"] == {"totalRows": 1000, "pages": 10}
+
+    # 测试案例4: 同时进行的页请求不超过 concurrency
+    print("\n4. 测试并发上限:")
+    assert fake.max_in_flight == 4
+    fake = install_fake(1000)
+    await nocodb_client.get_records_parallel("tbl", page_size=50, concurrency=2)
+    print(f"concurrency=2 时的最大并发: {fake.max_in_flight}")
+    assert fake.max_in_flight == 2
+
+    # 测试案例5: max_records 截断最后一页，不会多读
+    print("\n5. 测试 max_records 截断:")
+    fake = install_fake(1000, latency=0.001)
+    result = await nocodb_client.get_records_parallel("tbl", page_size=100, offset=30, max_records=250)
+    ids = [row["Id"] for row in result["data"]["list"]]
+    print(f"请求: {sorted(fake.requests)}")
+    assert ids == list(range(31, 281))
+    assert sorted(fake.requests) == [(30, 100), (130, 100), (230, 50)]
+    fake = install_fake(120, latency=0.001)
+    result = await nocodb_client.get_records_parallel("tbl", page_size=100, max_records=500)
+    assert len(result["data"]["list"]) == 120 and sorted(fake.requests) == [(0, 100), (100, 20)]
+
+    # 测试案例6: 某一页失败时返回该页的错误和已拼接的记录数
+    print("\n6. 测试失败的页:")
+    fake = install_fake(500, latency=0.001, failing_offsets={300})
+    result = await nocodb_client.get_records_parallel("tbl", page_size=100)
+    print(f"结果: success={result['success']}, status_code={result.get('status_code')}, records_fetched={result.get('records_fetched')}")
+    assert not result["success"] and result["status_code"] == 500 and result["records_fetched"] == 300
+
+    # 测试案例7: get_all_table_records 使用并发读取，结果与顺序读取一致
+    print("\n7. 测试 get_all_table_records:")
+    fake = install_fake(730, latency=0.001)
+    parallel = await get_all_table_records("tbl", page_size=100, max_records=1000, concurrency=4)
+    sequential = await get_all_table_records("tbl", page_size=100, max_records=1000, concurrency=1)
+    print(f"并发: {len(parallel['data']['list'])} 条, 顺序: {len(sequential['data']['list'])} 条")
+    assert parallel["success"] and parallel["data"]["list"] == sequential["data"]["list"]
+    assert [row["Id"] for row in parallel["data"]["list"]] == list(range(1, 731))
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+def test_page_fetching():
+    run_with_mock(run_page_tests)
+
+if __name__ == "__main__":
+    test_page_fetching()
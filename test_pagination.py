@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+测试 get_table_records 的响应大小预算、字段截断和继续读取的游标，以及按主键的游标分页
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import re
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    decode_cursor,
+    fit_records,
+    nocodb_client,
+    get_table_records,
+    get_all_table_records
+)
+
+class PagedNocoDB:
+    """按 offset/limit 返回记录的 NocoDB 模拟服务，支持 (Id,gt,x) / (Id,lt,x) 过滤和按 Id 排序"""
+
+    def __init__(self, total_rows, note_size=10):
+        self.rows = [
+            {"Id": i, "Title": f"row {i}", "Note": "n" * note_size, "Data": {"items": ["x" * note_size]}}
+            for i in range(1, total_rows + 1)
+        ]
+        self.requests = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(200, json={"columns": [
+                {"title": "Id", "uidt": "ID", "pk": True},
+                {"title": "Title", "uidt": "SingleLineText"}
+            ]})
+        params = dict(request.url.params)
+        self.requests.append(params)
+        rows = self.rows
+        match = re.match(r"^\(Id,(gt|lt),(\d+)\)", params.get("where", ""))
+        if match:
+            after = int(match.group(2))
+            rows = [row for row in rows if (row["Id"] > after if match.group(1) == "gt" else row["Id"] < after)]
+        if params.get("sort") == "-Id":
+            rows = sorted(rows, key=lambda row: row["Id"], reverse=True)
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 25))
+        page = rows[offset:offset + limit]
+        return httpx.Response(200, json={
+            "list": page,
+            "pageInfo": {"totalRows": len(rows), "isLastPage": offset + limit >= len(rows)}
+        })
+
+def install_fake(total_rows, note_size=10) -> PagedNocoDB:
+    fake = PagedNocoDB(total_rows, note_size)
+    install_mock(fake.handler)
+    return fake
+
+async def run_budget_tests():
+    print("测试响应大小预算与游标")
+    print("=" * 60)
+
+    # 测试案例1: 预算内返回整页，最后一页没有游标
+    print("\n1. 测试预算内的整页:")
+    install_fake(10)
+    result = await get_table_records("tbl", limit=25)
+    page_info = result["data"]["pageInfo"]
+    print(f"pageInfo: {page_info}")
+    assert result["success"] and page_info["returned"] == 10
+    assert not page_info["budgetExhausted"] and page_info["nextCursor"] is None
+
+    # 测试案例2: 超出字节预算时停止添加记录，并返回游标
+    print("\n2. 测试字节预算:")
+    install_fake(100, note_size=500)
+    result = await get_table_records("tbl", limit=100, max_bytes=5000)
+    page_info = result["data"]["pageInfo"]
+    print(f"返回 {page_info['returned']} 条, {page_info['bytes']} 字节, 消息: {result['message']}")
+    assert 0 < page_info["returned"] < 100 and page_info["bytes"] <= 5000
+    assert page_info["budgetExhausted"] and page_info["nextCursor"]
+
+    # 测试案例3: 按游标继续读取，查询条件保存在游标中，不重复也不遗漏
+    print("\n3. 测试游标继续读取:")
+    fake = install_fake(100, note_size=500)
+    seen = []
+    cursor = None
+    calls = 0
+    while True:
+        if cursor is None:
+            result = await get_table_records("tbl", limit=30, max_bytes=8000, sort="Id", where="(Id,gt,0)")
+        else:
+            result = await get_table_records("tbl", limit=30, max_bytes=8000, cursor=cursor)
+        calls += 1
+        seen.extend(row["Id"] for row in result["data"]["list"])
+        cursor = result["data"]["pageInfo"]["nextCursor"]
+        if cursor is None:
+            break
+    print(f"调用次数: {calls}, 读取记录数: {len(seen)}")
+    assert seen == list(range(1, 101))
+    assert all(params.get("where") == "(Id,gt,0)" and params.get("sort") == "Id" for params in fake.requests)
+
+    # 测试案例4: 近似 token 预算
+    print("\n4. 测试 token 预算:")
+    install_fake(100, note_size=500)
+    by_tokens = await get_table_records("tbl", limit=100, max_tokens=1000, max_bytes=0)
+    by_bytes = await get_table_records("tbl", limit=100, max_bytes=4000)
+    print(f"1000 tokens: {by_tokens['data']['pageInfo']['returned']} 条, 4000 字节: {by_bytes['data']['pageInfo']['returned']} 条")
+    assert by_tokens["data"]["pageInfo"]["returned"] == by_bytes["data"]["pageInfo"]["returned"]
+
+    # 测试案例5: 截断过长的文本和嵌套 JSON 字段，不修改原始数据
+    print("\n5. 测试字段截断:")
+    records = [{"Id": 1, "Note": "a" * 1000, "Data": {"items": ["b" * 1000]}, "Short": "ok"}]
+    kept, _, trimmed_fields, _ = fit_records(records, max_field_chars=50)
+    print(f"截断后: {kept[0]['Note'][:60]}..., 截断字段数: {trimmed_fields}")
+    assert trimmed_fields == 2 and kept[0]["Note"].startswith("a" * 50 + "…[+950 chars]")
+    assert len(kept[0]["Data"]["items"][0]) < 100 and kept[0]["Short"] == "ok"
+    assert len(records[0]["Note"]) == 1000
+
+    install_fake(5, note_size=2000)
+    result = await get_table_records("tbl", max_field_chars=100)
+    print(f"pageInfo: {result['data']['pageInfo']}")
+    assert result["data"]["pageInfo"]["trimmedFields"] == 10
+
+    # 测试案例6: 单条记录超出预算时仍返回一条，保证游标前进
+    print("\n6. 测试单条记录超出预算:")
+    install_fake(3, note_size=5000)
+    result = await get_table_records("tbl", limit=3, max_bytes=100)
+    page_info = result["data"]["pageInfo"]
+    assert page_info["returned"] == 1 and page_info["nextCursor"]
+
+    # 测试案例7: 无效游标和其他表的游标
+    print("\n7. 测试无效游标:")
+    result = await get_table_records("tbl", cursor="not-a-cursor")
+    print(f"结果: {result}")
+    assert not result["success"]
+    result = await get_table_records("other", cursor=page_info["nextCursor"])
+    assert not result["success"]
+    assert decode_cursor(page_info["nextCursor"], "tbl")["offset"] == 1
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+async def run_keyset_tests():
+    print("\n测试按主键的游标分页")
+    print("=" * 60)
+
+    # 测试案例1: 按主键分页，每页都是 offset=0 并按主键过滤
+    print("\n1. 测试游标分页请求:")
+    fake = install_fake(100)
+    seen = []
+    result = await get_table_records("tbl", limit=30, keyset=True)
+    while True:
+        seen.extend(row["Id"] for row in result["data"]["list"])
+        cursor = result["data"]["pageInfo"]["nextCursor"]
+        if cursor is None:
+            break
+        result = await get_table_records("tbl", limit=30, cursor=cursor)
+    print(f"请求: {[(params['offset'], params.get('where')) for params in fake.requests]}")
+    assert seen == list(range(1, 101))
+    assert all(params["offset"] == "0" and params["sort"] == "Id" for params in fake.requests)
+    assert fake.requests[1]["where"] == "(Id,gt,30)"
+
+    # 测试案例2: 翻页期间删除了前面的行，游标分页不会跳过记录（offset 分页会）
+    print("\n2. 测试并发删除时不跳过记录:")
+    for keyset in (False, True):
+        fake = install_fake(60)
+        first = await get_table_records("tbl", limit=20, keyset=keyset, sort="Id")
+        fake.rows = fake.rows[10:]
+        second = await get_table_records("tbl", limit=20, cursor=first["data"]["pageInfo"]["nextCursor"])
+        ids = [row["Id"] for row in second["data"]["list"]]
+        print(f"{'keyset' if keyset else 'offset'}: 第二页从 {ids[0]} 开始")
+        assert ids[0] == (21 if keyset else 31)
+
+    # 测试案例3: 与过滤条件组合、降序、字段选择时补上主键
+    print("\n3. 测试过滤条件、降序和字段选择:")
+    fake = install_fake(50)
+    first = await get_table_records("tbl", limit=10, keyset=True, sort="-Id", where="(Title,like,row%)", fields="Title")
+    second = await get_table_records("tbl", limit=10, cursor=first["data"]["pageInfo"]["nextCursor"])
+    print(f"第二页请求: {fake.requests[-1]}")
+    assert [row["Id"] for row in second["data"]["list"]] == list(range(40, 30, -1))
+    assert fake.requests[-1]["where"] == "(Id,lt,41)~and((Title,like,row%))"
+    assert fake.requests[-1]["fields"] == "Title,Id" and fake.requests[-1]["sort"] == "-Id"
+
+    # 测试案例4: 游标分页只能按主键排序
+    print("\n4. 测试不支持的排序:")
+    result = await get_table_records("tbl", keyset=True, sort="Title")
+    print(f"结果: {result}")
+    assert not result["success"]
+
+    # 测试案例5: get_all_table_records 按主键批量读取，并可用游标继续
+    print("\n5. 测试批量游标读取:")
+    fake = install_fake(250)
+    first = await get_all_table_records("tbl", page_size=100, max_records=150, keyset=True)
+    page_info = first["data"]["pageInfo"]
+    print(f"第一次: {page_info['returned']} 条, isComplete: {page_info['isComplete']}")
+    assert page_info["returned"] == 150 and not page_info["isComplete"] and page_info["nextCursor"]
+    rest = await get_all_table_records("tbl", page_size=100, max_records=1000, cursor=page_info["nextCursor"])
+    page_info = rest["data"]["pageInfo"]
+    print(f"第二次: {page_info['returned']} 条, isComplete: {page_info['isComplete']}")
+    ids = [row["Id"] for row in first["data"]["list"] + rest["data"]["list"]]
+    assert ids == list(range(1, 251)) and page_info["isComplete"] and page_info["nextCursor"] is None
+    assert all(params["offset"] == "0" for params in fake.requests)
+
+    # 测试案例6: 预算小于一条记录时仍返回第一条，游标继续前进
+    print("\n6. 测试预算小于一条记录:")
+    fake = install_fake(3)
+    ids = []
+    result = await get_all_table_records("tbl", page_size=10, max_records=10, max_bytes=10, keyset=True)
+    while True:
+        assert result["success"] and result["data"]["pageInfo"]["returned"] == 1
+        ids.extend(row["Id"] for row in result["data"]["list"])
+        cursor = result["data"]["pageInfo"]["nextCursor"]
+        if cursor is None:
+            break
+        result = await get_all_table_records("tbl", page_size=10, max_records=10, max_bytes=10, cursor=cursor)
+    print(f"逐条读取: {ids}")
+    assert ids == [1, 2, 3]
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+def test_pagination():
+    run_with_mock(run_budget_tests, run_keyset_tests)
+
+if __name__ == "__main__":
+    test_pagination()
@@ -5,34 +5,19 @@
 
 import json
 import copy
+import time
 from typing import Any, Dict, List, Optional, Union
+from server import READONLY_FIELDS, filter_readonly_fields
 
-# 复制过滤函数用于测试
-READONLY_FIELDS = {
-    'CreatedAt', 'UpdatedAt', 'Created By', 'Updated By',
-    'createdAt', 'updatedAt', 'created_by', 'updated_by',
-    'nc_created_at', 'nc_updated_at', 'nc_created_by', 'nc_updated_by'
-}
-
-def filter_readonly_fields(records: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+def legacy_filter_readonly_fields(records: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
     """
-    过滤掉只读字段，防止更新时出错
-    
-    Args:
-        records: 单个记录字典或记录列表
-        
-    Returns:
-        过滤后的记录
+    旧版实现（深拷贝 + 遍历整个只读字段集合），仅用于性能对比
     """
     def filter_single_record(record: Dict[str, Any]) -> Dict[str, Any]:
-        # 深拷贝记录以避免修改原始数据
         filtered_record = copy.deepcopy(record)
-        
-        # 删除只读字段
         for field in READONLY_FIELDS:
             if field in filtered_record:
                 del filtered_record[field]
-                
         return filtered_record
     
     if isinstance(records, list):
@@ -144,6 +129,74 @@ def test_readonly_field_filtering():
     print(f"原始数据字段（过滤后）: {list(original_data.keys())}")
     print(f"原始数据未被修改: {original_keys == list(original_data.keys())}")
     print(f"过滤后数据字段: {list(filtered_data.keys())}")
+    
+    # 测试案例6: 嵌套字段不被修改，且与新旧实现结果一致
+    print("\n6. 测试嵌套字段（JSON/附件）:")
+    nested_data = {
+        "Id": 1,
+        "UpdatedAt": "2025-01-02 00:00:00",
+        "JSON": {"tags": ["a", "b"]},
+        "Attachment": [{"url": "https://example.com/a.png", "size": 1}]
+    }
+    filtered_nested = filter_readonly_fields(nested_data)
+    print(f"过滤后字段: {list(filtered_nested.keys())}")
+    print(f"与旧实现结果一致: {filtered_nested == legacy_filter_readonly_fields(nested_data)}")
+    print(f"原始数据保留UpdatedAt: {'UpdatedAt' in nested_data}")
+    assert filtered_nested == legacy_filter_readonly_fields(nested_data)
+    assert "UpdatedAt" in nested_data
+    
+    # 测试案例7: 原地过滤模式
+    print("\n7. 测试原地过滤模式 (in_place=True):")
+    owned_data = [{"Id": 1, "CreatedAt": "x", "name": "a"}, {"Id": 2, "nc_updated_at": "y", "name": "b"}]
+    filtered_owned = filter_readonly_fields(owned_data, in_place=True)
+    print(f"过滤后数据: {filtered_owned}")
+    print(f"原记录被直接修改: {owned_data[0] is filtered_owned[0] and 'CreatedAt' not in owned_data[0]}")
+    assert owned_data[0] is filtered_owned[0]
+    assert "CreatedAt" not in owned_data[0] and "nc_updated_at" not in owned_data[1]
+
+def make_benchmark_records(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "Id": i,
+            "CreatedAt": "2025-01-01 00:00:00+00:00",
+            "UpdatedAt": "2025-01-02 00:00:00+00:00",
+            "Title": f"record {i}",
+            "status": "done",
+            "JSON": {"owner": {"name": "user", "roles": ["a", "b", "c"]}, "scores": list(range(10))},
+            "Attachment": [
+                {"url": f"https://example.com/{i}/{n}.png", "title": f"{n}.png", "mimetype": "image/png", "size": 1024}
+                for n in range(3)
+            ]
+        }
+        for i in range(count)
+    ]
+
+def test_readonly_filter_benchmark():
+    """
+    对比新旧实现过滤 10k 条记录的耗时
+    """
+    print("\n只读字段过滤性能对比（10k 条记录）")
+    print("=" * 60)
+    
+    def best_of(func, repeat: int = 3) -> float:
+        timings = []
+        for _ in range(repeat):
+            records = make_benchmark_records(10000)
+            started_at = time.perf_counter()
+            func(records)
+            timings.append(time.perf_counter() - started_at)
+        return min(timings)
+    
+    legacy_time = best_of(legacy_filter_readonly_fields)
+    copy_time = best_of(filter_readonly_fields)
+    in_place_time = best_of(lambda records: filter_readonly_fields(records, in_place=True))
+    
+    print(f"旧实现（深拷贝）: {legacy_time * 1000:.1f} ms")
+    print(f"浅拷贝过滤:       {copy_time * 1000:.1f} ms ({legacy_time / copy_time:.1f}x)")
+    print(f"原地过滤:         {in_place_time * 1000:.1f} ms ({legacy_time / in_place_time:.1f}x)")
+    assert copy_time < legacy_time
+    assert in_place_time < legacy_time
 
 if __name__ == "__main__":
-    test_readonly_field_filtering()
\ No newline at end of file
+    test_readonly_field_filtering()
+    test_readonly_filter_benchmark()
\ No newline at end of file
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+测试按表结构对记录进行类型校验与转换（写入前在本地拒绝不合法的记录）
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import json
+import time
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    RecordValidator,
+    nocodb_client,
+    create_table_records,
+    update_table_records
+)
+
+COLUMNS = [
+    {"title": "Id", "uidt": "ID", "pk": True},
+    {"title": "Title", "uidt": "SingleLineText", "pv": True},
+    {"title": "Count", "uidt": "Number"},
+    {"title": "Price", "uidt": "Currency"},
+    {"title": "Done", "uidt": "Checkbox"},
+    {"title": "Due", "uidt": "Date"},
+    {"title": "Email", "uidt": "Email"},
+    {"title": "Tags", "uidt": "MultiSelect"},
+    {"title": "Extra", "uidt": "JSON"},
+    {"title": "Total", "uidt": "Formula"}
+]
+
+class FakeNocoDB:
+    """返回固定表结构，并记录写入请求"""
+
+    def __init__(self):
+        self.writes = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(200, json={"id": "tbl", "title": "Tasks", "columns": COLUMNS})
+        body = json.loads(request.content)
+        self.writes.append((request.method, body))
+        return httpx.Response(200, json=[{"Id": row.get("Id", i + 1)} for i, row in enumerate(body)])
+
+def install_fake() -> FakeNocoDB:
+    fake = FakeNocoDB()
+    install_mock(fake.handler)
+    return fake
+
+async def run_validation_tests():
+    print("测试记录类型校验")
+    print("=" * 60)
+
+    column_types = {column["title"]: column["uidt"] for column in COLUMNS}
+    validator = RecordValidator(column_types, "Id")
+
+    # 测试案例1: 合法值被转换为列类型
+    print("\n1. 测试类型转换:")
+    record = {
+        "Title": 123, "Count": "42", "Price": "9.5", "Done": "yes",
+        "Due": "2025-03-01T10:00:00Z", "Email": " a@b.co ", "Tags": ["x", "y"], "Extra": {"k": [1]}
+    }
+    errors = validator.validate([record])
+    print(f"转换后: {record}")
+    assert errors == []
+    assert record == {
+        "Title": "123", "Count": 42, "Price": 9.5, "Done": True,
+        "Due": "2025-03-01", "Email": "a@b.co", "Tags": "x,y", "Extra": {"k": [1]}
+    }
+
+    # 测试案例2: 不合法的值和未知列被报告，None 可以清空字段
+    print("\n2. 测试不合法的值:")
+    records = [
+        {"Title": "ok", "Count": None},
+        {"Count": "12abc", "Done": "maybe"},
+        {"Due": "31/01/2025", "Email": "not-an-email", "Unknown": 1},
+        {"Count": True}
+    ]
+    errors = validator.validate(records)
+    for error in errors:
+        print(f"  {error}")
+    assert [(error["index"], error["field"]) for error in errors] == [
+        (1, "Count"), (1, "Done"), (2, "Due"), (2, "Email"), (2, "Unknown"), (3, "Count")
+    ]
+
+    # 测试案例3: 更新时要求主键
+    print("\n3. 测试主键检查:")
+    errors = validator.validate([{"Id": 1, "Title": "a"}, {"id": 2}, {"Title": "b"}], require_primary_key=True)
+    print(f"错误: {errors}")
+    assert errors == [{"index": 2, "field": "Id", "error": "missing primary key"}]
+
+    # 测试案例4: 错误数量上限
+    print("\n4. 测试错误数量上限:")
+    errors = validator.validate([{"Count": "x"}] * 1000, max_errors=10)
+    assert len(errors) == 10
+
+    # 测试案例5: 不合法的记录不会发送到 NocoDB
+    print("\n5. 测试写入前拒绝:")
+    fake = install_fake()
+    result = await create_table_records("tbl", [{"Title": "a", "Count": "1"}, {"Title": "b", "Count": "two"}], validate=True)
+    print(f"结果: {result}")
+    assert not result["success"] and fake.writes == []
+    assert result["error"]["invalid_fields"] == [
+        {"index": 1, "field": "Count", "error": "expected an integer, got 'two'"}
+    ]
+
+    # 测试案例6: 合法记录转换后发送，只读列先被过滤
+    print("\n6. 测试转换后发送:")
+    fake = install_fake()
+    result = await update_table_records("tbl", json.dumps([{"Id": 1, "Count": "7", "Done": 1, "Total": 99}]), validate=True)
+    print(f"发送的数据: {fake.writes}")
+    assert result["success"]
+    assert fake.writes == [("PATCH", [{"Id": 1, "Count": 7, "Done": True}])]
+
+    # 测试案例7: 未开启校验时保持原有行为
+    print("\n7. 测试关闭校验:")
+    fake = install_fake()
+    result = await create_table_records("tbl", [{"Title": "a", "Count": "two"}])
+    assert result["success"] and fake.writes == [("POST", [{"Title": "a", "Count": "two"}])]
+
+    # 测试案例8: 明确要求校验但无法读取表结构时报错，不发送记录
+    print("\n8. 测试无法读取表结构时的校验:")
+    fake = FakeNocoDB()
+
+    async def no_schema(request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(403, json={"msg": "Forbidden"})
+        return await fake.handler(request)
+
+    install_mock(no_schema)
+    result = await create_table_records("tbl", [{"Title": "a", "Count": "two"}], validate=True)
+    print(f"结果: {result}")
+    assert not result["success"] and fake.writes == []
+    result = await create_table_records("tbl", [{"Title": "a"}])
+    assert result["success"] and len(fake.writes) == 1
+
+    # 测试案例9: 校验速度
+    print("\n9. 测试校验速度:")
+    records = [
+        {"Id": i, "Title": f"row {i}", "Count": str(i), "Price": i * 0.5, "Done": i % 2 == 0, "Due": "2025-01-31"}
+        for i in range(10000)
+    ]
+    started_at = time.perf_counter()
+    errors = validator.validate(records, require_primary_key=True)
+    elapsed = time.perf_counter() - started_at
+    print(f"10000 条记录校验耗时: {elapsed * 1000:.1f}ms")
+    assert errors == [] and records[5]["Count"] == 5
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+def test_record_validation():
+    run_with_mock(run_validation_tests)
+
+if __name__ == "__main__":
+    test_record_validation()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+测试 NocoDBClient 对瞬时错误的重试逻辑、客户端限流、熔断器以及超时与截止时间
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import asyncio
+import time
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    NocoDBClient,
+    TokenBucket,
+    call_limits,
+    get_all_table_records,
+    nocodb_client,
+    parse_timeout
+)
+
+class FlakyNocoDB:
+    """按顺序返回预设的响应（或抛出网络异常）的 NocoDB 模拟服务"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        item = self.responses.pop(0) if self.responses else 200
+        if isinstance(item, Exception):
+            raise item
+        if isinstance(item, tuple):
+            status_code, headers = item
+            return httpx.Response(status_code, headers=headers, json={"msg": "retry later"})
+        if item == 200:
+            return httpx.Response(200, json={"list": [], "pageInfo": {"totalRows": 0}})
+        return httpx.Response(item, json={"msg": f"status {item}"})
+
+def make_client(fake: FlakyNocoDB, **kwargs) -> NocoDBClient:
+    options = {"max_retries": 3, "retry_backoff": 0.01, "retry_max_backoff": 0.05}
+    options.update(kwargs)
+    client = NocoDBClient("http://nocodb.test", "token", **options)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    return client
+
+async def run_retry_tests():
+    print("测试瞬时错误的重试逻辑")
+    print("=" * 60)
+
+    # 测试案例1: 读请求遇到 502/503 后重试成功
+    print("\n1. 测试读请求重试:")
+    fake = FlakyNocoDB([502, 503, 200])
+    client = make_client(fake)
+    result = await client.get_records("tbl")
+    print(f"结果: {result['success']}, 请求次数: {fake.calls}, 重试次数: {client.retries}")
+    assert result["success"] and fake.calls == 3 and client.retries == 2
+    await client.aclose()
+
+    # 测试案例2: 超过最大重试次数后返回最后一次的错误
+    print("\n2. 测试重试次数用尽:")
+    fake = FlakyNocoDB([503, 503, 503, 503, 503])
+    client = make_client(fake, max_retries=2)
+    result = await client.get_records("tbl")
+    print(f"结果: {result}, 请求次数: {fake.calls}")
+    assert not result["success"] and result["status_code"] == 503 and fake.calls == 3
+    await client.aclose()
+
+    # 测试案例3: 网络错误对幂等请求重试
+    print("\n3. 测试网络错误重试:")
+    fake = FlakyNocoDB([httpx.ReadTimeout("timed out"), 200])
+    client = make_client(fake)
+    result = await client.delete_record("tbl", "1")
+    print(f"结果: {result['success']}, 请求次数: {fake.calls}")
+    assert result["success"] and fake.calls == 2
+    await client.aclose()
+
+    # 测试案例4: 创建请求不在 503 或读超时后重试（可能已被处理），但会在 429 后重试
+    print("\n4. 测试非幂等请求:")
+    fake = FlakyNocoDB([503])
+    client = make_client(fake)
+    result = await client.create_records("tbl", [{"Title": "a"}])
+    print(f"503 后请求次数: {fake.calls}")
+    assert not result["success"] and fake.calls == 1
+
+    fake = FlakyNocoDB([httpx.ReadTimeout("timed out")])
+    client = make_client(fake)
+    try:
+        await client.create_records("tbl", [{"Title": "a"}])
+        raised = False
+    except httpx.ReadTimeout:
+        raised = True
+    print(f"读超时后直接报错: {raised}, 请求次数: {fake.calls}")
+    assert raised and fake.calls == 1
+
+    fake = FlakyNocoDB([429, 200])
+    client = make_client(fake)
+    await client.create_records("tbl", [{"Title": "a"}])
+    print(f"429 后请求次数: {fake.calls}")
+    assert fake.calls == 2
+    await client.aclose()
+
+    # 测试案例5: 遵循 Retry-After 响应头
+    print("\n5. 测试 Retry-After:")
+    fake = FlakyNocoDB([(429, {"Retry-After": "0.2"}), 200])
+    client = make_client(fake)
+    started_at = time.monotonic()
+    result = await client.get_records("tbl")
+    waited = time.monotonic() - started_at
+    print(f"结果: {result['success']}, 等待时间: {waited:.2f}s")
+    assert result["success"] and waited >= 0.2
+    await client.aclose()
+
+    # 测试案例6: 超出重试截止时间时不再等待
+    print("\n6. 测试重试截止时间:")
+    fake = FlakyNocoDB([(503, {"Retry-After": "30"}), 200])
+    client = make_client(fake, retry_deadline=1)
+    started_at = time.monotonic()
+    result = await client.get_records("tbl")
+    print(f"结果: {result.get('status_code')}, 耗时: {time.monotonic() - started_at:.2f}s")
+    assert not result["success"] and fake.calls == 1
+    await client.aclose()
+
+    # 测试案例7: 重试截止时间按整个工具调用计算，而不是每个请求重新计时
+    print("\n7. 测试按调用计算的重试截止时间:")
+    fake = FlakyNocoDB([503, 503, 200])
+    client = make_client(fake, retry_deadline=0.2)
+    with call_limits():
+        await asyncio.sleep(0.25)
+        late = await client.get_records("tbl")
+    fresh = await client.get_records("tbl")
+    print(f"调用内已超出截止时间: {late.get('status_code')}, 新的调用: {fresh['success']}, 请求次数: {fake.calls}")
+    assert not late["success"] and late["status_code"] == 503
+    assert fresh["success"] and fake.calls == 3
+    await client.aclose()
+
+    print("\n测试完成！")
+
+async def run_rate_limit_tests():
+    print("\n测试客户端限流（令牌桶）")
+    print("=" * 60)
+
+    # 测试案例1: 突发容量内不等待，超出后按速率排队
+    print("\n1. 测试令牌桶排队:")
+    bucket = TokenBucket(rate=20, burst=5)
+    started_at = time.monotonic()
+    await asyncio.gather(*[bucket.acquire() for _ in range(15)])
+    elapsed = time.monotonic() - started_at
+    stats = bucket.get_stats()
+    print(f"15 个请求耗时: {elapsed:.2f}s, 统计: {stats}")
+    # 前 5 个立即通过，其余 10 个以每秒 20 个的速率放行，约 0.5 秒
+    assert 0.4 <= elapsed < 1.0
+    assert stats["requests"] == 15 and stats["max_queue_depth"] >= 10
+    assert stats["queue_depth"] == 0
+
+    # 测试案例2: 客户端的所有请求都经过限流器
+    print("\n2. 测试客户端限流:")
+    fake = FlakyNocoDB([])
+    client = make_client(fake, rate_limit=50, rate_burst=2)
+    started_at = time.monotonic()
+    results = await asyncio.gather(*[client.get_records("tbl", 25, offset) for offset in range(0, 250, 25)])
+    elapsed = time.monotonic() - started_at
+    print(f"10 个请求耗时: {elapsed:.2f}s, 统计: {client.get_rate_limit_stats()}")
+    assert all(result["success"] for result in results)
+    assert elapsed >= 0.14
+    await client.aclose()
+
+    print("\n测试完成！")
+
+async def run_circuit_breaker_tests():
+    print("\n测试熔断器")
+    print("=" * 60)
+
+    # 测试案例1: 连续失败后熔断，之后的请求立即失败
+    print("\n1. 测试连续失败后熔断:")
+    fake = FlakyNocoDB([httpx.ConnectError("connection refused")] * 3)
+    client = make_client(fake, max_retries=0, circuit_failure_threshold=3, circuit_recovery_timeout=0.2)
+    for _ in range(3):
+        try:
+            await client.get_records("tbl")
+        except httpx.ConnectError:
+            pass
+    started_at = time.monotonic()
+    try:
+        await client.get_records("tbl")
+        rejected = False
+    except CircuitOpenError as e:
+        rejected = True
+        print(f"熔断错误: {e}")
+    print(f"立即失败: {rejected}, 耗时: {time.monotonic() - started_at:.3f}s, 请求次数: {fake.calls}")
+    print(f"统计: {client.get_circuit_breaker_stats()}")
+    assert rejected and fake.calls == 3
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
+
+    # 测试案例2: 冷却时间后半开，探测成功则恢复
+    print("\n2. 测试半开探测成功后恢复:")
+    await asyncio.sleep(0.25)
+    result = await client.get_records("tbl")
+    print(f"探测结果: {result['success']}, 状态: {client.circuit_breaker.state}")
+    assert result["success"] and client.circuit_breaker.state == CircuitBreaker.CLOSED
+    await client.aclose()
+
+    # 测试案例3: 半开状态下探测失败则重新熔断，且只放行一个探测请求
+    print("\n3. 测试半开探测失败:")
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+    breaker.record_outcome(False)
+    breaker.record_outcome(False)
+    await asyncio.sleep(0.06)
+    breaker.before_request()
+    try:
+        breaker.before_request()
+        second_probe_allowed = True
+    except CircuitOpenError:
+        second_probe_allowed = False
+    breaker.record_outcome(False)
+    print(f"允许第二个探测: {second_probe_allowed}, 状态: {breaker.state}, 熔断次数: {breaker.times_opened}")
+    assert not second_probe_allowed
+    assert breaker.state == CircuitBreaker.OPEN and breaker.times_opened == 2
+
+    # 测试案例4: 4xx 响应不计为失败
+    print("\n4. 测试 4xx 不触发熔断:")
+    fake = FlakyNocoDB([400, 404, 422, 400])
+    client = make_client(fake, circuit_failure_threshold=2)
+    for _ in range(4):
+        await client.get_records("tbl")
+    print(f"状态: {client.circuit_breaker.state}")
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+    await client.aclose()
+
+    print("\n测试完成！")
+
+async def run_timeout_tests():
+    print("\n测试超时配置与截止时间")
+    print("=" * 60)
+
+    # 测试案例1: 按操作类型配置超时，未配置的操作使用默认值
+    print("\n1. 测试按操作类型配置超时:")
+    default = httpx.Timeout(connect=5, read=30, write=30, pool=10)
+    fake = FlakyNocoDB([])
+    client = make_client(fake, timeout=default, operation_timeouts={"get": "2", "write": "5,300,300,10"})
+    print(f"get: {client.get_timeout('get')}, write: {client.get_timeout('write')}, meta: {client.get_timeout('meta')}")
+    assert client.get_timeout("get") == httpx.Timeout(connect=5, read=2, write=2, pool=10)
+    assert client.get_timeout("write") == httpx.Timeout(connect=5, read=300, write=300, pool=10)
+    assert client.get_timeout("meta") == default
+    assert parse_timeout("", default) == default
+    try:
+        parse_timeout("1,2", default)
+        invalid_rejected = False
+    except ValueError:
+        invalid_rejected = True
+    assert invalid_rejected
+
+    # 测试案例2: 请求使用对应操作的超时，单次调用可以覆盖
+    print("\n2. 测试请求使用的超时:")
+    seen = []
+
+    async def recording_handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.extensions["timeout"]))
+        return httpx.Response(200, json={"list": [], "pageInfo": {"totalRows": 0}})
+
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(recording_handler))
+    await client.get_records("tbl")
+    await client.update_records("tbl", [{"Id": 1}])
+    with call_limits(timeout=0.5):
+        await client.get_records("tbl", 25, 25)
+    print(f"请求超时: {seen}")
+    assert seen[0][1]["read"] == 2 and seen[1][1]["read"] == 300
+    assert seen[2][1] == {"connect": 0.5, "read": 0.5, "write": 0.5, "pool": 0.5}
+    await client.aclose()
+
+    # 测试案例3: 截止时间限制重试，不会在截止时间之后再发起重试
+    print("\n3. 测试截止时间限制重试:")
+    fake = FlakyNocoDB([503] * 10)
+    client = make_client(fake, max_retries=10, retry_backoff=0.1, retry_max_backoff=0.1)
+    started_at = time.monotonic()
+    with call_limits(deadline=0.3):
+        result = await client.update_records("tbl", [{"Id": 1}])
+    elapsed = time.monotonic() - started_at
+    print(f"结果: {result.get('status_code')}, 请求次数: {fake.calls}, 耗时: {elapsed:.2f}s")
+    assert not result["success"] and elapsed < 0.4 and fake.calls < 10
+    await client.aclose()
+
+    # 测试案例4: 截止时间中断正在进行的慢请求
+    print("\n4. 测试截止时间中断慢请求:")
+
+    async def slow_handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"list": [], "pageInfo": {"totalRows": 0}})
+
+    client = NocoDBClient("http://nocodb.test", "token")
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+    started_at = time.monotonic()
+    try:
+        with call_limits(deadline=0.2):
+            await client.get_records("tbl")
+        raised = False
+    except DeadlineExceededError as e:
+        raised = True
+        print(f"截止时间错误: {e}")
+    print(f"耗时: {time.monotonic() - started_at:.2f}s")
+    assert raised and time.monotonic() - started_at < 0.5
+    await client.aclose()
+
+    # 测试案例5: 分页读取到截止时间时返回已读取的记录和继续读取的偏移量
+    print("\n5. 测试分页读取的截止时间:")
+
+    async def paged_handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.1)
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        rows = [{"Id": i} for i in range(offset + 1, min(offset + limit, 1000) + 1)]
+        return httpx.Response(200, json={"list": rows, "pageInfo": {"totalRows": 1000, "isLastPage": offset + limit >= 1000}})
+
+    install_mock(paged_handler)
+    started_at = time.monotonic()
+    result = await get_all_table_records("tbl", page_size=100, max_records=1000, deadline=0.35)
+    elapsed = time.monotonic() - started_at
+    page_info = result["data"]["pageInfo"]
+    print(f"结果: {result['message']}, pageInfo: {page_info}, 耗时: {elapsed:.2f}s")
+    assert result["success"] and not page_info["isComplete"]
+    assert 0 < page_info["returned"] < 1000 and page_info["nextOffset"] == page_info["returned"]
+    assert elapsed < 0.5
+    await nocodb_client.aclose()
+
+    print("\n测试完成！")
+
+def test_resilience():
+    run_with_mock(run_retry_tests, run_rate_limit_tests, run_circuit_breaker_tests, run_timeout_tests)
+
+if __name__ == "__main__":
+    test_resilience()
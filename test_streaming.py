@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+测试记录页的流式 JSON 解析，以及 get_all_table_records 按字节预算流式读取
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import json
+import tracemalloc
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    iter_json_list,
+    nocodb_client,
+    get_all_table_records
+)
+
+def make_page(count, start=1, total_rows=None, attachment_size=0):
+    rows = [
+        {
+            "Id": i,
+            "Title": f"记录 {i}",
+            "Score": i * 1.5,
+            "Tags": ["a", "b"],
+            "Attachment": [{"title": "file.txt", "data": "x" * attachment_size}]
+        }
+        for i in range(start, start + count)
+    ]
+    return {
+        "list": rows,
+        "pageInfo": {"totalRows": total_rows or count, "page": 1, "isLastPage": total_rows is None}
+    }
+
+async def text_chunks(text, size):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+async def collect(text, size, rest=None):
+    return [item async for item in iter_json_list(text_chunks(text, size), "list", rest)]
+
+class StreamingNocoDB:
+    """按小块发送响应体的 NocoDB 模拟服务，统计实际被读取的字节数"""
+
+    def __init__(self, total_rows, attachment_size=0, chunk_size=4096):
+        self.total_rows = total_rows
+        self.attachment_size = attachment_size
+        self.chunk_size = chunk_size
+        self.bytes_sent = 0
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        count = max(0, min(limit, self.total_rows - offset))
+        page = make_page(count, offset + 1, self.total_rows, self.attachment_size)
+        page["pageInfo"]["isLastPage"] = offset + count >= self.total_rows
+        body = json.dumps(page).encode("utf-8")
+
+        async def stream():
+            for i in range(0, len(body), self.chunk_size):
+                self.bytes_sent += len(body[i:i + self.chunk_size])
+                yield body[i:i + self.chunk_size]
+
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=stream())
+
+async def run_streaming_tests():
+    print("测试记录页的流式 JSON 解析")
+    print("=" * 60)
+
+    # 测试案例1: 任意分块位置下解析结果与 json.loads 一致
+    print("\n1. 测试任意分块位置:")
+    page = make_page(5)
+    page["list"][2]["Note"] = "含有 \"引号\"、逗号, 和 ] 括号 } 的文本"
+    text = json.dumps(page, ensure_ascii=False, indent=1)
+    for size in (1, 2, 3, 7, 64, len(text)):
+        rest = {}
+        assert await collect(text, size, rest) == page["list"], size
+        assert rest == {"pageInfo": page["pageInfo"]}, size
+    print("分块大小 1 ~ 全部: 解析结果一致")
+
+    # 测试案例2: list 不在第一个位置、空列表、没有 list 字段
+    print("\n2. 测试字段顺序和空列表:")
+    rest = {}
+    items = await collect('{"pageInfo": {"totalRows": 2}, "list": [1, 22, 333]}', 2, rest)
+    print(f"结果: {items}, 其他字段: {rest}")
+    assert items == [1, 22, 333] and rest["pageInfo"]["totalRows"] == 2
+    assert await collect('{"list": []}', 1) == []
+    assert await collect('{}', 1) == []
+    assert await collect('{"msg": "no list"}', 3) == []
+
+    # 测试案例3: 无效或被截断的 JSON 会报错
+    print("\n3. 测试无效输入:")
+    for bad in ('{"list": [1, 2', '{"list": [1 2]}', '[1, 2]', '{"list": [{"Id": 1}'):
+        try:
+            await collect(bad, 4)
+            raised = False
+        except json.JSONDecodeError:
+            raised = True
+        print(f"{bad!r}: 报错 {raised}")
+        assert raised
+
+    # 测试案例4: 单条很大的记录分成很多小块到达
+    print("\n4. 测试大记录:")
+    page = make_page(3, attachment_size=200_000)
+    items = await collect(json.dumps(page), 512)
+    assert items == page["list"]
+    print("3 条记录，每条约 200KB: 解析正确")
+
+    # 测试案例5: 流式解析的内存峰值低于一次性解析整页
+    print("\n5. 测试内存峰值:")
+    text = json.dumps(make_page(1000, attachment_size=2_000))
+
+    async def peak(consume):
+        tracemalloc.start()
+        await consume()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_bytes
+
+    async def parse_whole():
+        chunks = [chunk async for chunk in text_chunks(text, 8192)]
+        for _ in json.loads("".join(chunks))["list"]:
+            pass
+
+    async def parse_streaming():
+        async for _ in iter_json_list(text_chunks(text, 8192)):
+            pass
+
+    whole = await peak(parse_whole)
+    streaming = await peak(parse_streaming)
+    print(f"整页解析峰值: {whole / 1024:.0f}KB, 流式解析峰值: {streaming / 1024:.0f}KB")
+    assert streaming * 5 < whole
+
+    # 测试案例6: 按字节预算读取时，预算用完后不再下载页面剩余部分
+    print("\n6. 测试按字节预算流式读取:")
+    fake = StreamingNocoDB(total_rows=1000, attachment_size=1_000)
+    install_mock(fake.handler)
+    result = await get_all_table_records("tbl", page_size=1000, max_records=1000, max_bytes=20_000)
+    page_info = result["data"]["pageInfo"]
+    page_bytes = len(json.dumps(make_page(1000, attachment_size=1_000)))
+    print(f"返回: {page_info}, 下载字节: {fake.bytes_sent} / 整页约 {page_bytes}")
+    assert result["success"] and 0 < page_info["returned"] < 1000
+    assert page_info["nextOffset"] == page_info["returned"] and not page_info["isComplete"]
+    assert fake.bytes_sent < page_bytes / 10
+
+    # 测试案例7: 预算足够时按页读完整个表
+    print("\n7. 测试预算足够时读完整个表:")
+    fake = StreamingNocoDB(total_rows=250)
+    install_mock(fake.handler)
+    result = await get_all_table_records("tbl", page_size=100, max_records=1000, max_bytes=10_000_000)
+    page_info = result["data"]["pageInfo"]
+    print(f"返回: {page_info}, 请求次数: {fake.requests}")
+    assert result["success"] and page_info["isComplete"] and page_info["returned"] == 250
+    assert [row["Id"] for row in result["data"]["list"]] == list(range(1, 251))
+    assert page_info["totalRows"] == 250 and fake.requests == 3
+
+    # 测试案例8: 预算小于一条记录时仍返回第一条，游标继续前进
+    print("\n8. 测试预算小于一条记录:")
+    fake = StreamingNocoDB(total_rows=3, attachment_size=1_000)
+    install_mock(fake.handler)
+    offsets = []
+    offset = 0
+    while True:
+        result = await get_all_table_records("tbl", page_size=10, max_records=10, max_bytes=10, offset=offset)
+        page_info = result["data"]["pageInfo"]
+        assert result["success"] and page_info["returned"] == 1
+        offsets.append(page_info["nextOffset"])
+        if page_info["isComplete"]:
+            break
+        offset = page_info["nextOffset"]
+    print(f"每次返回后的 nextOffset: {offsets}")
+    assert offsets[:2] == [1, 2] and len(offsets) == 3
+    await nocodb_client.aclose()
+
+    print("\n测试完成！")
+
+def test_streaming():
+    run_with_mock(run_streaming_tests)
+
+if __name__ == "__main__":
+    test_streaming()
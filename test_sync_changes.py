@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+测试 sync_table_changes 按最后修改时间增量读取记录
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import re
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    changed_since_where,
+    nocodb_client,
+    sync_table_changes
+)
+
+class ChangingNocoDB:
+    """支持按 UpdatedAt / Id 过滤和排序（包括修改时间为空的行）的 NocoDB 模拟服务，可以模拟记录被修改"""
+
+    def __init__(self, total_rows, columns=None):
+        self.rows = [
+            {"Id": i, "Title": f"row {i}", "UpdatedAt": self.timestamp(i // 10)}
+            for i in range(1, total_rows + 1)
+        ]
+        self.columns = columns or [
+            {"title": "Id", "uidt": "ID", "pk": True},
+            {"title": "Title", "uidt": "SingleLineText"},
+            {"title": "UpdatedAt", "uidt": "DateTime"}
+        ]
+        self.requests = []
+
+    @staticmethod
+    def timestamp(second):
+        return f"2025-01-01 10:{second // 60:02d}:{second % 60:02d}+00:00"
+
+    def touch(self, record_id, second):
+        for row in self.rows:
+            if row["Id"] == record_id:
+                row["UpdatedAt"] = self.timestamp(second)
+
+    def matches(self, row, where):
+        if not where:
+            return True
+        if "(UpdatedAt,blank)" in where:
+            after = re.search(r"\(UpdatedAt,blank\)~and\(Id,gt,(\d+)\)", where)
+            if row["UpdatedAt"] is not None or (after and row["Id"] <= int(after.group(1))):
+                return False
+            title = re.search(r"\(Title,eq,([^)]+)\)", where)
+            return not title or row["Title"] == title.group(1)
+        if row["UpdatedAt"] is None:
+            return False
+        strict = re.search(r"\(UpdatedAt,gt,exactDate,([^)]+)\)~or", where)
+        if strict:
+            after = int(re.search(r"\(Id,gt,(\d+)\)", where).group(1))
+            since = strict.group(1)
+            if not (row["UpdatedAt"] > since or (row["UpdatedAt"] == since and row["Id"] > after)):
+                return False
+        since = re.search(r"\(UpdatedAt,gte,exactDate,([^)]+)\)", where)
+        if since and row["UpdatedAt"] < since.group(1):
+            return False
+        title = re.search(r"\(Title,eq,([^)]+)\)", where)
+        return not title or row["Title"] == title.group(1)
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(200, json={"columns": self.columns})
+        params = dict(request.url.params)
+        self.requests.append(params)
+        rows = [row for row in self.rows if self.matches(row, params.get("where"))]
+        if params.get("sort") == "UpdatedAt,Id":
+            rows.sort(key=lambda row: (row["UpdatedAt"], row["Id"]))
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 25))
+        page = rows[offset:offset + limit]
+        if "fields" in params:
+            page = [{key: row[key] for key in params["fields"].split(",")} for row in page]
+        return httpx.Response(200, json={
+            "list": page,
+            "pageInfo": {"totalRows": len(rows), "isLastPage": offset + limit >= len(rows)}
+        })
+
+def install_fake(total_rows, columns=None) -> ChangingNocoDB:
+    fake = ChangingNocoDB(total_rows, columns)
+    install_mock(fake.handler)
+    return fake
+
+async def run_sync_tests():
+    print("测试增量同步")
+    print("=" * 60)
+
+    # 测试案例1: 首次同步读取全部记录，按修改时间和主键排序
+    print("\n1. 测试首次同步:")
+    fake = install_fake(35)
+    result = await sync_table_changes("tbl", page_size=10)
+    data = result["data"]
+    print(f"返回 {len(data['list'])} 条, updatedAt: {data['updatedAt']}, hasMore: {data['hasMore']}")
+    assert result["success"] and [row["Id"] for row in data["list"]] == list(range(1, 36))
+    assert data["updatedAt"] == fake.timestamp(3) and not data["hasMore"]
+    assert all(params["offset"] == "0" for params in fake.requests)
+    assert fake.requests[0]["where"] == "(UpdatedAt,blank)" and fake.requests[-1]["sort"] == "UpdatedAt,Id"
+
+    # 测试案例2: 没有修改时不返回记录，水位线不变
+    print("\n2. 测试没有修改:")
+    fake.requests.clear()
+    again = await sync_table_changes("tbl", watermark=data["watermark"])
+    print(f"请求: {fake.requests}")
+    assert again["success"] and again["data"]["list"] == []
+    assert again["data"]["watermark"] == data["watermark"]
+    assert fake.requests[-1]["where"] == changed_since_where("UpdatedAt", "Id", fake.timestamp(3), 35)
+
+    # 测试案例3: 只返回修改过的记录，同一时刻修改的记录不会遗漏
+    print("\n3. 测试只返回修改过的记录:")
+    fake.touch(7, 100)
+    fake.touch(3, 100)
+    fake.rows.append({"Id": 36, "Title": "row 36", "UpdatedAt": fake.timestamp(3)})
+    changes = await sync_table_changes("tbl", watermark=data["watermark"])
+    ids = [row["Id"] for row in changes["data"]["list"]]
+    print(f"修改的记录: {ids}")
+    assert ids == [36, 3, 7]
+    assert changes["data"]["updatedAt"] == fake.timestamp(100)
+
+    # 测试案例4: 超过 max_records 时分批返回，hasMore 为 true
+    print("\n4. 测试分批同步:")
+    fake = install_fake(50)
+    seen = []
+    watermark = None
+    calls = 0
+    while True:
+        result = await sync_table_changes("tbl", watermark=watermark, page_size=7, max_records=20)
+        calls += 1
+        seen.extend(row["Id"] for row in result["data"]["list"])
+        watermark = result["data"]["watermark"]
+        if not result["data"]["hasMore"]:
+            break
+    print(f"调用次数: {calls}, 读取记录数: {len(seen)}")
+    assert seen == list(range(1, 51)) and calls == 3
+
+    # 测试案例5: ISO 时间戳作为水位线，与过滤条件组合，补上修改时间列和主键
+    print("\n5. 测试时间戳水位线和过滤条件:")
+    fake = install_fake(50)
+    result = await sync_table_changes(
+        "tbl", watermark=fake.timestamp(3), where="(Title,eq,row 45)", fields="Title"
+    )
+    print(f"请求: {fake.requests[-1]}")
+    assert [row["Id"] for row in result["data"]["list"]] == [45]
+    assert fake.requests[-1]["fields"] == "Title,Id,UpdatedAt"
+    assert fake.requests[-1]["where"] == f"((UpdatedAt,gte,exactDate,{fake.timestamp(3)}))~and((Title,eq,row 45))"
+
+    # 测试案例6: 识别 LastModifiedTime 列，没有修改时间列时报错
+    print("\n6. 测试识别修改时间列:")
+    install_fake(5, columns=[
+        {"title": "Id", "uidt": "ID", "pk": True},
+        {"title": "UpdatedAt", "uidt": "LastModifiedTime"}
+    ])
+    result = await sync_table_changes("tbl")
+    assert result["success"] and len(result["data"]["list"]) == 5
+    install_fake(5, columns=[{"title": "Id", "uidt": "ID", "pk": True}])
+    result = await sync_table_changes("tbl")
+    print(f"结果: {result}")
+    assert not result["success"]
+
+    # 测试案例7: 无效水位线和其他表的水位线
+    print("\n7. 测试无效水位线:")
+    result = await sync_table_changes("tbl", watermark="not-a-watermark")
+    assert not result["success"]
+    result = await sync_table_changes("other", watermark=changes["data"]["watermark"])
+    assert not result["success"]
+
+    # 测试案例8: 修改时间为空的行按主键读取，不会重复发出相同的请求
+    print("\n8. 测试修改时间为空的行:")
+    fake = install_fake(25)
+    for row in fake.rows[:12]:
+        row["UpdatedAt"] = None
+    seen = []
+    watermark = None
+    while True:
+        result = await sync_table_changes("tbl", watermark=watermark, page_size=5, max_records=10)
+        assert result["success"], result
+        seen.extend(row["Id"] for row in result["data"]["list"])
+        watermark = result["data"]["watermark"]
+        if not result["data"]["hasMore"]:
+            break
+    requests = [tuple(sorted(params.items())) for params in fake.requests]
+    print(f"读取顺序: {seen}, 请求次数: {len(requests)}")
+    assert seen == list(range(1, 26)) and len(set(requests)) == len(requests)
+    fake.rows.append({"Id": 26, "Title": "row 26", "UpdatedAt": None})
+    fake.touch(3, 100)
+    changes = await sync_table_changes("tbl", watermark=watermark)
+    ids = [row["Id"] for row in changes["data"]["list"]]
+    print(f"新增的空时间行和修改过的行: {ids}")
+    assert ids == [26, 3]
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+def test_sync_changes():
+    run_with_mock(run_sync_tests)
+
+if __name__ == "__main__":
+    test_sync_changes()
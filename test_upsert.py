@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+测试 upsert_table_records 按键批量判断记录是否存在，并批量创建/更新
+使用 httpx.MockTransport 模拟 NocoDB，不会真正调用API
+"""
+
+import re
+import json
+import time
+import asyncio
+import httpx
+from mock_nocodb import install_mock, run_with_mock
+from server import (
+    nocodb_client,
+    get_table_records,
+    create_table_records,
+    update_table_records,
+    upsert_table_records,
+    delete_table_records
+)
+
+COLUMNS = [
+    {"title": "Id", "uidt": "ID", "pk": True},
+    {"title": "Code", "uidt": "SingleLineText"},
+    {"title": "Name", "uidt": "SingleLineText"},
+    {"title": "Count", "uidt": "Number"}
+]
+
+class KeyedNocoDB:
+    """支持 (Code,eq,x)~or(...) 查询、批量创建、更新和删除的 NocoDB 模拟服务，可模拟请求延迟"""
+
+    def __init__(self, existing=0, latency=0.0):
+        self.rows = [{"Id": i, "Code": f"C{i}", "Name": f"old {i}", "Count": 0} for i in range(1, existing + 1)]
+        self.next_id = existing + 1
+        self.latency = latency
+        self.requests = []
+
+    def matches(self, row, where):
+        if not where:
+            return True
+        conditions = re.findall(r"\((\w+),eq,([^)]*)\)", where)
+        return any(str(row.get(field)) == value for field, value in conditions)
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(200, json={"id": "tbl", "title": "Items", "columns": COLUMNS})
+        self.requests.append(request.method)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.method == "POST":
+            created = []
+            for record in json.loads(request.content):
+                self.rows.append({"Id": self.next_id, **record})
+                created.append({"Id": self.next_id})
+                self.next_id += 1
+            return httpx.Response(200, json=created)
+        if request.method == "PATCH":
+            body = json.loads(request.content)
+            for update in body:
+                for row in self.rows:
+                    if row["Id"] == update["Id"]:
+                        row.update(update)
+            return httpx.Response(200, json=[{"Id": update["Id"]} for update in body])
+        if request.method == "DELETE":
+            ids = {item["Id"] for item in json.loads(request.content)}
+            self.rows = [row for row in self.rows if row["Id"] not in ids]
+            return httpx.Response(200, json=[{"Id": record_id} for record_id in ids])
+        params = dict(request.url.params)
+        rows = [row for row in self.rows if self.matches(row, params.get("where"))]
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 25))
+        page = rows[offset:offset + limit]
+        if "fields" in params:
+            page = [{key: row.get(key) for key in params["fields"].split(",")} for row in page]
+        return httpx.Response(200, json={
+            "list": page,
+            "pageInfo": {"totalRows": len(rows), "isLastPage": offset + limit >= len(rows)}
+        })
+
+def install_fake(existing=0, latency=0.0) -> KeyedNocoDB:
+    fake = KeyedNocoDB(existing, latency)
+    install_mock(fake.handler)
+    return fake
+
+def make_records(start, end):
+    return [{"Code": f"C{i}", "Name": f"new {i}", "Count": i} for i in range(start, end)]
+
+async def run_upsert_tests():
+    print("测试批量 upsert")
+    print("=" * 60)
+
+    # 测试案例1: 一半记录已存在，按批查询后分别批量更新和创建
+    print("\n1. 测试混合创建与更新:")
+    fake = install_fake(existing=150)
+    result = await upsert_table_records("tbl", make_records(1, 301), key_field="Code", batch_size=200)
+    print(f"消息: {result['message']}, 请求: {fake.requests}")
+    assert result["success"] and result["created_count"] == 150 and result["updated_count"] == 150
+    assert fake.requests.count("GET") == 3 and fake.requests.count("PATCH") == 1 and fake.requests.count("POST") == 1
+    by_code = {row["Code"]: row for row in fake.rows}
+    assert len(fake.rows) == 300 and by_code["C10"]["Name"] == "new 10" and by_code["C10"]["Id"] == 10
+    assert by_code["C300"]["Count"] == 300
+
+    # 测试案例2: 再次执行相同的 upsert 只更新，不会重复创建
+    print("\n2. 测试幂等同步:")
+    fake.requests.clear()
+    result = await upsert_table_records("tbl", json.dumps(make_records(1, 301)), key_field="Code")
+    print(f"消息: {result['message']}")
+    assert result["success"] and result["created_count"] == 0 and result["updated_count"] == 300
+    assert len(fake.rows) == 300 and "POST" not in fake.requests
+
+    # 测试案例3: 缺少键、批次内重复的键不发送任何请求
+    print("\n3. 测试无效的键:")
+    fake = install_fake(existing=5)
+    for records in ([{"Code": "C1"}, {"Name": "no code"}], [{"Code": "C1"}, {"Code": "C1"}], [{"Code": "bad)"}]):
+        result = await upsert_table_records("tbl", records, key_field="Code")
+        print(f"{records}: {result['error']}")
+        assert not result["success"]
+    assert fake.requests == []
+
+    # 测试案例4: 表中有多行使用同一个键时不写入
+    print("\n4. 测试表中重复的键:")
+    fake = install_fake(existing=5)
+    fake.rows.append({"Id": 99, "Code": "C3", "Name": "copy", "Count": 0})
+    result = await upsert_table_records("tbl", make_records(1, 10), key_field="Code")
+    print(f"结果: {result['error']}")
+    assert not result["success"] and fake.requests == ["GET"]
+
+    # 测试案例5: 默认按主键，没有主键的记录直接创建
+    print("\n5. 测试按主键 upsert:")
+    fake = install_fake(existing=3)
+    result = await upsert_table_records("tbl", [{"Id": 2, "Name": "renamed"}, {"Id": 50, "Name": "explicit"}, {"Name": "fresh"}])
+    print(f"消息: {result['message']}")
+    assert result["created_count"] == 2 and result["updated_count"] == 1
+    assert {row["Id"]: row["Name"] for row in fake.rows}[2] == "renamed"
+
+    # 按主键 upsert 时也接受小写的 id
+    fake.requests.clear()
+    result = await upsert_table_records("tbl", [{"id": 3, "Name": "by id"}])
+    print(f"小写 id: {result['message']}, 请求: {fake.requests}")
+    assert result["updated_count"] == 1 and result["created_count"] == 0 and result["lookup_requests"] == 1
+    assert {row["Id"]: row["Name"] for row in fake.rows}[3] == "by id" and "POST" not in fake.requests
+
+    # 测试案例6: 开启校验时转换键的类型，数字键和字符串键可以匹配
+    print("\n6. 测试校验与键的类型:")
+    fake = install_fake(existing=3)
+    result = await upsert_table_records("tbl", [{"Id": "3", "Count": "7"}], validate=True)
+    assert result["updated_count"] == 1 and fake.rows[2]["Count"] == 7
+
+    # 测试案例7: 与逐条查询再写入相比的耗时（每个请求模拟 2ms 延迟）
+    print("\n7. 测试导入耗时:")
+    records = make_records(1, 201)
+    fake = install_fake(existing=100, latency=0.002)
+    started_at = time.perf_counter()
+    for record in records:
+        found = await get_table_records("tbl", where=f"(Code,eq,{record['Code']})", fields="Id")
+        if found["data"]["list"]:
+            await update_table_records("tbl", [{**record, "Id": found["data"]["list"][0]["Id"]}])
+        else:
+            await create_table_records("tbl", [record])
+    naive = time.perf_counter() - started_at
+    naive_requests = len(fake.requests)
+
+    fake = install_fake(existing=100, latency=0.002)
+    started_at = time.perf_counter()
+    result = await upsert_table_records("tbl", records, key_field="Code")
+    batched = time.perf_counter() - started_at
+    print(f"逐条: {naive_requests} 个请求 {naive * 1000:.0f}ms, upsert: {len(fake.requests)} 个请求 {batched * 1000:.0f}ms")
+    assert result["success"] and len(fake.rows) == 200
+    assert naive > batched * 10
+
+    # 测试案例8: 无法读取表结构确定主键时 upsert 不写入，删除仍按 "Id" 发送
+    print("\n8. 测试无法读取表结构:")
+    fake = KeyedNocoDB(existing=3)
+
+    async def no_schema(request: httpx.Request) -> httpx.Response:
+        if "/api/v2/meta/tables/" in request.url.path:
+            return httpx.Response(404, json={"msg": "Table not found"})
+        return await fake.handler(request)
+
+    install_mock(no_schema)
+    result = await upsert_table_records("tbl", [{"Id": 2, "Name": "renamed"}])
+    print(f"upsert: {result['error']}")
+    assert not result["success"] and fake.requests == []
+    result = await delete_table_records("tbl", [1, 2])
+    print(f"删除: {result['message']}, 请求: {fake.requests}")
+    assert result["success"] and fake.requests == ["DELETE"] and [row["Id"] for row in fake.rows] == [3]
+
+    await nocodb_client.aclose()
+    print("\n测试完成！")
+
+def test_upsert():
+    run_with_mock(run_upsert_tests)
+
+if __name__ == "__main__":
+    test_upsert()